@@ -10,28 +10,63 @@ used throughout the project.
 
 To run the app locally install the dependencies from ``requirements.txt`` and then
 execute ``streamlit run app.py`` from the repository root.
+
+Pages are registered in :data:`PAGES` and only the selected one runs, so data are
+loaded on demand. ``geopandas`` and ``matplotlib`` are imported by the map page when it
+first draws a map, keeping them out of the cold start of the other pages
+(``benchmarks/bench_app_startup.py`` measures it).
 """
 
+import io
 import os
 import datetime
+from typing import TYPE_CHECKING, Callable
 
 import streamlit as st
 import pandas as pd
-import geopandas as gpd
-import matplotlib.pyplot as plt
+
+from rca_sus.catalog import build_catalog, catalog_years, find_entry, read_catalog
+from rca_sus.columnar import DEFAULT_DATASET_DIR, aggregate_parquet, dataset_years
+from rca_sus.cube import AGE_BANDS, OUTCOMES, SEXES, SivepCube, default_cube_path
+from rca_sus.geometry import DEFAULT_SHAPEFILE, geometry_path, level_for_figure, load_geometry
+from rca_sus.incidence import incidence_frame
+from rca_sus.municipal import MUNICIPAL_COLUMNS, MunicipalCounts, default_municipal_path
+from rca_sus.population import DEFAULT_POPULATION_PATH, load_population_table, population_series
+from rca_sus.render_cache import RenderCache, content_hash
+from rca_sus.tensor import DEFAULT_TENSOR_PATH, CountTensor
+from rca_sus.timeseries import CountStore
+
+if TYPE_CHECKING:
+    import geopandas as gpd
 
 
 # -----------------------------------------------------------------------------
 # Configuration
 st.set_page_config(page_title="RCA SUS Data Explorer", layout="wide")
 
+MAP_FIGSIZE = (10, 8)
+MAP_DPI = 100
+
+#: Pages of the app in navigation order, registered with :func:`page`.
+PAGES: dict[str, Callable[[], None]] = {}
+
+
+def page(title: str) -> Callable[[Callable[[], None]], Callable[[], None]]:
+    """Register the decorated function as the page shown under ``title``."""
+    def register(render: Callable[[], None]) -> Callable[[], None]:
+        PAGES[title] = render
+        return render
+    return register
+
 
 @st.cache_data
 def load_aggregated_data(year: int) -> pd.DataFrame | None:
     """Load the aggregated SRAG counts for a given year.
 
-    The data are stored in ``data/SIVEP/<year>/aggregated_sivep_<year>.csv``. If the
-    file cannot be loaded or does not exist, this function returns ``None``.
+    The data are stored in ``data/SIVEP/<year>/aggregated_sivep_<year>.csv``. When that
+    file does not exist but the year has been converted to the partitioned Parquet store
+    (see :mod:`rca_sus.columnar`), the counts are computed from the store instead. If the
+    data cannot be loaded, this function returns ``None``.
 
     Parameters
     ----------
@@ -46,7 +81,12 @@ def load_aggregated_data(year: int) -> pd.DataFrame | None:
     """
     csv_path = os.path.join("data", "SIVEP", str(year), f"aggregated_sivep_{year}.csv")
     if not os.path.exists(csv_path):
-        return None
+        if year not in dataset_years(DEFAULT_DATASET_DIR):
+            return None
+        try:
+            return aggregate_parquet(year, DEFAULT_DATASET_DIR)
+        except Exception:
+            return None
     try:
         df = pd.read_csv(csv_path)
     except Exception:
@@ -57,90 +97,130 @@ def load_aggregated_data(year: int) -> pd.DataFrame | None:
     return df
 
 
-@st.cache_data
-def load_population() -> pd.DataFrame | None:
-    """Load population estimates for Brazilian states.
+@st.cache_resource
+def load_count_tensor() -> CountTensor | None:
+    """Map the (UF x day x year) count tensor written by the aggregation step.
+
+    The file is opened with ``np.load(mmap_mode='r')``, so every session and server process
+    shares the same page-cached copy. Returns ``None`` if it does not exist or cannot be read.
+    """
+    if not os.path.exists(DEFAULT_TENSOR_PATH):
+        return None
+    try:
+        return CountTensor.open(DEFAULT_TENSOR_PATH)
+    except Exception:
+        return None
+
+
+@st.cache_resource
+def load_count_store(year: int) -> CountStore | None:
+    """Return the counts of a year as a dense (UF x day) :class:`CountStore`.
+
+    The counts come from the notification-year slab of the memory-mapped count tensor when
+    it holds ``year`` (the same file the cube and municipal views read, including the
+    previous December's onsets); otherwise the store is built from
+    :func:`load_aggregated_data`. Filters in the Data Explorer are then answered from its
+    prefix sums instead of masking the table.
+    """
+    tensor = load_count_tensor()
+    if tensor is not None and year in tensor.years:
+        return tensor.to_store(year)
+    df = load_aggregated_data(year)
+    if df is None or df.empty:
+        return None
+    return CountStore.from_aggregated(df)
 
-    Reads the Excel file in ``data/IBGE/population/estimativa_dou_2021.xls`` and
-    extracts the 2021 population by state. The resulting DataFrame has two columns:
-    ``SIGLA`` (state abbreviation) and ``Population`` (integer).
 
-    Returns ``None`` if the file cannot be read.
+@st.cache_resource
+def load_cube(year: int) -> SivepCube | None:
+    """Load the pre-aggregated SIVEP cube for a given year.
+
+    The cube is built with ``python -m rca_sus cube`` and stored in
+    ``data/SIVEP/<year>/cube_sivep_<year>.npz``. Returns ``None`` if it does not exist or
+    cannot be read.
     """
-    excel_path = os.path.join("data", "IBGE", "population", "estimativa_dou_2021.xls")
-    if not os.path.exists(excel_path):
+    cube_path = default_cube_path(year)
+    if not os.path.exists(cube_path):
         return None
     try:
-        xls = pd.ExcelFile(excel_path)
+        return SivepCube.load(cube_path)
     except Exception:
         return None
+
+
+@st.cache_resource
+def load_municipal(year: int, basis: str = "residence") -> MunicipalCounts | None:
+    """Load the sparse (municipality x day) counts of a year for one basis.
+
+    The counts are built with ``python -m rca_sus aggregate <INFLUD> --level municipal`` and
+    stored in ``data/SIVEP/<year>/municipal_sivep_<year>.npz``. Returns ``None`` if they do
+    not exist or cannot be read.
+    """
+    path = default_municipal_path(year)
+    if not os.path.exists(path):
+        return None
     try:
-        df_raw = pd.read_excel(xls, sheet_name="BRASIL E UFs", header=None)
+        return MunicipalCounts.load(path, basis)
     except Exception:
         return None
-    # The first three rows contain headings; data starts from row 3 and includes 27
-    # states. Column 0 contains the state names, column 2 the population as string.
-    data_rows = df_raw.iloc[3:3 + 27, [0, 2]].copy()
-    data_rows.columns = ["UF", "Population"]
-    # Clean population numbers: remove dots, commas and any footnote markers
-    data_rows['Population'] = (
-        data_rows['Population'].astype(str)
-        .str.replace(r"\D", "", regex=True)
-        .astype(int)
-    )
-    # Map full state names to abbreviations
-    name_to_sigla = {
-        "Rondônia": "RO",
-        "Acre": "AC",
-        "Amazonas": "AM",
-        "Roraima": "RR",
-        "Pará": "PA",
-        "Amapá": "AP",
-        "Tocantins": "TO",
-        "Maranhão": "MA",
-        "Piauí": "PI",
-        "Ceará": "CE",
-        "Rio Grande do Norte": "RN",
-        "Paraíba": "PB",
-        "Pernambuco": "PE",
-        "Alagoas": "AL",
-        "Sergipe": "SE",
-        "Bahia": "BA",
-        "Minas Gerais": "MG",
-        "Espírito Santo": "ES",
-        "Rio de Janeiro": "RJ",
-        "São Paulo": "SP",
-        "Paraná": "PR",
-        "Santa Catarina": "SC",
-        "Rio Grande do Sul": "RS",
-        "Mato Grosso do Sul": "MS",
-        "Mato Grosso": "MT",
-        "Goiás": "GO",
-        "Distrito Federal": "DF",
-    }
-    data_rows['SIGLA'] = data_rows['UF'].map(name_to_sigla)
-    return data_rows[['SIGLA', 'Population']]
 
 
 @st.cache_data
-def load_shapefile() -> gpd.GeoDataFrame | None:
-    """Load Brazil's state boundaries shapefile.
+def load_population(year: int) -> pd.Series | None:
+    """Load the population estimates of the Brazilian states for ``year``.
+
+    Reads the table built by ``python -m rca_sus population`` (see
+    :mod:`rca_sus.population`). When there are no estimates for ``year`` the closest
+    year available is used; the returned Series is indexed by state abbreviation and
+    named after the year of the estimates.
 
-    Reads the shapefile archive ``data/IBGE/shapefiles/BR_UF_2022.zip`` using
-    ``geopandas``. The returned GeoDataFrame includes columns ``SIGLA_UF`` (state
-    abbreviation), ``NM_UF`` (state name), ``NM_REGIAO`` (region), ``AREA_KM2`` and
-    the geometry. Returns ``None`` if the file is missing or cannot be read.
+    Returns ``None`` if the table cannot be read.
     """
-    shp_zip = os.path.join("data", "IBGE", "shapefiles", "BR_UF_2022.zip")
-    if not os.path.exists(shp_zip):
+    if not os.path.exists(DEFAULT_POPULATION_PATH):
+        return None
+    try:
+        return population_series(load_population_table(DEFAULT_POPULATION_PATH), year)
+    except Exception:
         return None
+
+
+@st.cache_resource
+def load_shapefile(level: str = "medium") -> "gpd.GeoDataFrame | None":
+    """Load Brazil's state boundaries at a simplification level.
+
+    Reads the GeoParquet layer built by ``python -m rca_sus geometry`` (see
+    :mod:`rca_sus.geometry`), falling back to simplifying the shapefile archive
+    ``data/IBGE/shapefiles/BR_UF_2022.zip`` when the cache is missing. The returned
+    GeoDataFrame includes columns ``SIGLA_UF`` (state abbreviation), ``NM_UF`` (state
+    name), ``NM_REGIAO`` (region) and the geometry. Returns ``None`` if neither source can
+    be read.
+    """
     try:
-        gdf = gpd.read_file(f"zip://{shp_zip}")
+        return load_geometry(level)
     except Exception:
         return None
-    return gdf
 
 
+@st.cache_data
+def load_catalog() -> dict:
+    """Load the dataset catalog (``data/SIVEP/catalog.json``).
+
+    The catalog is written by the ``rca_sus`` pipeline commands (see :mod:`rca_sus.catalog`)
+    and lets the app list the available years without reading any dataset. When it is
+    missing, the data directory is scanned instead.
+    """
+    catalog = read_catalog()
+    if catalog is None:
+        catalog = build_catalog()
+    return catalog
+
+
+def available_years() -> list[int]:
+    """Return the years with an aggregated table or a partition in the Parquet store."""
+    return catalog_years(load_catalog(), kinds=('aggregated', 'parquet'))
+
+
+@page("Home")
 def home_page() -> None:
     """Display the home page with project overview."""
     st.title("RCA SUS Project")
@@ -161,30 +241,23 @@ def home_page() -> None:
     )
 
 
+@page("Data Explorer")
 def data_explorer_page() -> None:
     """Interactive page for exploring aggregated SRAG counts and incidence."""
     st.header("Data Explorer")
-    # Determine available years by inspecting the data directory
-    available_years = []
-    for year_dir in os.listdir(os.path.join("data", "SIVEP")):
-        if year_dir.isdigit():
-            df_test = load_aggregated_data(int(year_dir))
-            if df_test is not None:
-                available_years.append(int(year_dir))
-    available_years.sort()
-    if not available_years:
+    # Years come from the catalog; a year's data is only loaded once selected
+    years = available_years()
+    if not years:
         st.warning("No aggregated datasets are available.")
         return
-    selected_year = st.selectbox("Select year", available_years, index=0)
-    df = load_aggregated_data(selected_year)
-    if df is None or df.empty:
+    selected_year = st.selectbox("Select year", years, index=0)
+    store = load_count_store(selected_year)
+    if store is None:
         st.warning(f"Aggregated data for {selected_year} could not be loaded.")
         return
-    # Convert dates to pandas datetime
-    df = df.dropna(subset=['DT_SIN_PRI'])
     # Determine date range for slider
-    min_date = df['DT_SIN_PRI'].min().date()
-    max_date = df['DT_SIN_PRI'].max().date()
+    min_date = store.dates[0].date()
+    max_date = store.dates[-1].date()
     date_range = st.slider(
         "Date range",
         min_value=min_date,
@@ -193,18 +266,13 @@ def data_explorer_page() -> None:
         format="YYYY-MM-DD",
     )
     start_date, end_date = [datetime.date.fromisoformat(str(d)) for d in date_range]
-    unique_states = sorted(df['SG_UF'].dropna().unique().tolist())
+    unique_states = store.present_units
     default_states = unique_states  # show all by default
     selected_states = st.multiselect(
         "Select states", unique_states, default=default_states, key="states_select"
     )
-    # Filter data
-    mask = (
-        (df['DT_SIN_PRI'].dt.date >= start_date)
-        & (df['DT_SIN_PRI'].dt.date <= end_date)
-        & (df['SG_UF'].isin(selected_states))
-    )
-    filtered_df = df.loc[mask].copy()
+    # Filter data: totals and daily series come from the store's prefix sums
+    filtered_df = store.to_frame(start_date, end_date, selected_states)
     if filtered_df.empty:
         st.info("No data match the selected filters.")
         return
@@ -212,26 +280,24 @@ def data_explorer_page() -> None:
     st.subheader("Filtered aggregated data")
     st.dataframe(filtered_df.sort_values(['DT_SIN_PRI', 'SG_UF']))
     # Display daily total counts across selected states
-    daily_counts = (
-        filtered_df.groupby('DT_SIN_PRI')['COUNT'].sum().rename('Total Cases').reset_index()
-    )
+    daily_counts = store.daily(start_date, end_date, selected_states).rename('Total Cases')
     st.subheader("Temporal trend across selected states")
-    st.line_chart(daily_counts.set_index('DT_SIN_PRI'))
+    st.line_chart(daily_counts)
+    cube_breakdown(selected_year, selected_states, start_date, end_date)
+    municipal_breakdown(selected_year, selected_states, start_date, end_date)
     # Compute incidence per state if population is available
-    pop_df = load_population()
-    if pop_df is not None:
-        state_counts = (
-            filtered_df.groupby('SG_UF')['COUNT'].sum().reset_index()
-        )
-        merged = state_counts.merge(pop_df, left_on='SG_UF', right_on='SIGLA', how='left')
-        merged['incidence'] = merged.apply(
-            lambda row: (row['COUNT'] / row['Population'] * 100000)
-            if pd.notnull(row['Population']) else None,
-            axis=1,
-        )
+    population = load_population(selected_year)
+    if population is not None:
+        merged = incidence_frame(
+            store.totals(start_date, end_date, selected_states),
+            population,
+            ufs=selected_states,
+        ).reset_index()
         merged = merged.sort_values('incidence', ascending=False)
         st.subheader("Incidence rates per 100k inhabitants")
-        st.table(merged[['SG_UF', 'COUNT', 'Population', 'incidence']])
+        if population.name != selected_year:
+            st.caption(f"No population estimates for {selected_year}; using the {population.name} estimates.")
+        st.table(merged[['SG_UF', 'COUNT', 'Population', 'incidence', 'incidence_lower', 'incidence_upper']])
         # Bar chart for counts and incidence
         bar_data = merged.set_index('SG_UF')[['COUNT', 'incidence']]
         st.bar_chart(bar_data)
@@ -239,67 +305,142 @@ def data_explorer_page() -> None:
         st.info("Population data not available; incidence rates cannot be computed.")
 
 
+def cube_breakdown(year: int, states: list[str], start_date: datetime.date,
+                   end_date: datetime.date) -> None:
+    """Break the selected counts down by age band, sex and outcome using the data cube."""
+    cube = load_cube(year)
+    if cube is None:
+        st.info(
+            f"No data cube for {year}; build it with ``python -m rca_sus cube`` to break the "
+            "counts down by age, sex and outcome."
+        )
+        return
+    st.subheader("Breakdown by age, sex and outcome")
+    col_age, col_sex, col_outcome = st.columns(3)
+    age_sel = col_age.multiselect("Age bands", AGE_BANDS, default=AGE_BANDS)
+    sex_sel = col_sex.multiselect("Sex", SEXES, default=SEXES)
+    outcome_sel = col_outcome.multiselect("Outcome", OUTCOMES, default=OUTCOMES)
+    selection = dict(uf=states, start=start_date, end=end_date,
+                     age_band=age_sel, sex=sex_sel, outcome=outcome_sel)
+    st.metric("Matching cases", f"{cube.total(**selection):,}")
+    st.line_chart(cube.rollup(['date'], **selection).rename('Cases'))
+    by_age = cube.rollup(['age_band', 'outcome'], **selection).unstack('outcome').reindex(age_sel)
+    st.bar_chart(by_age)
+
+
+def municipal_breakdown(year: int, states: list[str], start_date: datetime.date,
+                        end_date: datetime.date) -> None:
+    """Rank the municipalities of the selected states and plot the series of one of them.
+
+    Both come from slices of the sparse municipal counts; no dense frame is built.
+    """
+    if not os.path.exists(default_municipal_path(year)):
+        st.info(
+            f"No municipal counts for {year}; build them with ``python -m rca_sus aggregate "
+            "<INFLUD> --level municipal`` to rank the municipalities."
+        )
+        return
+    st.subheader("Municipalities")
+    basis = st.radio("Municipality of", list(MUNICIPAL_COLUMNS), horizontal=True, key="municipal_basis")
+    counts = load_municipal(year, basis)
+    if counts is None:
+        st.warning(f"Municipal counts for {year} could not be loaded.")
+        return
+    top = counts.top(20, start_date, end_date, ufs=states)
+    if top.empty:
+        st.info("No municipal records match the selected filters.")
+        return
+    st.dataframe(top, hide_index=True)
+    code = st.selectbox("Daily cases of municipality", top['CO_MUN'].tolist(), key="municipal_code")
+    st.line_chart(counts.daily(start_date, end_date, municipalities=[code]).rename('Cases'))
+
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """Return the rendered-map cache shared by every session of this server."""
+    return RenderCache()
+
+
+def dataset_hash(year: int) -> str | None:
+    """Content hash of the aggregates of a year, as recorded in the catalog."""
+    catalog = load_catalog()
+    entry = find_entry(catalog, year, 'aggregated') or find_entry(catalog, year, 'parquet')
+    return entry['sha256'] if entry else None
+
+
+def geometry_hash(level: str) -> str | None:
+    """Content hash of the geometry layer drawn at ``level``."""
+    path = geometry_path(level)
+    return content_hash(path if os.path.exists(path) else DEFAULT_SHAPEFILE)
+
+
+def render_choropleth(year: int, metric: str, metric_label: str, cmap: str, level: str) -> bytes:
+    """Draw the choropleth of ``metric`` for ``year`` and return it as PNG bytes."""
+    import matplotlib.pyplot as plt
+
+    store = load_count_store(year)
+    shapefile = load_shapefile(level)
+    # Aggregate counts by state
+    state_counts = store.totals().rename('cases').reset_index()
+    gdf = shapefile.merge(state_counts, left_on='SIGLA_UF', right_on='SG_UF', how='left')
+    gdf['cases'] = gdf['cases'].fillna(0)
+    if metric == 'incidence':
+        rates = incidence_frame(store.totals(), load_population(year))
+        gdf['incidence'] = gdf['SIGLA_UF'].map(rates['incidence'])
+    # Set NaN values to zero for plotting
+    gdf[metric] = gdf[metric].fillna(0)
+    # Plot choropleth using matplotlib
+    fig, ax = plt.subplots(figsize=MAP_FIGSIZE)
+    gdf.plot(
+        column=metric,
+        cmap=cmap,
+        linewidth=0.8,
+        edgecolor='0.8',
+        legend=True,
+        ax=ax,
+    )
+    ax.set_title(f"{metric_label} by State – {year}")
+    ax.axis('off')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=MAP_DPI, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+@page("Map Visualisation")
 def maps_page() -> None:
     """Display choropleth maps of SRAG counts or incidence by state."""
     st.header("Map Visualisation")
-    # Determine available years
-    available_years = []
-    for year_dir in os.listdir(os.path.join("data", "SIVEP")):
-        if year_dir.isdigit():
-            df_test = load_aggregated_data(int(year_dir))
-            if df_test is not None and not df_test.empty:
-                available_years.append(int(year_dir))
-    available_years.sort()
-    if not available_years:
+    years = available_years()
+    if not years:
         st.warning("No aggregated datasets are available for mapping.")
         return
-    year = st.selectbox("Select year", available_years, index=0)
-    agg_df = load_aggregated_data(year)
-    if agg_df is None or agg_df.empty:
+    year = st.selectbox("Select year", years, index=0)
+    if load_count_store(year) is None:
         st.warning(f"Aggregated data for {year} could not be loaded.")
         return
-    shapefile = load_shapefile()
-    if shapefile is None:
+    level = level_for_figure(MAP_FIGSIZE[0], MAP_DPI)
+    if load_shapefile(level) is None:
         st.warning("Shapefile for Brazil could not be loaded.")
         return
-    # Aggregate counts by state
-    state_counts = agg_df.groupby('SG_UF')['COUNT'].sum().reset_index(name='cases')
-    gdf = shapefile.merge(state_counts, left_on='SIGLA_UF', right_on='SG_UF', how='left')
-    gdf['cases'] = gdf['cases'].fillna(0)
-    pop_df = load_population()
-    if pop_df is not None:
-        gdf = gdf.merge(pop_df, left_on='SIGLA_UF', right_on='SIGLA', how='left')
-        gdf['incidence'] = gdf.apply(
-            lambda row: (row['cases'] / row['Population'] * 100000)
-            if pd.notnull(row['Population']) and row['Population'] > 0 else None,
-            axis=1,
-        )
     # Choose metric to display
     metrics = {'Total Cases': 'cases'}
-    if 'incidence' in gdf.columns:
+    if load_population(year) is not None:
         metrics['Incidence (per 100k)'] = 'incidence'
     metric_label = st.selectbox("Metric", list(metrics.keys()), index=0)
     metric = metrics[metric_label]
-    # Plot choropleth using matplotlib
-    fig, ax = plt.subplots(figsize=(10, 8))
-    # Set NaN values to zero for plotting
-    plot_gdf = gdf.copy()
-    plot_gdf[metric] = plot_gdf[metric].fillna(0)
     # Determine a colour map based on metric
     cmap = 'OrRd' if metric == 'cases' else 'Blues'
-    plot_gdf.plot(
-        column=metric,
-        cmap=cmap,
-        linewidth=0.8,
-        edgecolor='0.8',
-        legend=True,
-        ax=ax,
+    # Finished maps are cached across sessions, keyed by the content of their inputs
+    key = (year, metric, cmap, level, dataset_hash(year), content_hash(DEFAULT_POPULATION_PATH),
+           geometry_hash(level))
+    png = get_render_cache().get_or_render(
+        key, lambda: render_choropleth(year, metric, metric_label, cmap, level)
     )
-    ax.set_title(f"{metric_label} by State – {year}")
-    ax.axis('off')
-    st.pyplot(fig)
+    st.image(png)
 
 
+@page("References")
 def references_page() -> None:
     """Display a list of references and data sources."""
     st.header("References")
@@ -325,15 +466,9 @@ def references_page() -> None:
 
 def main() -> None:
     """Main entry point of the Streamlit application."""
-    pages = {
-        "Home": home_page,
-        "Data Explorer": data_explorer_page,
-        "Map Visualisation": maps_page,
-        "References": references_page,
-    }
     st.sidebar.title("Navigation")
-    choice = st.sidebar.radio("Go to", list(pages.keys()))
-    pages[choice]()
+    choice = st.sidebar.radio("Go to", list(PAGES.keys()))
+    PAGES[choice]()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Cold‑start benchmark of the Streamlit app.
+
+Every measurement runs in a fresh Python process, as on a newly started
+worker, with the repository root as the working directory:
+
+* ``import`` – executing the top level of ``app.py`` (its imports,
+  configuration and page registry) without rendering any page;
+* one row per page of :data:`app.PAGES` – the time until the first run
+  of that page finishes, driven headlessly with Streamlit's
+  ``AppTest`` (the Home page is rendered first, then the page is
+  selected in the sidebar, as a user would).
+
+For each it reports the wall time, the peak resident set size of the
+process and which of the heavy optional packages (``geopandas``,
+``matplotlib``, ``shapely``, ``scipy``) were imported.  With
+``--max-seconds``/``--max-rss`` the script exits with status 1 when a
+measurement exceeds the budget, and it always fails when the Home or
+References page imports ``geopandas`` or ``matplotlib``, so it can guard
+the cold start in CI.
+
+Example usage (from the repository root):
+
+```
+python benchmarks/bench_app_startup.py
+python benchmarks/bench_app_startup.py --max-seconds 5 --max-rss 400 --json startup.json
+```
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+APP = os.path.join(ROOT, 'app.py')
+
+#: Packages that should only be imported by the pages that need them.
+HEAVY_MODULES = ['geopandas', 'matplotlib', 'shapely', 'scipy']
+
+#: Pages that must start without the geospatial and plotting stacks.
+LIGHT_PAGES = ['Home', 'References']
+
+# executed in a fresh interpreter; prints one JSON line with the measurement
+_CHILD = r'''
+import json, resource, runpy, sys, time, warnings
+app, page, heavy = sys.argv[1], sys.argv[2], sys.argv[3].split(',')
+start = time.perf_counter()
+if page == 'import':
+    warnings.simplefilter('ignore')
+    runpy.run_path(app, run_name='app')
+    error = None
+else:
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(app, default_timeout=600).run()
+    if page != 'Home':
+        at.sidebar.radio[0].set_value(page).run()
+    error = '; '.join(str(e.value) for e in at.exception) or None
+seconds = time.perf_counter() - start
+print(json.dumps({
+    'seconds': seconds,
+    'rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'loaded': [name for name in heavy if name in sys.modules],
+    'error': error,
+}))
+'''
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the cold start of the Streamlit app")
+    parser.add_argument('--pages', type=str, nargs='+', default=None,
+                        help='Pages to measure (default: every page in app.PAGES)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Fresh processes per measurement (the fastest is kept)')
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='Fail if the import or any first render takes longer than this')
+    parser.add_argument('--max-rss', type=float, default=None,
+                        help='Fail if any process peaks above this many MiB of resident memory')
+    parser.add_argument('--json', type=str, default=None, help='Also write the results to this JSON file')
+    return parser.parse_args()
+
+
+def measure(page: str, repeat: int) -> Dict[str, object]:
+    """Fastest of ``repeat`` cold measurements of ``page`` (or ``'import'``)."""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-c', _CHILD, APP, page, ','.join(HEAVY_MODULES)],
+                              cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {'page': page, 'error': proc.stderr.strip().splitlines()[-1] if proc.stderr else 'failed'}
+        runs.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    best = min(runs, key=lambda run: run['seconds'])
+    best['rss_mib'] = max(run['rss_mib'] for run in runs)
+    return {'page': page, **best}
+
+
+def registered_pages() -> List[str]:
+    """Titles of the pages registered in ``app.PAGES``, read in a child process."""
+    code = ("import json, runpy, warnings; warnings.simplefilter('ignore'); "
+            f"print(json.dumps(list(runpy.run_path({APP!r}, run_name='app')['PAGES'])))")
+    proc = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def check_budget(results: List[Dict[str, object]], max_seconds: Optional[float],
+                 max_rss: Optional[float]) -> List[str]:
+    failures = []
+    for result in results:
+        page = result['page']
+        if result.get('error'):
+            failures.append(f"{page}: {result['error']}")
+            continue
+        if max_seconds is not None and result['seconds'] > max_seconds:
+            failures.append(f"{page}: {result['seconds']:.2f} s > {max_seconds:g} s")
+        if max_rss is not None and result['rss_mib'] > max_rss:
+            failures.append(f"{page}: {result['rss_mib']:.0f} MiB > {max_rss:g} MiB")
+        if page in ['import'] + LIGHT_PAGES:
+            eager = [name for name in ('geopandas', 'matplotlib') if name in result['loaded']]
+            if eager:
+                failures.append(f"{page}: imports {', '.join(eager)}")
+    return failures
+
+
+def main(args: argparse.Namespace) -> None:
+    pages = args.pages or registered_pages()
+    print(f"{'page':>18} {'seconds':>8} {'peak RSS MiB':>13}  heavy modules loaded")
+    results = []
+    for page in ['import'] + pages:
+        result = measure(page, args.repeat)
+        results.append(result)
+        if result.get('error'):
+            print(f"{page:>18}  error: {result['error']}")
+        else:
+            print(f"{page:>18} {result['seconds']:8.2f} {result['rss_mib']:13.0f}  "
+                  f"{', '.join(result['loaded']) or '-'}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    failures = check_budget(results, args.max_seconds, args.max_rss)
+    for failure in failures:
+        print(f"over budget: {failure}")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Timing of the lagged weather × cases cross‑correlation.
+
+Generates daily series shaped like a year of state data (27 units,
+five weather variables, Poisson case counts in which the first variable
+leads the cases by ten days) and reports
+
+* the time of :func:`rca_sus.lagcorr.lagged_correlation` for the whole
+  (unit × variable × lag) array;
+* the same correlations computed the way the notebooks did, one
+  ``Series.corr`` per unit, variable and lag (on a subset of units, then
+  scaled), together with the largest difference between both;
+* the time of :func:`rca_sus.lagcorr.permutation_pvalues` with the
+  requested number of permutations.
+
+Example usage (from the repository root):
+
+```
+python benchmarks/bench_lagcorr.py
+python benchmarks/bench_lagcorr.py --days 730 --max-lag 90 --permutations 999 --scheme circular
+```
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from rca_sus.lagcorr import SCHEMES, lagged_correlation, permutation_pvalues  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the FFT lagged cross-correlation")
+    parser.add_argument('--units', type=int, default=27, help='Number of units (states)')
+    parser.add_argument('--variables', type=int, default=5, help='Number of weather variables')
+    parser.add_argument('--days', type=int, default=365, help='Number of days')
+    parser.add_argument('--max-lag', type=int, default=60, help='Largest lag in days')
+    parser.add_argument('--permutations', type=int, default=999, help='Permutations for the p-values')
+    parser.add_argument('--scheme', type=str, choices=SCHEMES, default='shuffle', help='Permutation scheme')
+    parser.add_argument('--loop-units', type=int, default=3,
+                        help='Units timed with the per-lag loop (the time is scaled to all units)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    return parser.parse_args()
+
+
+def synthetic(units: int, variables: int, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    season = np.sin(2 * np.pi * t / 365.25)
+    x = season + 0.5 * rng.normal(size=(units, variables, days))
+    rate = np.exp(3.0 - 0.8 * np.roll(x[:, 0, :], 10, axis=-1))
+    y = rng.poisson(rate).astype('float64')
+    return x, y
+
+
+def loop_correlation(x: np.ndarray, y: np.ndarray, max_lag: int) -> np.ndarray:
+    """One pandas correlation per unit, variable and lag."""
+    out = np.full(x.shape[:2] + (2 * max_lag + 1,), np.nan)
+    for u in range(x.shape[0]):
+        cases = pd.Series(y[u])
+        for v in range(x.shape[1]):
+            weather = pd.Series(x[u, v])
+            for i, k in enumerate(range(-max_lag, max_lag + 1)):
+                out[u, v, i] = weather.corr(cases.shift(-k))
+    return out
+
+
+def main(args: argparse.Namespace) -> None:
+    x, y = synthetic(args.units, args.variables, args.days, args.seed)
+    print(f"{args.units} units x {args.variables} variables x {args.days} days, "
+          f"lags -{args.max_lag}..{args.max_lag}")
+
+    lagged_correlation(x, y, args.max_lag)
+    start = time.perf_counter()
+    r, n, lags = lagged_correlation(x, y, args.max_lag)
+    fft_seconds = time.perf_counter() - start
+    print(f"{'FFT, all units':>28}: {fft_seconds:8.3f} s  array {r.shape}")
+
+    subset = min(args.loop_units, args.units)
+    start = time.perf_counter()
+    reference = loop_correlation(x[:subset], y[:subset], args.max_lag)
+    loop_seconds = (time.perf_counter() - start) * args.units / subset
+    print(f"{'per-lag loop (scaled)':>28}: {loop_seconds:8.3f} s  "
+          f"({loop_seconds / fft_seconds:.0f}x slower, max |diff| {np.nanmax(np.abs(reference - r[:subset])):.1e})")
+
+    start = time.perf_counter()
+    p_values, p_adjusted = permutation_pvalues(x, y, r, args.max_lag, args.permutations,
+                                               args.scheme, seed=args.seed)
+    perm_seconds = time.perf_counter() - start
+    print(f"{f'{args.permutations} permutations':>28}: {perm_seconds:8.3f} s  "
+          f"({1e3 * perm_seconds / max(args.permutations, 1):.2f} ms per permutation)")
+
+    peak = lags[np.nanargmax(np.abs(r[:, 0, :]), axis=-1)]
+    print(f"lag of the strongest correlation of the leading variable: median {np.median(peak):.0f} days, "
+          f"{np.mean(p_adjusted[:, 0, :].min(axis=-1) < 0.05):.0%} of units significant (lag-adjusted)")
+
+
+if __name__ == '__main__':
+    main(parse_args())
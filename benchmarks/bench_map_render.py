@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the state choropleth at each geometry level.
+
+For the original shapefile and every simplified level of
+:mod:`rca_sus.geometry`, loads the layer, draws the same choropleth as
+the map page and renders it to PNG, reporting the number of vertices,
+the load and render times and the peak Python memory allocated
+(``tracemalloc``).  Run ``python -m rca_sus geometry`` first to build the
+simplified layers.
+
+Example usage (from the repository root):
+
+```
+python benchmarks/bench_map_render.py
+python benchmarks/bench_map_render.py --width 6 --dpi 150 --repeat 5
+```
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import geopandas as gpd  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from rca_sus.geometry import (DEFAULT_SHAPEFILE, LEVELS, count_vertices, geometry_path,  # noqa: E402
+                              level_for_figure)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark choropleth rendering per geometry level")
+    parser.add_argument('--shapefile', type=str, default=DEFAULT_SHAPEFILE,
+                        help='Original shapefile ZIP used as the baseline')
+    parser.add_argument('--width', type=float, default=10.0, help='Figure width in inches')
+    parser.add_argument('--dpi', type=float, default=100.0, help='Rendering resolution')
+    parser.add_argument('--repeat', type=int, default=3, help='Renders per level (the best time is kept)')
+    return parser.parse_args()
+
+
+def render(gdf, width: float, dpi: float) -> int:
+    fig, ax = plt.subplots(figsize=(width, width * 0.8))
+    gdf.plot(column='value', cmap='OrRd', linewidth=0.8, edgecolor='0.8', legend=True, ax=ax)
+    ax.axis('off')
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    plt.close(fig)
+    return buffer.tell()
+
+
+def main(args: argparse.Namespace) -> None:
+    sources = {'shapefile': f"zip://{args.shapefile}"}
+    sources.update({level: geometry_path(level) for level in LEVELS})
+    print(f"Level chosen by the app for a {args.width:g} in figure at {args.dpi:g} dpi: "
+          f"{level_for_figure(args.width, args.dpi)}")
+    print(f"{'source':>10} {'vertices':>10} {'load s':>8} {'render s':>9} {'peak MiB':>9} {'PNG KiB':>8}")
+    for name, path in sources.items():
+        if not os.path.exists(args.shapefile if name == 'shapefile' else path):
+            print(f"{name:>10}  missing ({path})")
+            continue
+        tracemalloc.start()
+        start = time.perf_counter()
+        gdf = gpd.read_file(path) if name == 'shapefile' else gpd.read_parquet(path)
+        load = time.perf_counter() - start
+        gdf['value'] = np.arange(len(gdf))
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            size = render(gdf, args.width, args.dpi)
+            times.append(time.perf_counter() - start)
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        print(f"{name:>10} {count_vertices(gdf):>10} {load:8.2f} {min(times):9.2f} {peak:9.1f} {size / 1024:8.1f}")
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the multi‑core INFLUD aggregation.
+
+Aggregates one extracted INFLUD CSV with an increasing number of worker
+processes and reports the wall time and speedup relative to the
+single‑process path, checking that every run produces byte‑identical
+output.  When no file is given a synthetic INFLUD‑like CSV is generated
+in a temporary directory.
+
+Example usage (from the repository root):
+
+```
+python benchmarks/bench_parallel_aggregate.py --rows 2000000
+python benchmarks/bench_parallel_aggregate.py --csv INFLUD20-26-06-2025.csv --workers 1 2 4 8 16 32
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from rca_sus.ingest import aggregate_influd  # noqa: E402
+from rca_sus.parallel import aggregate_influd_parallel  # noqa: E402
+from synthetic_influd import write_synthetic_influd  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark parallel INFLUD aggregation")
+    parser.add_argument('--csv', type=str, default=None,
+                        help='Extracted INFLUD CSV (default: generate a synthetic file)')
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='Rows of the synthetic file')
+    parser.add_argument('--filler_columns', type=int, default=0,
+                        help='Extra columns added to the synthetic file')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='Worker counts to benchmark (default: powers of two up to the core count)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic file')
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace) -> None:
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.csv
+        if path is None:
+            path = os.path.join(tmp, 'INFLUD_synthetic.csv')
+            write_synthetic_influd(path, args.rows, seed=args.seed, filler_columns=args.filler_columns)
+        size_mb = os.path.getsize(path) / 2**20
+        print(f"File: {path} ({size_mb:.1f} MiB), cores available: {cores}")
+        start = time.perf_counter()
+        reference = aggregate_influd(path).to_csv(index=False, date_format='%Y-%m-%d')
+        baseline = time.perf_counter() - start
+        print(f"{'workers':>8} {'seconds':>9} {'MiB/s':>8} {'speedup':>8} {'identical':>10}")
+        print(f"{'serial':>8} {baseline:9.2f} {size_mb / baseline:8.1f} {1.0:8.2f} {'yes':>10}")
+        for n in workers:
+            start = time.perf_counter()
+            out = aggregate_influd_parallel(path, workers=n).to_csv(index=False, date_format='%Y-%m-%d')
+            elapsed = time.perf_counter() - start
+            identical = 'yes' if out == reference else 'NO'
+            print(f"{n:>8} {elapsed:9.2f} {size_mb / elapsed:8.1f} {baseline / elapsed:8.2f} {identical:>10}")
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the multi‑process synthetic data generator of ``dtn_repl``.
+
+Draws the treatments and latent classes of the synthetic twin dataset
+with :func:`dtn_repl.datasets.draw_parallel` for an increasing number of
+worker processes and reports the wall time, the throughput and the
+speedup relative to one process, checking that every run produces
+bit‑identical arrays.  The time of the complete
+:class:`dtn_repl.datasets.ParallelSyntheticDataset` (which derives the
+outcomes and builds the data frames in the parent) is reported for the
+largest worker count.
+
+Example usage (from the repository root):
+
+```
+python benchmarks/bench_synthetic_parallel.py --samples 50000000
+python benchmarks/bench_synthetic_parallel.py --workers 1 2 4 8 16 --shard-size 500000
+```
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                                'metodologias', 'deep_twin_networks'))
+
+from dtn_repl.datasets import DEFAULT_SHARD_SIZE, ParallelSyntheticDataset, draw_parallel  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark parallel synthetic data generation")
+    parser.add_argument('--samples', type=int, default=20_000_000, help='Number of samples')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Rows per child seed')
+    parser.add_argument('--u-distribution', type=str, default='normal', choices=['normal', 'uniform'],
+                        help='Latent variable distribution')
+    parser.add_argument('--workers', type=int, nargs='+', default=None,
+                        help='Worker counts to benchmark (default: powers of two up to the core count)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace) -> None:
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+    latent = {'u_distribution': args.u_distribution}
+    print(f"{args.samples} samples in shards of {args.shard_size}, cores available: {cores}")
+    start = time.perf_counter()
+    ref_x, ref_u, _ = draw_parallel(args.samples, latent=latent, seed=args.seed, workers=1,
+                                    shard_size=args.shard_size)
+    baseline = time.perf_counter() - start
+    print(f"{'workers':>8} {'seconds':>9} {'Msamples/s':>11} {'speedup':>8} {'identical':>10}")
+    print(f"{1:>8} {baseline:9.2f} {args.samples / baseline / 1e6:11.1f} {1.0:8.2f} {'yes':>10}")
+    for n in workers:
+        if n == 1:
+            continue
+        start = time.perf_counter()
+        X, U_y, _ = draw_parallel(args.samples, latent=latent, seed=args.seed, workers=n,
+                                  shard_size=args.shard_size)
+        elapsed = time.perf_counter() - start
+        identical = 'yes' if np.array_equal(X, ref_x) and np.array_equal(U_y, ref_u) else 'NO'
+        print(f"{n:>8} {elapsed:9.2f} {args.samples / elapsed / 1e6:11.1f} {baseline / elapsed:8.2f} "
+              f"{identical:>10}")
+    start = time.perf_counter()
+    ParallelSyntheticDataset(n_samples=args.samples, u_distribution=args.u_distribution, seed=args.seed,
+                             workers=max(workers), shard_size=args.shard_size)
+    print(f"ParallelSyntheticDataset with {max(workers)} workers (including the data frames): "
+          f"{time.perf_counter() - start:.2f} s")
+
+
+if __name__ == '__main__':
+    main(parse_args())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Memory report for naive vs. typed INFLUD loading.
+
+Loads the same INFLUD file twice, once with ``pandas`` defaults and once
+with the dictionary‑driven schema of :mod:`rca_sus.schema`, and reports
+the in‑memory size of both frames (``memory_usage(deep=True)``), the
+load times and the columns with the largest savings.  When no file is
+given a synthetic INFLUD‑like CSV is generated in a temporary directory.
+
+Example usage (from the repository root):
+
+```
+python benchmarks/bench_typed_memory.py --rows 500000
+python benchmarks/bench_typed_memory.py --source data/SIVEP/2020/INFLUD20-26-06-2025.zip
+```
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from rca_sus.ingest import DEFAULT_ENCODING, DEFAULT_SEP, open_influd  # noqa: E402
+from rca_sus.schema import load_influd_typed  # noqa: E402
+from synthetic_influd import write_synthetic_influd  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare memory of naive and typed INFLUD loading")
+    parser.add_argument('--source', type=str, default=None,
+                        help='INFLUD CSV or ZIP archive (default: generate a synthetic file)')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows of the synthetic file')
+    parser.add_argument('--top', type=int, default=15, help='Number of columns listed in the report')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic file')
+    return parser.parse_args()
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.source
+        if path is None:
+            path = os.path.join(tmp, 'INFLUD20-synthetic.csv')
+            write_synthetic_influd(path, args.rows, seed=args.seed)
+        start = time.perf_counter()
+        with open_influd(path) as fh:
+            naive = pd.read_csv(fh, sep=DEFAULT_SEP, encoding=DEFAULT_ENCODING, low_memory=False)
+        naive_seconds = time.perf_counter() - start
+        naive_bytes = naive.memory_usage(deep=True, index=False)
+        naive_dtypes = naive.dtypes.astype(str)
+        del naive
+        start = time.perf_counter()
+        typed = load_influd_typed(path)
+        typed_seconds = time.perf_counter() - start
+        typed_bytes = typed.memory_usage(deep=True, index=False)
+    mib = 2**20
+    print(f"Rows: {len(typed)}, columns: {typed.shape[1]}")
+    print(f"{'loader':>8} {'MiB':>10} {'bytes/row':>10} {'seconds':>9}")
+    for name, usage, seconds in (('naive', naive_bytes, naive_seconds), ('typed', typed_bytes, typed_seconds)):
+        print(f"{name:>8} {usage.sum() / mib:10.1f} {usage.sum() / max(len(typed), 1):10.1f} {seconds:9.2f}")
+    print(f"Reduction: {naive_bytes.sum() / typed_bytes.sum():.1f}x")
+    report = pd.DataFrame({
+        'naive_dtype': naive_dtypes,
+        'typed_dtype': typed.dtypes.astype(str),
+        'naive_MiB': naive_bytes / mib,
+        'typed_MiB': typed_bytes / mib,
+    })
+    report['saved_MiB'] = report['naive_MiB'] - report['typed_MiB']
+    report = report.sort_values('saved_MiB', ascending=False)
+    print(f"\nTop {args.top} columns by memory saved:")
+    print(report.head(args.top).to_string(float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == '__main__':
+    main(parse_args())
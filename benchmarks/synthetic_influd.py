@@ -0,0 +1,58 @@
+"""
+Synthetic INFLUD‑like CSV files for the benchmarks.
+
+The real microdata are too large to ship with the benchmarks, so this
+module writes files with the same separator, date format and column
+names as the OpenDataSUS exports.  Coded fields draw their values from
+the data dictionary tables in :mod:`rca_sus.schema`, with a share of
+empty cells, so that memory and parsing costs are representative.
+"""
+
+import numpy as np
+import pandas as pd
+
+from rca_sus.schema import INTEGER_FIELDS, LABELS, NAME_FIELDS, UF_FIELDS
+from rca_sus.ufs import UF_IBGE_CODES, UFS
+
+DATE_FIELDS = ['DT_NOTIFIC', 'DT_SIN_PRI', 'DT_NASC', 'DT_INTERNA', 'DT_EVOLUCA', 'DT_ENCERRA', 'DT_DIGITA']
+TEXT_FIELDS = ['OUTRO_DES', 'MORB_DESC', 'OBSERVA']
+
+
+def _with_missing(rng: np.random.Generator, values: np.ndarray, share: float) -> np.ndarray:
+    values = values.astype(object)
+    values[rng.random(len(values)) < share] = ''
+    return values
+
+
+def synthetic_influd(rows: int, year: int = 2020, seed: int = 0, filler_columns: int = 0) -> pd.DataFrame:
+    """Return a frame of raw INFLUD‑like strings."""
+    rng = np.random.default_rng(seed)
+    onset = pd.Timestamp(f'{year}-01-01') + pd.to_timedelta(rng.integers(0, 366, rows), unit='D')
+    uf = np.asarray(UFS)[rng.integers(0, len(UFS), rows)]
+    mun = np.array([UF_IBGE_CODES[u] * 10000 for u in uf]) + rng.integers(0, 500, rows)
+    data = {'NU_NOTIFIC': rng.integers(10**10, 10**11, rows).astype(str)}
+    for i, field in enumerate(DATE_FIELDS):
+        dates = onset + pd.to_timedelta(rng.integers(0, 30, rows) * (i > 1), unit='D')
+        data[field] = _with_missing(rng, dates.strftime('%Y-%m-%d').to_numpy(), 0.1 * (i > 1))
+    for field in UF_FIELDS:
+        data[field] = uf
+    for field, dtype in INTEGER_FIELDS.items():
+        if field.startswith('CO_') and field != 'CO_PAIS':
+            data[field] = _with_missing(rng, mun.astype(str), 0.05)
+        else:
+            data[field] = _with_missing(rng, rng.integers(1, 53 if 'SEM' in field else 100, rows).astype(str), 0.02)
+    for field in NAME_FIELDS:
+        data[field] = np.char.add('MUNICIPIO ', (mun % 10000).astype(str))
+    for field, labels in LABELS.items():
+        codes = np.asarray([str(c) for c in labels])
+        data[field] = _with_missing(rng, codes[rng.integers(0, len(codes), rows)], 0.3)
+    for field in TEXT_FIELDS:
+        data[field] = _with_missing(rng, np.char.add('texto livre ', rng.integers(0, 1000, rows).astype(str)), 0.9)
+    for i in range(filler_columns):
+        data[f'COL_{i:02d}'] = rng.integers(1, 10, rows)
+    return pd.DataFrame(data)
+
+
+def write_synthetic_influd(path: str, rows: int, year: int = 2020, seed: int = 0, filler_columns: int = 0) -> None:
+    """Write a synthetic INFLUD CSV with the OpenDataSUS separator."""
+    synthetic_influd(rows, year=year, seed=seed, filler_columns=filler_columns).to_csv(path, sep=';', index=False)
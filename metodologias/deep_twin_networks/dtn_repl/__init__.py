@@ -19,8 +19,10 @@ The goal of this package is two‑fold:
    strategies can be plugged in.  While the original work relies on
    TensorFlow Lattice layers to enforce monotonicity, this package
    implements a lightweight logistic–regression‑based strategy by
-   default.  Developers can add their own strategies (e.g. deep
-   neural networks, monotonic models) by subclassing
+   default, and a NumPy monotonic lattice network
+   (:class:`dtn_repl.models.LatticeTwinModel`) that needs neither
+   TensorFlow nor a GPU.  Developers can add their own strategies
+   (e.g. deep neural networks) by subclassing
    :class:`dtn_repl.models.BaseTwinModel`.
 
 The package is self contained and depends only on `numpy`, `pandas`
@@ -31,9 +33,20 @@ See the module docstrings and the README in the project root for
 guidance on usage.
 """
 
-from .datasets import SyntheticDataset, TwinDataset, KenyanDataset, load_dataset
+from .datasets import (
+    ArraySplit,
+    SyntheticDataset,
+    SyntheticStream,
+    ParallelSyntheticDataset,
+    TwinDataset,
+    KenyanDataset,
+    FeatureDataset,
+    load_dataset,
+)
 from .models import (
     BaseTwinModel,
+    CountTwinModel,
+    LatticeTwinModel,
     LogisticTwinModel,
     SLearnerTwinModel,
     TLearnerTwinModel,
@@ -43,11 +56,17 @@ from .train import Trainer
 from .probcause import ProbabilityOfCausation
 
 __all__ = [
+    "ArraySplit",
     "SyntheticDataset",
+    "SyntheticStream",
+    "ParallelSyntheticDataset",
     "TwinDataset",
     "KenyanDataset",
+    "FeatureDataset",
     "load_dataset",
     "BaseTwinModel",
+    "CountTwinModel",
+    "LatticeTwinModel",
     "LogisticTwinModel",
     "SLearnerTwinModel",
     "TLearnerTwinModel",
@@ -11,7 +11,9 @@ respectively.  Additional covariates for real world data sets may be
 included as extra columns.
 
 The synthetic dataset reproduces the generative process described in
-Section 4 of the paper.  For binary treatment variables the latent
+Section 4 of the paper; `SyntheticStream` yields the same rows in
+fixed‑size batches for datasets too large to hold in memory, and
+`ParallelSyntheticDataset` generates it across a process pool.  For binary treatment variables the latent
 class ``U_y`` takes three possible values (0, 1, 2) with
 interpretations given in the paper.  When ``U_y = 0``, the outcome is
 equal to the treatment; when ``U_y = 2`` the outcome is always 1.
@@ -19,6 +21,15 @@ Samples with ``U_y = 1`` are sufficiency examples where treatment has
 no effect on the outcome【671066552242396†L164-L169】.  See the paper or
 the original code for more details.
 
+`ArraySplit` is an alternative to `DatasetSplit` holding each split as
+one column‑major NumPy array of a compact dtype (``int8`` for the 0/1/2
+synthetic columns, ``float32`` otherwise) with the features first and
+the outcomes last, so that the feature and outcome blocks are views of
+it; the synthetic generators build it directly with ``compact=True``.
+
+`FeatureDataset` reads the daily feature tables built by
+``python -m rca_sus features`` (SRAG cases, weather and their lags).
+
 `TwinDataset` and `KenyanDataset` are skeletons demonstrating how to
 wrap external data.  They include download logic for the Twins data
 (from GANITE) and placeholders for the Kenyan water dataset.  If
@@ -30,10 +41,12 @@ from __future__ import annotations
 
 import os
 import gzip
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import io
 import urllib.request
 from dataclasses import dataclass
-from typing import Tuple, Dict, Any, Optional
+from typing import Tuple, Dict, Any, Iterator, List, Optional, Union
 
 import numpy as np
 import pandas as pd
@@ -60,6 +73,177 @@ class DatasetSplit:
     meta: Optional[Dict[str, Any]] = None
 
 
+#: Columns of the synthetic dataset, features first.
+SYNTHETIC_COLUMNS = ['X', 'U_y', 'X_prime', 'Y', 'Y_prime']
+
+
+@dataclass
+class ArraySplit:
+    """Array‑backed train and test splits with compact dtypes.
+
+    Each split is a two‑dimensional array whose columns are stored
+    contiguously (the synthetic generators slice the rows of one
+    column‑major block, so the split itself copies nothing) and are
+    labelled by ``columns``: the features first, then the outcome
+    columns (those starting with ``Y``).  :meth:`features`,
+    :meth:`targets` and :meth:`frames` return views of these arrays,
+    so handing them to a model copies nothing.
+
+    Attributes
+    ----------
+    columns : list of str
+        Column labels, outcomes last.
+    train : numpy.ndarray
+        Training rows, shape ``(n_train, len(columns))``.
+    test : numpy.ndarray
+        Test rows, shape ``(n_test, len(columns))``.
+    meta : dict
+        Metadata, as in :class:`DatasetSplit`.
+    """
+
+    columns: List[str]
+    train: np.ndarray
+    test: np.ndarray
+    meta: Optional[Dict[str, Any]] = None
+
+    def __post_init__(self) -> None:
+        self.columns = list(self.columns)
+        outcome = [c.startswith('Y') for c in self.columns]
+        self.n_features = outcome.index(True) if any(outcome) else len(self.columns)
+        if not all(outcome[self.n_features:]):
+            raise ValueError("The outcome columns (Y...) must come after the features.")
+        for part in (self.train, self.test):
+            if part.ndim != 2 or part.shape[1] != len(self.columns):
+                raise ValueError(f"Arrays must have shape (n, {len(self.columns)}); got {part.shape}.")
+
+    @classmethod
+    def from_split(cls, split: DatasetSplit, dtype: Optional[np.dtype] = None) -> 'ArraySplit':
+        """Convert a :class:`DatasetSplit`, choosing a compact dtype.
+
+        Without ``dtype`` the columns are stored as ``int8`` when every
+        value is an integer in ``[-128, 127]`` and as ``float32``
+        otherwise.
+        """
+        columns = ([c for c in split.train.columns if not c.startswith('Y')]
+                   + [c for c in split.train.columns if c.startswith('Y')])
+        if dtype is None:
+            dtype = np.float32
+            frames = [split.train[columns], split.test[columns]]
+            if all(pd.api.types.is_integer_dtype(t) or pd.api.types.is_bool_dtype(t)
+                   for frame in frames for t in frame.dtypes):
+                low = min((frame.min().min() for frame in frames if len(frame)), default=0)
+                high = max((frame.max().max() for frame in frames if len(frame)), default=0)
+                if -128 <= low and high <= 127:
+                    dtype = np.int8
+        return cls(columns,
+                   np.asfortranarray(split.train[columns].to_numpy(dtype=dtype)),
+                   np.asfortranarray(split.test[columns].to_numpy(dtype=dtype)),
+                   split.meta)
+
+    def _part(self, part: str) -> np.ndarray:
+        if part not in ('train', 'test'):
+            raise ValueError(f"Unknown part {part!r}; expected 'train' or 'test'.")
+        return self.train if part == 'train' else self.test
+
+    @property
+    def feature_columns(self) -> List[str]:
+        return self.columns[:self.n_features]
+
+    @property
+    def target_columns(self) -> List[str]:
+        return self.columns[self.n_features:]
+
+    def features(self, part: str = 'train') -> np.ndarray:
+        """View of the feature columns of ``part`` (``'train'`` or ``'test'``)."""
+        return self._part(part)[:, :self.n_features]
+
+    def targets(self, part: str = 'train') -> np.ndarray:
+        """View of the outcome columns of ``part``."""
+        return self._part(part)[:, self.n_features:]
+
+    def frames(self, part: str = 'train') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Feature and outcome data frames of ``part`` sharing the memory of the arrays."""
+        return (pd.DataFrame(self.features(part), columns=self.feature_columns, copy=False),
+                pd.DataFrame(self.targets(part), columns=self.target_columns, copy=False))
+
+    def to_split(self) -> DatasetSplit:
+        """Copy back into a :class:`DatasetSplit` of ``int64``/``float64`` columns."""
+        dtype = np.int64 if np.issubdtype(self.train.dtype, np.integer) else np.float64
+        return DatasetSplit(train=pd.DataFrame(self.train.astype(dtype), columns=self.columns),
+                            test=pd.DataFrame(self.test.astype(dtype), columns=self.columns),
+                            meta=self.meta)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the two splits."""
+        return self.train.nbytes + self.test.nbytes
+
+
+def draw_latent(rng: np.random.Generator,
+                size: int,
+                u_distribution: str = 'normal',
+                mu: float = 1.0,
+                sigma: float = 2/3,
+                low: int = 0,
+                high: int = 3) -> np.ndarray:
+    """Draw ``size`` latent classes ``U_y`` (see :class:`SyntheticDataset`)."""
+    if u_distribution == 'normal':
+        latent = rng.normal(loc=mu, scale=sigma, size=size)
+        # bin into three categories; use np.digitize with bins at 1 and 2
+        return np.digitize(latent, bins=[1, 2])
+    if u_distribution == 'uniform':
+        return rng.integers(low=low, high=high, size=size)
+    raise NotImplementedError(
+        f"Unsupported u_distribution: {u_distribution}; choose 'normal' or 'uniform'.")
+
+
+def synthetic_frame(X: np.ndarray, U_y: np.ndarray) -> pd.DataFrame:
+    """Assemble the synthetic columns from treatments and latent classes.
+
+    The counterfactual treatment is ``1 - X``; the outcomes follow the
+    latent class: ``Y = X`` and ``Y_prime = X_prime`` when ``U_y = 0``,
+    both are 0 when ``U_y = 1`` and both are 1 when ``U_y = 2``.
+    """
+    X_prime = 1 - X  # flip treatment for counterfactual
+    Y = np.zeros(len(X), dtype=int)
+    Y_prime = np.zeros(len(X), dtype=int)
+    # when U_y == 0: Y = X, Y_prime = 1-X
+    idx0 = np.where(U_y == 0)[0]
+    Y[idx0] = X[idx0]
+    Y_prime[idx0] = X_prime[idx0]
+    # when U_y == 2: outcomes are 1 regardless of treatment
+    idx2 = np.where(U_y == 2)[0]
+    Y[idx2] = 1
+    Y_prime[idx2] = 1
+    # when U_y == 1 the outcomes stay 0: treatment has no effect
+    return pd.DataFrame({
+        'X': X,
+        'U_y': U_y,
+        'X_prime': X_prime,
+        'Y': Y,
+        'Y_prime': Y_prime,
+    })
+
+
+def synthetic_block(X: np.ndarray, U_y: np.ndarray) -> np.ndarray:
+    """The columns of :func:`synthetic_frame` as one column‑major ``int8`` array."""
+    block = np.empty((len(X), len(SYNTHETIC_COLUMNS)), dtype=np.int8, order='F')
+    block[:, 0] = X
+    block[:, 1] = U_y
+    np.subtract(1, block[:, 0], out=block[:, 2])
+    block[:, 3] = np.where(block[:, 1] == 0, block[:, 0], block[:, 1] == 2)
+    block[:, 4] = np.where(block[:, 1] == 0, block[:, 2], block[:, 1] == 2)
+    return block
+
+
+def _compact_split(X: np.ndarray, U_y: np.ndarray, split: float, meta: Dict[str, Any]) -> ArraySplit:
+    if U_y.size and (U_y.min() < -128 or U_y.max() > 127):
+        raise ValueError("Latent classes do not fit in int8; use compact=False.")
+    block = synthetic_block(X, U_y)
+    split_idx = int(split * len(block))
+    return ArraySplit(SYNTHETIC_COLUMNS, block[:split_idx], block[split_idx:], meta)
+
+
 class SyntheticDataset:
     """Synthetic dataset generator.
 
@@ -105,10 +289,14 @@ class SyntheticDataset:
     seed : int, optional
         Random seed for reproducibility.  If ``None``, a random seed
         will be drawn.
+    compact : bool, optional
+        Store the splits as an :class:`ArraySplit` of ``int8`` columns
+        (one eighth of the memory) instead of data frames.  Defaults to
+        ``False``.
 
     Returns
     -------
-    DatasetSplit
+    DatasetSplit or ArraySplit
         A dataclass containing train and test splits and metadata.
     """
 
@@ -123,6 +311,7 @@ class SyntheticDataset:
                  high: int = 3,
                  split: float = 0.8,
                  seed: Optional[int] = None,
+                 compact: bool = False,
                  **kwargs: Any) -> None:
         self.n_samples = n_samples
         self.x_distribution = x_distribution
@@ -157,42 +346,13 @@ class SyntheticDataset:
             raise NotImplementedError(
                 f"Unsupported x_distribution: {x_distribution}; only 'bernouli' is implemented.")
         X = rng.binomial(n=1, p=p, size=n_samples)
-        X_prime = 1 - X  # flip treatment for counterfactual
         # generate latent U_y
-        if u_distribution == 'normal':
-            latent = rng.normal(loc=mu, scale=sigma, size=n_samples)
-            # bin into three categories; use np.digitize with bins at 1 and 2
-            U_y = np.digitize(latent, bins=[1, 2])
-        elif u_distribution == 'uniform':
-            U_y = rng.integers(low=low, high=high, size=n_samples)
-        else:
-            raise NotImplementedError(
-                f"Unsupported u_distribution: {u_distribution}; choose 'normal' or 'uniform'.")
+        U_y = draw_latent(rng, n_samples, u_distribution, mu, sigma, low, high)
+        if compact:
+            self.data = _compact_split(X, U_y, split, self.meta)
+            return
         # generate outcomes Y and Y_prime according to latent class
-        Y = np.zeros(n_samples, dtype=int)
-        Y_prime = np.zeros(n_samples, dtype=int)
-        # when U_y == 0: Y = X, Y_prime = 1-X
-        idx0 = np.where(U_y == 0)[0]
-        Y[idx0] = X[idx0]
-        Y_prime[idx0] = X_prime[idx0]
-        # when U_y == 2: outcomes are 1 regardless of treatment
-        idx2 = np.where(U_y == 2)[0]
-        Y[idx2] = 1
-        Y_prime[idx2] = 1
-        # when U_y == 1: outcomes are independent of treatment (set to 0)
-        # In the original code this branch is implicit because arrays are
-        # initialised to zero.  We keep it explicit here for clarity.
-        idx1 = np.where(U_y == 1)[0]
-        Y[idx1] = 0
-        Y_prime[idx1] = 0
-        # assemble DataFrame
-        df = pd.DataFrame({
-            'X': X,
-            'U_y': U_y,
-            'X_prime': X_prime,
-            'Y': Y,
-            'Y_prime': Y_prime,
-        })
+        df = synthetic_frame(X, U_y)
         # split
         split_idx = int(split * n_samples)
         train_df = df.iloc[:split_idx].reset_index(drop=True)
@@ -204,6 +364,255 @@ class SyntheticDataset:
         return self.data
 
 
+class SyntheticStream:
+    """Synthetic dataset delivered in fixed‑size batches.
+
+    Takes the parameters of :class:`SyntheticDataset` plus
+    ``batch_size`` and yields the same rows, in the same order and with
+    the same ``seed``, as data frames of at most ``batch_size`` rows, so
+    that memory depends on the batch size rather than on
+    ``n_samples``.  The eager generator draws every treatment before the
+    first latent value; the stream follows two copies of the generator,
+    the second one advanced past the ``n_samples`` treatment draws in
+    batches.  Each call to :meth:`train_batches` or :meth:`test_batches`
+    replays the generators from the seed, so the batches can be read
+    several times (e.g. once per epoch).
+
+    Parameters
+    ----------
+    batch_size : int, optional
+        Number of rows per batch.  Defaults to 100 000.
+    **kwargs
+        Parameters of :class:`SyntheticDataset`.
+    """
+
+    def __init__(self,
+                 n_samples: int = 100_000,
+                 x_distribution: str = 'bernouli',
+                 u_distribution: str = 'normal',
+                 p: float = 0.5,
+                 mu: float = 1.0,
+                 sigma: float = 2/3,
+                 low: int = 0,
+                 high: int = 3,
+                 split: float = 0.8,
+                 seed: Optional[int] = None,
+                 batch_size: int = 100_000,
+                 **kwargs: Any) -> None:
+        if x_distribution != 'bernouli':
+            raise NotImplementedError(
+                f"Unsupported x_distribution: {x_distribution}; only 'bernouli' is implemented.")
+        if u_distribution not in ('normal', 'uniform'):
+            raise NotImplementedError(
+                f"Unsupported u_distribution: {u_distribution}; choose 'normal' or 'uniform'.")
+        if batch_size < 1:
+            raise ValueError("batch_size must be positive.")
+        self.n_samples = n_samples
+        self.p = p
+        self.latent = dict(u_distribution=u_distribution, mu=mu, sigma=sigma, low=low, high=high)
+        self.batch_size = batch_size
+        self.n_train = int(split * n_samples)
+        self.n_test = n_samples - self.n_train
+        self.meta = dict(kwargs)
+        self.meta.update({
+            'n_samples': n_samples,
+            'x_distribution': x_distribution,
+            'u_distribution': u_distribution,
+            'p': p,
+            'mu': mu,
+            'sigma': sigma,
+            'low': low,
+            'high': high,
+            'split': split,
+            'seed': seed,
+            'batch_size': batch_size,
+        })
+        # fix the seed now so that the train and test batches come from the same draw
+        if seed is None:
+            seed = np.random.randint(0, 2**32 - 1)
+        self.seed = seed
+
+    def _sizes(self, start: int, stop: int) -> Iterator[Tuple[int, int]]:
+        for lo in range(start, stop, self.batch_size):
+            yield lo, min(self.batch_size, stop - lo)
+
+    def _batches(self, start: int, stop: int) -> Iterator[pd.DataFrame]:
+        rng_x = np.random.default_rng(self.seed)
+        rng_u = np.random.default_rng(self.seed)
+        for _, size in self._sizes(0, self.n_samples):
+            rng_u.binomial(n=1, p=self.p, size=size)
+        for _, size in self._sizes(0, start):
+            rng_x.binomial(n=1, p=self.p, size=size)
+            draw_latent(rng_u, size, **self.latent)
+        for lo, size in self._sizes(start, stop):
+            X = rng_x.binomial(n=1, p=self.p, size=size)
+            U_y = draw_latent(rng_u, size, **self.latent)
+            batch = synthetic_frame(X, U_y)
+            batch.index = pd.RangeIndex(lo - start, lo - start + size)
+            yield batch
+
+    def train_batches(self) -> Iterator[pd.DataFrame]:
+        """Yield the training rows in batches."""
+        return self._batches(0, self.n_train)
+
+    def test_batches(self) -> Iterator[pd.DataFrame]:
+        """Yield the test rows in batches."""
+        return self._batches(self.n_train, self.n_samples)
+
+
+#: Rows drawn from each child seed by :class:`ParallelSyntheticDataset`.
+DEFAULT_SHARD_SIZE = 1_000_000
+
+
+def _draw_shard(seed: np.random.SeedSequence, size: int, p: float,
+                latent: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Treatments and latent classes of one shard, from its own generator."""
+    rng = np.random.default_rng(seed)
+    return rng.binomial(n=1, p=p, size=size), draw_latent(rng, size, **latent)
+
+
+def _fill_shard(task: Tuple[str, str, int, int, int, np.random.SeedSequence, float, Dict[str, Any]]) -> None:
+    """Draw one shard in a worker process into the shared output arrays."""
+    x_name, u_name, n_samples, start, size, seed, p, latent = task
+    x_shm = shared_memory.SharedMemory(name=x_name)
+    u_shm = shared_memory.SharedMemory(name=u_name)
+    try:
+        X = np.ndarray((n_samples,), dtype=np.int8, buffer=x_shm.buf)
+        U_y = np.ndarray((n_samples,), dtype=np.int8, buffer=u_shm.buf)
+        X[start:start + size], U_y[start:start + size] = _draw_shard(seed, size, p, latent)
+        del X, U_y
+    finally:
+        x_shm.close()
+        u_shm.close()
+
+
+def draw_parallel(n_samples: int,
+                  p: float = 0.5,
+                  latent: Optional[Dict[str, Any]] = None,
+                  seed: Optional[int] = None,
+                  workers: int = 1,
+                  shard_size: int = DEFAULT_SHARD_SIZE) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Draw the treatments and latent classes shard by shard.
+
+    Returns ``(X, U_y, entropy)``: two ``int8`` arrays of length
+    ``n_samples`` and the entropy of the root ``SeedSequence`` (equal to
+    ``seed`` when one is given).  See :class:`ParallelSyntheticDataset`.
+    """
+    latent = latent or {}
+    seed_seq = np.random.SeedSequence(seed)
+    starts = range(0, n_samples, shard_size)
+    shards = [(start, min(shard_size, n_samples - start), child)
+              for start, child in zip(starts, seed_seq.spawn(len(starts)))]
+    if workers == 1 or len(shards) <= 1:
+        X = np.empty(n_samples, dtype=np.int8)
+        U_y = np.empty(n_samples, dtype=np.int8)
+        for start, size, child in shards:
+            X[start:start + size], U_y[start:start + size] = _draw_shard(child, size, p, latent)
+        return X, U_y, seed_seq.entropy
+    x_shm = shared_memory.SharedMemory(create=True, size=n_samples)
+    u_shm = shared_memory.SharedMemory(create=True, size=n_samples)
+    try:
+        tasks = [(x_shm.name, u_shm.name, n_samples, start, size, child, p, latent)
+                 for start, size, child in shards]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_fill_shard, tasks))
+        X = np.ndarray((n_samples,), dtype=np.int8, buffer=x_shm.buf).copy()
+        U_y = np.ndarray((n_samples,), dtype=np.int8, buffer=u_shm.buf).copy()
+    finally:
+        x_shm.close()
+        u_shm.close()
+        x_shm.unlink()
+        u_shm.unlink()
+    return X, U_y, seed_seq.entropy
+
+
+class ParallelSyntheticDataset:
+    """Synthetic dataset generated across a process pool.
+
+    The ``n_samples`` rows are cut into shards of ``shard_size`` rows;
+    shard ``i`` is drawn from its own generator, seeded with the
+    ``i``‑th child spawned from ``np.random.SeedSequence(seed)``.  The
+    values of a row therefore depend only on ``seed``, ``shard_size``
+    and its position, and the dataset is bit‑identical for any number
+    of ``workers`` (including 1, which runs in the calling process).
+    Workers write the treatments and latent classes of their shards
+    straight into shared memory; the outcomes are then derived as in
+    :class:`SyntheticDataset`.
+
+    The child streams differ from the single stream of
+    :class:`SyntheticDataset`, so both classes produce different rows
+    (with the same distribution) for the same seed.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Number of processes.  Defaults to the number of CPUs.
+    shard_size : int, optional
+        Rows per child seed.  Defaults to :data:`DEFAULT_SHARD_SIZE`.
+    **kwargs
+        Parameters of :class:`SyntheticDataset` (including
+        ``compact``).  When ``seed`` is ``None`` fresh entropy is drawn
+        and recorded in the metadata.
+    """
+
+    def __init__(self,
+                 n_samples: int = 100_000,
+                 x_distribution: str = 'bernouli',
+                 u_distribution: str = 'normal',
+                 p: float = 0.5,
+                 mu: float = 1.0,
+                 sigma: float = 2/3,
+                 low: int = 0,
+                 high: int = 3,
+                 split: float = 0.8,
+                 seed: Optional[int] = None,
+                 workers: Optional[int] = None,
+                 shard_size: int = DEFAULT_SHARD_SIZE,
+                 compact: bool = False,
+                 **kwargs: Any) -> None:
+        if x_distribution != 'bernouli':
+            raise NotImplementedError(
+                f"Unsupported x_distribution: {x_distribution}; only 'bernouli' is implemented.")
+        if u_distribution not in ('normal', 'uniform'):
+            raise NotImplementedError(
+                f"Unsupported u_distribution: {u_distribution}; choose 'normal' or 'uniform'.")
+        if u_distribution == 'uniform' and not (-128 <= low and high <= 128):
+            raise ValueError("Uniform latent classes must lie in [-128, 128).")
+        if shard_size < 1:
+            raise ValueError("shard_size must be positive.")
+        self.workers = workers or os.cpu_count() or 1
+        latent = dict(u_distribution=u_distribution, mu=mu, sigma=sigma, low=low, high=high)
+        X, U_y, self.seed = draw_parallel(n_samples, p, latent, seed, self.workers, shard_size)
+        self.meta = dict(kwargs)
+        self.meta.update({
+            'n_samples': n_samples,
+            'x_distribution': x_distribution,
+            'u_distribution': u_distribution,
+            'p': p,
+            'mu': mu,
+            'sigma': sigma,
+            'low': low,
+            'high': high,
+            'split': split,
+            'seed': self.seed,
+            'shard_size': shard_size,
+            'workers': self.workers,
+        })
+        if compact:
+            self.data = _compact_split(X, U_y, split, self.meta)
+            return
+        df = synthetic_frame(X.astype(np.int64), U_y.astype(np.int64))
+        split_idx = int(split * n_samples)
+        self.data = DatasetSplit(
+            train=df.iloc[:split_idx].reset_index(drop=True),
+            test=df.iloc[split_idx:].reset_index(drop=True),
+            meta=self.meta)
+
+    def get_splits(self) -> DatasetSplit:
+        """Return train/test splits and metadata."""
+        return self.data
+
+
 class TwinDataset:
     """Loader for the Twins dataset used in the GANITE paper.
 
@@ -323,21 +732,54 @@ class KenyanDataset:
         return self.data
 
 
-def load_dataset(name: str, **kwargs: Any) -> DatasetSplit:
+class FeatureDataset:
+    """Loader for feature tables built by the ``rca_sus`` pipeline.
+
+    ``python -m rca_sus features --treatment <feature>`` writes a table
+    (Parquet or CSV) with a binary treatment ``X``, numeric covariates
+    (lagged cases, weather, epidemiological week, static covariates) and
+    a binary outcome ``Y``, with rows in date order.  The first
+    ``split`` fraction of the rows is used for training and the rest
+    for testing, so that the models are evaluated on later days than
+    they were trained on.  Only the factual outcome is available, so use
+    the S‑, T‑ or X‑learner strategies.
+    """
+
+    def __init__(self, path: str, split: float = 0.8, seed: Optional[int] = None) -> None:
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Feature table {path} not found. Build it with 'python -m rca_sus features --treatment ...'.")
+        df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        missing = {'X', 'Y'} - set(df.columns)
+        if missing:
+            raise RuntimeError(f"Feature table {path} lacks the columns {sorted(missing)}.")
+        split_idx = int(split * len(df))
+        self.data = DatasetSplit(
+            train=df.iloc[:split_idx].reset_index(drop=True),
+            test=df.iloc[split_idx:].reset_index(drop=True),
+            meta={'source': path, 'split': split, 'seed': seed})
+
+    def get_splits(self) -> DatasetSplit:
+        return self.data
+
+
+def load_dataset(name: str, **kwargs: Any) -> Union[DatasetSplit, 'ArraySplit']:
     """Factory function to load a dataset by name.
 
     Parameters
     ----------
     name : str
         Name of the dataset.  Supported values are ``'synthetic'``,
-        ``'twins'`` and ``'kenyan'`` (case insensitive).
+        ``'twins'``, ``'kenyan'`` and ``'features'`` (case insensitive).
     **kwargs
         Additional keyword arguments passed to the dataset constructor.
 
     Returns
     -------
-    DatasetSplit
-        Train and test splits and optional metadata.
+    DatasetSplit or ArraySplit
+        Train and test splits and optional metadata (an
+        :class:`ArraySplit` for the synthetic dataset with
+        ``compact=True``).
     """
     name = name.lower()
     if name == 'synthetic':
@@ -349,6 +791,9 @@ def load_dataset(name: str, **kwargs: Any) -> DatasetSplit:
     elif name == 'kenyan':
         dataset = KenyanDataset(**kwargs)
         return dataset.get_splits()
+    elif name == 'features':
+        dataset = FeatureDataset(**kwargs)
+        return dataset.get_splits()
     else:
         raise ValueError(
-            f"Unknown dataset name '{name}'. Supported names: 'synthetic', 'twins', 'kenyan'.")
\ No newline at end of file
+            f"Unknown dataset name '{name}'. Supported names: 'synthetic', 'twins', 'kenyan', 'features'.")
\ No newline at end of file
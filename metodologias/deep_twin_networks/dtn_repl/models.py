@@ -7,17 +7,26 @@ ordering【671066552242396†L160-L169】.  In this replication we aim to
 provide an extensible base class and a simple baseline implementation
 using logistic regression.  Additional strategies can be implemented
 by subclassing :class:`BaseTwinModel` and overriding the
-``fit`` and ``predict_proba`` methods.
+``fit`` and ``predict_proba`` methods.  Strategies that can learn from
+one batch at a time also override ``partial_fit``, which the
+:class:`dtn_repl.train.Trainer` uses for streamed datasets.
+
+When the treatment and covariates are discrete, :class:`CountTwinModel`
+estimates the outcome probabilities in closed form from contingency
+tables, without an iterative fit.  :class:`LatticeTwinModel` is a
+NumPy implementation of the monotonic lattice mechanism itself, trained
+by minibatch gradient descent.
 """
 
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
 
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.linear_model import LogisticRegression
 
 
@@ -75,6 +84,16 @@ class BaseTwinModel(ABC):
             length ``n_samples`` and values in ``[0, 1]``.
         """
 
+    def partial_fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'BaseTwinModel':
+        """Update the model with one batch of training data.
+
+        Takes the same arguments as :meth:`fit`.  Strategies that cannot
+        be trained incrementally raise ``NotImplementedError``.
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} cannot be trained incrementally; use a strategy "
+            "whose estimators support partial_fit.")
+
 
 class LogisticTwinModel(BaseTwinModel):
     """Baseline twin model using logistic regression.
@@ -90,13 +109,19 @@ class LogisticTwinModel(BaseTwinModel):
     the strategy pattern: other models can be implemented by
     subclassing :class:`BaseTwinModel` and replacing the two logistic
     regressions with alternative estimators.
+
+    ``base_estimator`` replaces the logistic regressions (each outcome
+    gets its own clone); with an estimator that implements
+    ``partial_fit``, such as ``SGDClassifier(loss='log_loss')``, the
+    model can be trained batch by batch.
     """
 
-    def __init__(self, **kwargs: Any) -> None:
+    def __init__(self, base_estimator: Any | None = None, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         # separate models for Y and Y'
-        self.model_y = LogisticRegression(max_iter=500)
-        self.model_y_prime = LogisticRegression(max_iter=500)
+        base_estimator = base_estimator if base_estimator is not None else LogisticRegression(max_iter=500)
+        self.model_y = clone(base_estimator)
+        self.model_y_prime = clone(base_estimator)
 
     def fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'LogisticTwinModel':
         """
@@ -131,6 +156,24 @@ class LogisticTwinModel(BaseTwinModel):
         self.model_y_prime.fit(X_counter, y_counter)
         return self
 
+    def partial_fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'LogisticTwinModel':
+        """Update both outcome models with one batch (see :meth:`fit`)."""
+        if not hasattr(self.model_y, 'partial_fit'):
+            raise NotImplementedError(
+                f"{self.model_y.__class__.__name__} has no partial_fit; pass e.g. "
+                "base_estimator=SGDClassifier(loss='log_loss') to train LogisticTwinModel in batches.")
+        if 'Y_prime' not in y.columns or 'U_y' not in X.columns:
+            raise ValueError("LogisticTwinModel requires 'U_y' in X and both 'Y' and 'Y_prime' in y.")
+        X_factual = X[['X', 'U_y']].to_numpy()
+        if 'X_prime' in X.columns:
+            X_counter = X[['X_prime', 'U_y']].to_numpy()
+        else:
+            X_counter = np.stack([(1 - X['X']).to_numpy(), X['U_y'].to_numpy()], axis=1)
+        classes = np.array([0, 1])
+        self.model_y.partial_fit(X_factual, y['Y'].astype(int).to_numpy(), classes=classes)
+        self.model_y_prime.partial_fit(X_counter, y['Y_prime'].astype(int).to_numpy(), classes=classes)
+        return self
+
     def predict_proba(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         # compute features for factual outcome
         if 'U_y' not in X.columns:
@@ -177,21 +220,34 @@ class SLearnerTwinModel(BaseTwinModel):
         self.feature_cols = feature_cols
         return self
 
+    def partial_fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'SLearnerTwinModel':
+        """Update the model with one batch; needs a ``base_estimator`` with ``partial_fit``."""
+        if not hasattr(self.model, 'partial_fit'):
+            raise NotImplementedError(
+                f"{self.model.__class__.__name__} has no partial_fit; pass a base_estimator such as "
+                "SGDClassifier(loss='log_loss') to train SLearnerTwinModel in batches.")
+        if 'Y' not in y.columns:
+            raise ValueError("SLearnerTwinModel requires column 'Y' in target dataframe.")
+        feature_cols = [col for col in X.columns if col != 'X_prime']
+        if getattr(self, 'feature_cols', feature_cols) != feature_cols:
+            raise ValueError("All batches must have the same feature columns.")
+        self.model.partial_fit(X[feature_cols].to_numpy(), y['Y'].astype(int).to_numpy(), classes=np.array([0, 1]))
+        self.feature_cols = feature_cols
+        return self
+
     def predict_proba(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         # ensure model is fitted
         # prepare feature matrix for factual treatment
         if not hasattr(self, 'feature_cols'):
             raise RuntimeError("Model not fitted. Call fit() first.")
-        # features excluding any X_prime column
-        X_copy = X.copy()
         # compute factual and counterfactual probabilities by toggling treatment
-        # actual treatment features
-        features_factual = X_copy[self.feature_cols].to_numpy()
-        # compute counterfactual features: set X=1-X
-        cf_df = X_copy.copy()
-        if 'X' in cf_df.columns:
-            cf_df['X'] = 1 - cf_df['X']
-        features_counter = cf_df[self.feature_cols].to_numpy()
+        # actual treatment features (excluding any X_prime column)
+        features_factual = X[self.feature_cols].to_numpy()
+        # compute counterfactual features: set X=1-X on a copy of the matrix only
+        features_counter = features_factual.copy()
+        if 'X' in self.feature_cols:
+            column = self.feature_cols.index('X')
+            features_counter[:, column] = 1 - features_counter[:, column]
         p_y = self.model.predict_proba(features_factual)[:, 1]
         p_y_prime = self.model.predict_proba(features_counter)[:, 1]
         return p_y, p_y_prime
@@ -356,3 +412,498 @@ class XLearnerTwinModel(BaseTwinModel):
             p_factual = y1_hat  # if treatment missing assume treated
             p_counter = y0_hat
         return p_factual, p_counter
+
+
+def _levels(values: np.ndarray, max_levels: int) -> Optional[np.ndarray]:
+    """Sorted distinct values of a column, or ``None`` if there are more than ``max_levels``."""
+    if values.dtype.kind == 'b':
+        values = values.view(np.uint8)
+    if values.dtype.kind in 'iu':
+        if not len(values):
+            return np.zeros(0, dtype=np.int64)
+        low, high = int(values.min()), int(values.max())
+        if high - low < max_levels:
+            # one counting pass instead of a sort
+            seen = np.bincount(np.subtract(values, low, dtype=np.intp), minlength=high - low + 1)
+            return np.flatnonzero(seen) + low
+    elif values.dtype.kind != 'f':
+        return None
+    # missing values of a float column collapse into one trailing NaN level
+    levels = np.unique(values)
+    return levels if len(levels) <= max_levels else None
+
+
+def _encode(values: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """Position of each value in ``levels``, ``-1`` where it is absent."""
+    if values.dtype.kind == 'b':
+        values = values.view(np.uint8)
+    if values.dtype.kind in 'iu' and values.dtype.itemsize <= 2 and levels.dtype.kind in 'iu':
+        # small integers: look every value up in a table over the whole dtype
+        info = np.iinfo(values.dtype)
+        positions = np.flatnonzero((levels >= info.min) & (levels <= info.max))
+        unsigned = np.dtype(f'u{values.dtype.itemsize}')
+        table = np.full(1 << (8 * values.dtype.itemsize), -1, dtype=np.intp)
+        table[levels[positions].astype(values.dtype).view(unsigned)] = positions
+        return table[values.view(unsigned)]
+    if not len(levels):
+        return np.full(len(values), -1, dtype=np.intp)
+    codes = np.minimum(np.searchsorted(levels, values), len(levels) - 1)
+    found = levels[codes] == values
+    if values.dtype.kind == 'f' and levels.dtype.kind == 'f':
+        found |= np.isnan(values) & np.isnan(levels[codes])
+    return np.where(found, codes, -1)
+
+
+class CountTwinModel(BaseTwinModel):
+    """Closed‑form twin model for discrete treatments and covariates.
+
+    When the treatment ``X`` and the covariates ``Z`` (every feature
+    other than ``X`` and ``X_prime``) take few distinct values, as
+    ``X`` ∈ {0, 1} and ``U_y`` ∈ {0, 1, 2} in the synthetic dataset, the
+    maximum‑likelihood estimate of P(Y=1 | X, Z) is the share of
+    positive outcomes in each cell of the contingency table of
+    ``(X, Z)``.  The table is built with one ``np.bincount`` over the
+    flattened cell index, so fitting takes a few vectorised passes over
+    the columns instead of an iterative solver.  Outcomes are binary
+    (any non‑zero value counts as positive).  Missing values (``NaN``)
+    of a float column form a level of their own.
+
+    ``Y_prime`` gets its own table over ``(X_prime, Z)`` when it is
+    given.  Otherwise (observational data) the counterfactual
+    probability is read from the factual table at the opposite
+    treatment, since the twin network shares one mechanism between the
+    factual and the counterfactual world.  Empty cells and values not
+    seen during training get the overall rate of the outcome.
+
+    :meth:`partial_fit` adds the counts of each batch to the tables, so
+    streamed training gives the same estimates as one :meth:`fit` on
+    all rows.  When a column has more than ``max_levels`` distinct
+    values or the table would exceed ``max_cells`` cells, :meth:`fit`
+    delegates to ``fallback`` instead (by default
+    :class:`LogisticTwinModel` when both outcomes are given and
+    :class:`SLearnerTwinModel` otherwise).
+
+    Parameters
+    ----------
+    alpha : float, optional
+        Pseudo‑count shrinking every cell towards the overall rate;
+        ``0`` (the default) gives the exact maximum‑likelihood
+        estimates.
+    max_levels : int, optional
+        Maximum number of distinct values per column.  Defaults to 256.
+    max_cells : int, optional
+        Maximum number of cells of a table.  Defaults to ``2**20``.
+    fallback : BaseTwinModel, optional
+        Model trained when the features are not discrete enough.
+    """
+
+    def __init__(self,
+                 alpha: float = 0.0,
+                 max_levels: int = 256,
+                 max_cells: int = 1 << 20,
+                 fallback: BaseTwinModel | None = None,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if alpha < 0:
+            raise ValueError("alpha must be non-negative.")
+        self.alpha = alpha
+        self.max_levels = max_levels
+        self.max_cells = max_cells
+        self.fallback = fallback
+        self._reset()
+
+    def _reset(self) -> None:
+        # covariate columns Z, then the levels of the treatment and of each covariate
+        self.feature_cols: Optional[List[str]] = None
+        self.levels_: List[np.ndarray] = []
+        # (rows, positive outcomes) per cell, keyed by outcome
+        self.counts_: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.fallback_: Optional[BaseTwinModel] = None
+
+    @staticmethod
+    def _check(X: pd.DataFrame, y: pd.DataFrame) -> None:
+        if 'Y' not in y.columns:
+            raise ValueError("CountTwinModel requires column 'Y' in target dataframe.")
+        if 'X' not in X.columns:
+            raise ValueError("CountTwinModel requires treatment column 'X' in feature dataframe.")
+
+    def _grow(self, X: pd.DataFrame, columns: List[str]) -> Optional[List[np.ndarray]]:
+        """Levels after adding those of ``X``; ``None`` when the table would be too large."""
+        treatments = ['X', 'X_prime'] if 'X_prime' in X.columns else ['X']
+        groups = [treatments] + [[column] for column in columns]
+        levels = []
+        for j, group in enumerate(groups):
+            merged = self.levels_[j] if self.levels_ else np.zeros(0, dtype=np.int64)
+            for column in group:
+                found = _levels(X[column].to_numpy(), self.max_levels)
+                if found is None:
+                    return None
+                merged = np.union1d(merged, found)
+            if len(merged) > self.max_levels:
+                return None
+            levels.append(merged)
+        if int(np.prod([len(level) for level in levels], dtype=np.float64)) > self.max_cells:
+            return None
+        return levels
+
+    def _regrid(self, levels: List[np.ndarray]) -> None:
+        """Move the counts onto the cells of a larger set of levels."""
+        if all(len(old) == len(new) for old, new in zip(self.levels_, levels)):
+            self.levels_ = levels
+            return
+        shape = tuple(len(level) for level in levels)
+        index = np.ix_(*[np.searchsorted(new, old) for old, new in zip(self.levels_, levels)])
+        old_shape = tuple(len(level) for level in self.levels_)
+        for outcome, tables in self.counts_.items():
+            moved = []
+            for table in tables:
+                grid = np.zeros(shape, dtype=table.dtype)
+                grid[index] = table.reshape(old_shape)
+                moved.append(grid.ravel())
+            self.counts_[outcome] = tuple(moved)
+        self.levels_ = levels
+
+    def _covariate_cells(self, X: pd.DataFrame) -> np.ndarray:
+        """Flattened cell of ``Z`` for each row, ``-1`` where a value is unknown."""
+        cells = np.zeros(len(X), dtype=np.intp)
+        unknown = np.zeros(len(X), dtype=bool)
+        for column, levels in zip(self.feature_cols, self.levels_[1:]):
+            codes = _encode(X[column].to_numpy(), levels)
+            cells *= len(levels)
+            cells += codes
+            unknown |= codes < 0
+        cells[unknown] = -1
+        return cells
+
+    def _cells(self, treatment: np.ndarray, covariates: np.ndarray) -> np.ndarray:
+        """Flattened ``(X, *Z)`` cell for each row, ``-1`` where a value is unknown."""
+        codes = _encode(treatment, self.levels_[0])
+        n_covariate_cells = int(np.prod([len(level) for level in self.levels_[1:]], dtype=np.int64))
+        cells = codes * n_covariate_cells
+        cells += covariates
+        cells[(codes < 0) | (covariates < 0)] = -1
+        return cells
+
+    def _accumulate(self, X: pd.DataFrame, y: pd.DataFrame) -> 'CountTwinModel':
+        size = int(np.prod([len(level) for level in self.levels_], dtype=np.int64))
+        covariates = self._covariate_cells(X)
+        outcomes = {'Y': X['X'].to_numpy()}
+        if 'Y_prime' in y.columns:
+            outcomes['Y_prime'] = X['X_prime'].to_numpy() if 'X_prime' in X.columns else 1 - X['X'].to_numpy()
+        if self.counts_ and set(self.counts_) != set(outcomes):
+            raise ValueError("All batches must have the same outcome columns.")
+        for outcome, treatment in outcomes.items():
+            cells = self._cells(treatment, covariates)
+            if (cells < 0).any():
+                raise ValueError(f"Some values of the features of {outcome!r} are not levels of the "
+                                 "contingency table.")
+            # count (cell, outcome) pairs at once: negatives in even, positives in odd slots
+            cells *= 2
+            cells += y[outcome].to_numpy() != 0
+            pairs = np.bincount(cells, minlength=2 * size).reshape(size, 2)
+            rows, positives = pairs.sum(axis=1), pairs[:, 1].copy()
+            if outcome in self.counts_:
+                rows += self.counts_[outcome][0]
+                positives += self.counts_[outcome][1]
+            self.counts_[outcome] = (rows, positives)
+        return self
+
+    def _default_fallback(self, y: pd.DataFrame) -> BaseTwinModel:
+        if self.fallback is not None:
+            return self.fallback
+        return LogisticTwinModel() if 'Y_prime' in y.columns else SLearnerTwinModel()
+
+    def fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'CountTwinModel':
+        self._check(X, y)
+        self._reset()
+        columns = [col for col in X.columns if col not in ('X', 'X_prime')]
+        levels = self._grow(X, columns)
+        if levels is None:
+            # too many distinct values for a contingency table
+            self.fallback_ = self._default_fallback(y)
+            self.fallback_.fit(X, y)
+            return self
+        self.feature_cols, self.levels_ = columns, levels
+        return self._accumulate(X, y)
+
+    def partial_fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'CountTwinModel':
+        """Add the counts of one batch to the tables (see :meth:`fit`)."""
+        self._check(X, y)
+        columns = [col for col in X.columns if col not in ('X', 'X_prime')]
+        if self.feature_cols is not None and self.feature_cols != columns:
+            raise ValueError("All batches must have the same feature columns.")
+        levels = self._grow(X, columns)
+        if levels is None:
+            raise ValueError(
+                f"The features exceed {self.max_levels} levels per column or {self.max_cells} cells; "
+                "CountTwinModel can only be trained in batches on discrete features.")
+        self.feature_cols = columns
+        if self.counts_:
+            self._regrid(levels)
+        else:
+            self.levels_ = levels
+        return self._accumulate(X, y)
+
+    def rates(self, outcome: str = 'Y') -> np.ndarray:
+        """Estimated P(outcome=1) per cell, flattened in ``(X, *Z)`` order."""
+        rows, positives = self.counts_[outcome]
+        overall = positives.sum() / max(rows.sum(), 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rates = (positives + self.alpha * overall) / (rows + self.alpha)
+        return np.where(rows + self.alpha > 0, rates, overall)
+
+    def table(self, outcome: str = 'Y') -> pd.DataFrame:
+        """The contingency table of ``outcome`` with its estimated rates."""
+        if not self.counts_:
+            raise RuntimeError("Model not fitted with contingency tables.")
+        grid = pd.MultiIndex.from_product(self.levels_, names=['X' if outcome == 'Y' else 'X_prime']
+                                          + list(self.feature_cols))
+        rows, positives = self.counts_[outcome]
+        frame = pd.DataFrame({'n': rows, 'positives': positives, 'p': self.rates(outcome)},
+                             index=grid).reset_index()
+        return frame[frame['n'] > 0].reset_index(drop=True)
+
+    def predict_proba(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        if self.fallback_ is not None:
+            return self.fallback_.predict_proba(X)
+        if not self.counts_:
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        factual = X['X'].to_numpy()
+        counter = X['X_prime'].to_numpy() if 'X_prime' in X.columns else 1 - factual
+        covariates = self._covariate_cells(X)
+        probabilities = []
+        # without counterfactual labels both worlds share the factual table
+        for outcome, treatment in (('Y', factual), ('Y_prime' if 'Y_prime' in self.counts_ else 'Y', counter)):
+            rates = self.rates(outcome)
+            cells = self._cells(treatment, covariates)
+            overall = self.counts_[outcome][1].sum() / max(self.counts_[outcome][0].sum(), 1)
+            probabilities.append(np.where(cells >= 0, rates[cells], overall))
+        return probabilities[0], probabilities[1]
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    # tanh form: no overflow for large |z|
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+class LatticeTwinModel(BaseTwinModel):
+    """Monotonic lattice twin network implemented with NumPy.
+
+    The mechanism of the paper is a calibrated lattice constrained to be
+    monotonic in the treatment; this class learns one on the CPU without
+    TensorFlow.  Each covariate of ``Z`` (every feature other than ``X``
+    and ``X_prime``) is calibrated piecewise‑linearly onto
+    ``lattice_size`` keypoints (its distinct values when there are few,
+    its quantiles otherwise) and paired with the treatment in a
+    two‑dimensional lattice.  The logit of P(Y=1 | X, Z) is the sum of
+    the multilinear interpolations of these lattices, the ensemble
+    TensorFlow Lattice uses for many features; with one covariate, as
+    ``U_y`` in the synthetic dataset, it is a single full lattice.
+
+    The factual and counterfactual networks share their weights:
+    P(Y'=1 | X', Z) is the same mechanism evaluated at the
+    counterfactual treatment (``X_prime``, or ``1 - X``), and when
+    ``Y_prime`` is given its log‑loss is added to that of ``Y``.
+    Training runs Adam on minibatches; the gradient of a batch is one
+    ``np.bincount`` of the residuals over the lattice vertices.  After
+    every step the weights are projected onto the monotone set by
+    averaging each pair of vertices that differ only in the treatment
+    and violate the ordering, so the predictions are exactly monotonic.
+
+    Minibatches are contiguous row ranges visited in random order, so
+    the data are never shuffled in memory.  :meth:`partial_fit` makes
+    one pass over a batch of a stream, calibrating on the first batch.
+
+    Parameters
+    ----------
+    lattice_size : int, optional
+        Keypoints per covariate.  Defaults to 5.
+    monotonic : {'increasing', 'decreasing', None}, optional
+        Constraint on the effect of the treatment.  Defaults to
+        ``'increasing'``.
+    epochs : int, optional
+        Passes of :meth:`fit` over the data.  Defaults to 5.
+    batch_size : int, optional
+        Rows per gradient step.  Defaults to 4096.
+    learning_rate : float, optional
+        Adam step size.  Defaults to 0.05.
+    dtype : numpy dtype, optional
+        ``np.float64`` (default) or ``np.float32`` for the weights and
+        the per‑row arithmetic.
+    seed : int, optional
+        Seed of the minibatch order.
+    """
+
+    #: Rows per chunk when predicting.
+    predict_chunk = 1 << 18
+
+    def __init__(self,
+                 lattice_size: int = 5,
+                 monotonic: Optional[str] = 'increasing',
+                 epochs: int = 5,
+                 batch_size: int = 4096,
+                 learning_rate: float = 0.05,
+                 dtype: Any = np.float64,
+                 seed: Optional[int] = None,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if lattice_size < 2:
+            raise ValueError("lattice_size must be at least 2.")
+        if monotonic not in ('increasing', 'decreasing', None):
+            raise ValueError(f"Unknown monotonic {monotonic!r}; expected 'increasing', 'decreasing' or None.")
+        self.lattice_size = lattice_size
+        self.monotonic = monotonic
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError("dtype must be float32 or float64.")
+        self.rng = np.random.default_rng(seed)
+
+    # -- layout ----------------------------------------------------------
+    def _keypoints(self, values: np.ndarray) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        # calibrate on at most ~100k evenly spaced rows
+        sample = values[::max(len(values) // 100_000, 1)]
+        sample = sample[np.isfinite(sample)]
+        distinct = np.unique(sample)
+        if len(distinct) > self.lattice_size:
+            distinct = np.unique(np.quantile(sample, np.linspace(0.0, 1.0, self.lattice_size)))
+        if len(distinct) < 2:
+            distinct = np.array([distinct[0] if len(distinct) else 0.0, (distinct[0] if len(distinct) else 0.0) + 1.0])
+        return distinct
+
+    def _setup(self, X: pd.DataFrame) -> None:
+        self.feature_cols = [col for col in X.columns if col not in ('X', 'X_prime')]
+        treatments = [X['X'].to_numpy()] + ([X['X_prime'].to_numpy()] if 'X_prime' in X.columns else [])
+        low = min(float(values.min()) for values in treatments)
+        high = max(float(values.max()) for values in treatments)
+        self.treatment_range_ = (low, high if high > low else low + 1.0)
+        # without covariates a constant one gives a lattice over the treatment only
+        self.keypoints_ = [self._keypoints(X[col].to_numpy()) for col in self.feature_cols] or [np.array([0.0, 1.0])]
+        sizes = [len(keypoints) for keypoints in self.keypoints_]
+        self.offsets_ = np.cumsum([0] + [2 * size for size in sizes[:-1]])
+        # vertices with the lowest and the highest treatment of every lattice
+        self._low = np.concatenate([offset + np.arange(size) for offset, size in zip(self.offsets_, sizes)])
+        self._high = self._low + np.repeat(sizes, sizes)
+        n_weights = 2 * sum(sizes)
+        self.weights_ = np.zeros(n_weights, dtype=self.dtype)
+        self._moment = np.zeros(n_weights, dtype=self.dtype)
+        self._velocity = np.zeros(n_weights, dtype=self.dtype)
+        self.steps_ = 0
+
+    @property
+    def lattices(self) -> List[np.ndarray]:
+        """Vertex weights of each lattice, shape ``(2, n_keypoints)`` (treatment low, high)."""
+        return [self.weights_[offset:offset + 2 * len(keypoints)].reshape(2, -1)
+                for offset, keypoints in zip(self.offsets_, self.keypoints_)]
+
+    def _corners(self, treatment: np.ndarray, covariates: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vertex index and interpolation weight of the four corners of every lattice, per row."""
+        low, high = self.treatment_range_
+        t = np.clip((treatment - low) / (high - low), 0.0, 1.0).astype(self.dtype, copy=False)
+        if not self.feature_cols:
+            covariates = [np.zeros(len(treatment))]
+        index, weight = [], []
+        for values, keypoints, offset in zip(covariates, self.keypoints_, self.offsets_):
+            size = len(keypoints)
+            u = np.interp(values, keypoints, np.arange(size, dtype=np.float64)).astype(self.dtype, copy=False)
+            cell = np.minimum(u.astype(np.intp), size - 2)
+            f = u - cell
+            base = offset + cell
+            index += [base, base + 1, base + size, base + size + 1]
+            weight += [(1 - t) * (1 - f), (1 - t) * f, t * (1 - f), t * f]
+        return np.stack(index), np.stack(weight)
+
+    def _logits(self, index: np.ndarray, weight: np.ndarray) -> np.ndarray:
+        return np.einsum('ij,ij->j', self.weights_[index], weight)
+
+    # -- training --------------------------------------------------------
+    def _project(self) -> None:
+        """Average the pairs of vertices that break the monotonicity in the treatment."""
+        if self.monotonic is None:
+            return
+        low, high = self.weights_[self._low], self.weights_[self._high]
+        broken = high < low if self.monotonic == 'increasing' else high > low
+        mean = 0.5 * (low + high)
+        self.weights_[self._low] = np.where(broken, mean, low)
+        self.weights_[self._high] = np.where(broken, mean, high)
+
+    def _step(self, gradient: np.ndarray) -> None:
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        self.steps_ += 1
+        self._moment = beta1 * self._moment + (1 - beta1) * gradient
+        self._velocity = beta2 * self._velocity + (1 - beta2) * gradient * gradient
+        moment = self._moment / (1 - beta1 ** self.steps_)
+        velocity = self._velocity / (1 - beta2 ** self.steps_)
+        self.weights_ -= (self.learning_rate * moment / (np.sqrt(velocity) + eps)).astype(self.dtype, copy=False)
+        self._project()
+
+    @staticmethod
+    def _check_finite(X: pd.DataFrame) -> None:
+        """Reject missing or infinite features, which have no place on the lattice."""
+        for column in X.columns:
+            values = X[column].to_numpy()
+            if values.dtype.kind == 'f' and not np.isfinite(values).all():
+                raise ValueError(f"Column {column!r} has missing or infinite values; LatticeTwinModel "
+                                 "needs finite features (impute them first).")
+
+    def _check(self, X: pd.DataFrame, y: pd.DataFrame) -> None:
+        if 'Y' not in y.columns:
+            raise ValueError("LatticeTwinModel requires column 'Y' in target dataframe.")
+        if 'X' not in X.columns:
+            raise ValueError("LatticeTwinModel requires treatment column 'X' in feature dataframe.")
+        self._check_finite(X)
+
+    def _train(self, X: pd.DataFrame, y: pd.DataFrame, epochs: int) -> 'LatticeTwinModel':
+        if [col for col in X.columns if col not in ('X', 'X_prime')] != self.feature_cols:
+            raise ValueError("All batches must have the same feature columns.")
+        covariates = [X[col].to_numpy() for col in self.feature_cols]
+        # (treatment, outcome) of the factual and, when labelled, the counterfactual world
+        worlds = [(X['X'].to_numpy(), y['Y'].to_numpy())]
+        if 'Y_prime' in y.columns:
+            counter = X['X_prime'].to_numpy() if 'X_prime' in X.columns else 1 - X['X'].to_numpy()
+            worlds.append((counter, y['Y_prime'].to_numpy()))
+        starts = np.arange(0, len(X), self.batch_size)
+        n_weights = len(self.weights_)
+        for _ in range(epochs):
+            for start in self.rng.permutation(starts):
+                rows = slice(start, start + self.batch_size)
+                batch = [values[rows] for values in covariates]
+                gradient = np.zeros(n_weights, dtype=np.float64)
+                for treatment, outcome in worlds:
+                    index, weight = self._corners(treatment[rows], batch)
+                    residual = _sigmoid(self._logits(index, weight)) - outcome[rows]
+                    residual /= len(residual)
+                    gradient += np.bincount(index.ravel(), weights=(weight * residual).ravel(), minlength=n_weights)
+                self._step(gradient.astype(self.dtype, copy=False))
+        return self
+
+    def fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'LatticeTwinModel':
+        self._check(X, y)
+        self._setup(X)
+        return self._train(X, y, self.epochs)
+
+    def partial_fit(self, X: pd.DataFrame, y: pd.DataFrame) -> 'LatticeTwinModel':
+        """One pass of minibatch updates over a batch; the first batch also sets the calibration."""
+        self._check(X, y)
+        if not hasattr(self, 'weights_'):
+            self._setup(X)
+        return self._train(X, y, 1)
+
+    def predict_proba(self, X: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        if not hasattr(self, 'weights_'):
+            raise RuntimeError("Model not fitted. Call fit() first.")
+        self._check_finite(X)
+        factual = X['X'].to_numpy()
+        counter = X['X_prime'].to_numpy() if 'X_prime' in X.columns else 1 - factual
+        covariates = [X[col].to_numpy() for col in self.feature_cols]
+        p_y = np.empty(len(X), dtype=self.dtype)
+        p_y_prime = np.empty(len(X), dtype=self.dtype)
+        for start in range(0, len(X), self.predict_chunk):
+            rows = slice(start, start + self.predict_chunk)
+            batch = [values[rows] for values in covariates]
+            p_y[rows] = _sigmoid(self._logits(*self._corners(factual[rows], batch)))
+            p_y_prime[rows] = _sigmoid(self._logits(*self._corners(counter[rows], batch)))
+        return p_y, p_y_prime
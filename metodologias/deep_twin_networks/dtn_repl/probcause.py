@@ -75,4 +75,34 @@ def compute_probabilities_of_causation(p_y: np.ndarray, p_y_prime: np.ndarray) -
     pn = pn_vals.mean() / mean_p_y
     ps = ps_vals.mean() / mean_p_y
     pns = pns_vals.mean() / mean_p_y
-    return ProbabilityOfCausation(pn=pn, ps=ps, pns=pns)
\ No newline at end of file
+    return ProbabilityOfCausation(pn=pn, ps=ps, pns=pns)
+
+
+class CausationAccumulator:
+    """Running sums for :func:`compute_probabilities_of_causation` over batches.
+
+    Call :meth:`update` with the predictions of each batch and
+    :meth:`result` at the end; the estimates equal those computed on the
+    concatenated predictions.
+    """
+
+    def __init__(self) -> None:
+        self.n = 0
+        self.sum_p_y = 0.0
+        self.sum_pn = 0.0
+        self.sum_ps = 0.0
+        self.sum_pns = 0.0
+
+    def update(self, p_y: np.ndarray, p_y_prime: np.ndarray) -> None:
+        self.n += len(p_y)
+        self.sum_p_y += float(np.sum(p_y))
+        self.sum_pn += float(np.sum((1.0 - p_y_prime) * p_y))
+        self.sum_ps += float(np.sum((1.0 - p_y) * p_y_prime))
+        self.sum_pns += float(np.sum(p_y - p_y_prime))
+
+    def result(self) -> ProbabilityOfCausation:
+        n = max(self.n, 1)
+        mean_p_y = self.sum_p_y / n if self.sum_p_y > 0 else 1.0
+        return ProbabilityOfCausation(pn=self.sum_pn / n / mean_p_y,
+                                      ps=self.sum_ps / n / mean_p_y,
+                                      pns=self.sum_pns / n / mean_p_y)
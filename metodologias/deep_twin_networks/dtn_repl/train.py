@@ -6,6 +6,16 @@ end‑to‑end pipeline: loading a dataset, fitting a model, evaluating
 factual and counterfactual predictions, computing classification
 accuracies and estimating probabilities of causation.
 
+Datasets too large for memory can be given as a stream of batches
+(e.g. :class:`dtn_repl.datasets.SyntheticStream`): the trainer then
+fits the model with ``partial_fit`` one batch at a time and accumulates
+the predictions and metrics batch by batch, so memory depends on the
+batch size only.
+
+An :class:`dtn_repl.datasets.ArraySplit` is trained on data frames that
+share the memory of its compact arrays, so the splits are never copied
+into ``int64`` frames.
+
 The training logic is deliberately simple to make it clear how to
 extend or replace components.  For example, users can swap the
 ``LogisticTwinModel`` with a more sophisticated model class without
@@ -15,15 +25,15 @@ modifying the :class:`Trainer` implementation.
 from __future__ import annotations
 
 from dataclasses import dataclass, asdict
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score
 
-from .datasets import DatasetSplit
+from .datasets import ArraySplit, DatasetSplit, SyntheticStream
 from .models import BaseTwinModel
-from .probcause import compute_probabilities_of_causation, ProbabilityOfCausation
+from .probcause import CausationAccumulator, compute_probabilities_of_causation, ProbabilityOfCausation
 
 
 @dataclass
@@ -40,23 +50,30 @@ class Trainer:
 
     def __init__(self,
                  model: BaseTwinModel,
-                 dataset: DatasetSplit,
-                 threshold: float = 0.5) -> None:
+                 dataset: Union[DatasetSplit, ArraySplit, SyntheticStream],
+                 threshold: float = 0.5,
+                 epochs: int = 1) -> None:
         """
         Parameters
         ----------
         model : BaseTwinModel
             The twin model to train.  Must implement ``fit`` and
-            ``predict_proba``.
-        dataset : DatasetSplit
-            Object containing train and test splits.
+            ``predict_proba`` (and ``partial_fit`` for streamed
+            datasets).
+        dataset : DatasetSplit, ArraySplit or SyntheticStream
+            Object containing train and test splits, or a stream with
+            ``train_batches()`` and ``test_batches()``.
         threshold : float, optional
             Decision threshold for converting probabilities into binary
             predictions.  Defaults to 0.5.
+        epochs : int, optional
+            Passes over the training batches of a streamed dataset.
+            Defaults to 1.
         """
         self.model = model
         self.dataset = dataset
         self.threshold = threshold
+        self.epochs = epochs
 
     def run(self) -> TrainingResult:
         """Train the model and evaluate it on the test set.
@@ -67,14 +84,21 @@ class Trainer:
             Object containing accuracy metrics and probabilities of
             causation.
         """
-        # prepare training data: copy all available feature columns
-        X_train = self.dataset.train.drop(columns=[c for c in self.dataset.train.columns if c.startswith('Y')]).copy()
-        y_train = self.dataset.train[[c for c in self.dataset.train.columns if c.startswith('Y')]].copy()
+        if isinstance(self.dataset, ArraySplit):
+            # frames over views of the compact arrays: nothing is copied
+            X_train, y_train = self.dataset.frames('train')
+            X_test, y_test = self.dataset.frames('test')
+        elif isinstance(self.dataset, DatasetSplit):
+            # prepare training data: copy all available feature columns
+            X_train = self.dataset.train.drop(columns=[c for c in self.dataset.train.columns if c.startswith('Y')]).copy()
+            y_train = self.dataset.train[[c for c in self.dataset.train.columns if c.startswith('Y')]].copy()
+            X_test = self.dataset.test.drop(columns=[c for c in self.dataset.test.columns if c.startswith('Y')]).copy()
+            y_test = self.dataset.test[[c for c in self.dataset.test.columns if c.startswith('Y')]].copy()
+        else:
+            return self.run_batches()
         # fit model
         self.model.fit(X_train, y_train)
         # evaluate on test set
-        X_test = self.dataset.test.drop(columns=[c for c in self.dataset.test.columns if c.startswith('Y')]).copy()
-        y_test = self.dataset.test[[c for c in self.dataset.test.columns if c.startswith('Y')]].copy()
         p_y, p_y_prime = self.model.predict_proba(X_test)
         # binary predictions
         y_pred = (p_y >= self.threshold).astype(int)
@@ -98,4 +122,45 @@ class Trainer:
             counterfactual_accuracy=counterfactual_accuracy,
             prob_causation=prob_causation,
             metadata=meta
-        )
\ No newline at end of file
+        )
+
+    def run_batches(self) -> TrainingResult:
+        """Train and evaluate on a streamed dataset, one batch at a time.
+
+        The model is updated with ``partial_fit`` on every training
+        batch (``epochs`` times); test predictions are thresholded and
+        reduced to running sums per batch, never kept in full.
+        """
+        n_batches = 0
+        for _ in range(self.epochs):
+            for batch in self.dataset.train_batches():
+                outcomes = [c for c in batch.columns if c.startswith('Y')]
+                self.model.partial_fit(batch.drop(columns=outcomes), batch[outcomes])
+                n_batches += 1
+        n_test = factual_hits = counter_hits = 0
+        has_counterfactual = True
+        causation = CausationAccumulator()
+        for batch in self.dataset.test_batches():
+            outcomes = [c for c in batch.columns if c.startswith('Y')]
+            p_y, p_y_prime = self.model.predict_proba(batch.drop(columns=outcomes))
+            n_test += len(batch)
+            factual_hits += int(np.sum((p_y >= self.threshold).astype(int) == batch['Y'].astype(int).to_numpy()))
+            if 'Y_prime' in batch.columns:
+                counter_hits += int(np.sum((p_y_prime >= self.threshold).astype(int)
+                                           == batch['Y_prime'].astype(int).to_numpy()))
+            else:
+                has_counterfactual = False
+            causation.update(p_y, p_y_prime)
+        meta = {
+            'dataset_meta': self.dataset.meta,
+            'model_class': self.model.__class__.__name__,
+            'threshold': self.threshold,
+            'epochs': self.epochs,
+            'train_batches': n_batches,
+        }
+        return TrainingResult(
+            factual_accuracy=factual_hits / max(n_test, 1),
+            counterfactual_accuracy=counter_hits / max(n_test, 1) if has_counterfactual else None,
+            prob_causation=causation.result(),
+            metadata=meta
+        )
@@ -9,6 +9,9 @@ Example usage:
 
 ```
 python run_experiment.py --dataset synthetic --n_samples 50000
+python run_experiment.py --dataset synthetic --n_samples 100000000 --batch_size 1000000
+python run_experiment.py --dataset synthetic --n_samples 20000000 --workers 0
+python run_experiment.py --dataset synthetic --n_samples 50000000 --workers 0 --compact
 ```
 
 Use ``--help`` to see all available options.
@@ -19,16 +22,20 @@ import json
 from typing import Any, Dict
 
 from dtn_repl import (
+    ArraySplit,
     load_dataset,
     LogisticTwinModel,
+    SyntheticStream,
     Trainer,
 )
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run Deep Twin Network replication experiments")
-    parser.add_argument('--dataset', type=str, default='synthetic', choices=['synthetic', 'twins', 'kenyan'],
+    parser.add_argument('--dataset', type=str, default='synthetic', choices=['synthetic', 'twins', 'kenyan', 'features'],
                         help='Dataset to use')
+    parser.add_argument('--path', type=str, default=None,
+                        help='Feature table for --dataset features (built by python -m rca_sus features)')
     # synthetic dataset parameters
     parser.add_argument('--n_samples', type=int, default=100000,
                         help='Number of samples for synthetic dataset')
@@ -37,16 +44,39 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('--p', type=float, default=0.5, help='Probability of treatment = 1')
     parser.add_argument('--split', type=float, default=0.8, help='Train/test split fraction')
     parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--batch_size', type=int, default=None,
+                        help='Stream the synthetic dataset in batches of this size and train incrementally '
+                             '(logistic or slearner with SGD estimators, count or lattice)')
+    parser.add_argument('--epochs', type=int, default=1, help='Passes over the training batches when streaming')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Generate the synthetic dataset in shards across this many processes (0 = all '
+                             'cores); the rows depend on the seed only, not on the number of workers')
+    parser.add_argument('--compact', action='store_true',
+                        help='Keep the splits as compact int8/float32 arrays and train on views of them '
+                             '(one eighth of the memory of the synthetic data frames)')
     # model parameters (future extension)
     parser.add_argument('--threshold', type=float, default=0.5, help='Decision threshold for classification')
     parser.add_argument(
         '--model',
         type=str,
         default='logistic',
-        choices=['logistic', 'slearner', 'tlearner', 'xlearner'],
-        help='Type of twin model to use: logistic (synthetic only), slearner, tlearner or xlearner'
+        choices=['logistic', 'slearner', 'tlearner', 'xlearner', 'count', 'lattice'],
+        help='Type of twin model to use: logistic (synthetic only), slearner, tlearner, xlearner, count '
+             '(closed form, discrete features) or lattice (monotonic lattice network)'
     )
-    return parser.parse_args()
+    parser.add_argument('--float32', action='store_true',
+                        help='Train the lattice model in single precision')
+    args = parser.parse_args()
+    if args.batch_size is not None:
+        if args.dataset != 'synthetic':
+            parser.error('--batch_size is only available for --dataset synthetic')
+        if args.model not in ('logistic', 'slearner', 'count', 'lattice'):
+            parser.error('--batch_size needs an incremental model: logistic, slearner, count or lattice')
+    if args.workers is not None and (args.dataset != 'synthetic' or args.batch_size is not None):
+        parser.error('--workers is only available for --dataset synthetic without --batch_size')
+    if args.compact and args.batch_size is not None:
+        parser.error('--compact cannot be combined with --batch_size')
+    return args
 
 
 def main(args: argparse.Namespace) -> None:
@@ -59,31 +89,55 @@ def main(args: argparse.Namespace) -> None:
             p=args.p,
             split=args.split,
             seed=args.seed,
+            compact=args.compact,
         )
+    elif args.dataset == 'features':
+        dataset_kwargs = dict(path=args.path, split=args.split, seed=args.seed)
     else:
         dataset_kwargs = dict()
-    data = load_dataset(args.dataset, **dataset_kwargs)
-    # instantiate model (only logistic regression for now)
+    if args.batch_size is not None:
+        data = SyntheticStream(batch_size=args.batch_size, **dataset_kwargs)
+        from sklearn.linear_model import SGDClassifier
+        base_estimator = SGDClassifier(loss='log_loss', random_state=args.seed)
+    elif args.workers is not None:
+        from dtn_repl.datasets import ParallelSyntheticDataset
+        data = ParallelSyntheticDataset(workers=args.workers or None, **dataset_kwargs).get_splits()
+        base_estimator = None
+    else:
+        data = load_dataset(args.dataset, **dataset_kwargs)
+        base_estimator = None
+    if args.compact and not isinstance(data, ArraySplit):
+        data = ArraySplit.from_split(data)
     # select model strategy
     model_type = args.model.lower()
     if model_type == 'logistic':
-        model = LogisticTwinModel()
+        model = LogisticTwinModel(base_estimator=base_estimator)
     elif model_type == 'slearner':
         from dtn_repl.models import SLearnerTwinModel
-        model = SLearnerTwinModel()
+        model = SLearnerTwinModel(base_estimator=base_estimator)
     elif model_type == 'tlearner':
         from dtn_repl.models import TLearnerTwinModel
         model = TLearnerTwinModel()
     elif model_type == 'xlearner':
         from dtn_repl.models import XLearnerTwinModel
         model = XLearnerTwinModel()
+    elif model_type == 'count':
+        from dtn_repl.models import CountTwinModel
+        model = CountTwinModel()
+    elif model_type == 'lattice':
+        import numpy as np
+        from dtn_repl.models import LatticeTwinModel
+        model = LatticeTwinModel(dtype=np.float32 if args.float32 else np.float64, seed=args.seed)
     else:
         raise ValueError(f"Unknown model type {args.model}")
-    trainer = Trainer(model=model, dataset=data, threshold=args.threshold)
+    trainer = Trainer(model=model, dataset=data, threshold=args.threshold, epochs=args.epochs)
     result = trainer.run()
     # print results
     print("Factual accuracy:      {:.4f}".format(result.factual_accuracy))
-    print("Counterfactual accuracy:{:.4f}".format(result.counterfactual_accuracy))
+    if result.counterfactual_accuracy is None:
+        print("Counterfactual accuracy: n/a (no counterfactual labels)")
+    else:
+        print("Counterfactual accuracy:{:.4f}".format(result.counterfactual_accuracy))
     print("Probability of necessity       (PN):  {:.4f}".format(result.prob_causation.pn))
     print("Probability of sufficiency     (PS):  {:.4f}".format(result.prob_causation.ps))
     print("Probability of necessity& suff (PNS):{:.4f}".format(result.prob_causation.pns))
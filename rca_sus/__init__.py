@@ -0,0 +1,133 @@
+"""
+Data pipeline package for the RCA SUS project.
+
+This package collects the reusable pieces that turn the raw public
+datasets stored in ``data/`` into the tables consumed by the Streamlit
+application (``app.py``), the exploratory notebooks in ``analises/`` and
+the causal models in ``metodologias/``.
+
+The package is organised as follows:
+
+* :mod:`rca_sus.ingest` – aggregates the SIVEP‑Gripe INFLUD microdata
+  into per‑state, per‑day case counts directly from the (possibly
+  split) ZIP archives, without extracting the CSV to disk;
+* :mod:`rca_sus.parallel` – the same aggregation for extracted CSVs,
+  sharded into byte ranges across a process pool;
+* :mod:`rca_sus.columnar` – one‑time conversion of the microdata into a
+  Parquet dataset partitioned by year and state, with column projection
+  and predicate pushdown on read;
+* :mod:`rca_sus.schema` – typed, dictionary‑encoded loading of the
+  microdata driven by the official SIVEP‑Gripe data dictionary;
+* :mod:`rca_sus.cube` – a pre‑aggregated UF × day × age band × sex ×
+  outcome cube answering slice and roll‑up queries without the
+  microdata;
+* :mod:`rca_sus.municipal` – sparse (municipality × day) counts by
+  municipality of residence or notification, rolled up to states and
+  regions with a sparse membership matrix;
+* :mod:`rca_sus.incremental` – refreshes the stored aggregates and
+  cube to a new OpenDataSUS snapshot by applying only the records that
+  changed;
+* :mod:`rca_sus.tensor` – the memory‑mapped (UF × day × year) count
+  tensor shared by all processes, with a labelled accessor returning
+  views;
+* :mod:`rca_sus.timeseries` – dense (UF × day) count matrices with
+  prefix sums for interactive date‑range queries;
+* :mod:`rca_sus.incidence` – vectorised crude and age‑standardised
+  incidence rates with Poisson confidence intervals;
+* :mod:`rca_sus.population` – the multi‑year state population table
+  built from the IBGE estimate files;
+* :mod:`rca_sus.weather` – daily NASA POWER weather at the state
+  capitals, cached per location and date range;
+* :mod:`rca_sus.gridded` – area‑weighted state series from the POWER
+  regional grid through a cached sparse cell × state weight matrix;
+* :mod:`rca_sus.features` – lags, rolling means and epidemiological‑week
+  features of cases and weather on the dense (unit × day) grid, in the
+  layout of the ``dtn_repl`` models;
+* :mod:`rca_sus.lagcorr` – FFT lagged cross‑correlation of weather and
+  cases for all states, variables and lags, with batched permutation
+  p‑values;
+* :mod:`rca_sus.catalog` – the JSON catalog of derived datasets the app
+  reads at startup instead of scanning the data directory;
+* :mod:`rca_sus.build` – content‑addressed build of the derived tables,
+  rebuilding only the stale nodes of the graph declared in
+  :mod:`rca_sus.derived`;
+* :mod:`rca_sus.geometry` – topology‑preserving simplified state
+  boundaries at several tolerance levels, cached as GeoParquet;
+* :mod:`rca_sus.render_cache` – thread‑safe LRU cache of rendered
+  figures keyed by the content hashes of their inputs;
+* :mod:`rca_sus.ufs` – reference tables for the 27 federative units.
+
+Modules only depend on ``numpy`` and ``pandas`` at import time; heavier
+optional dependencies are imported lazily by the functions that need
+them.
+"""
+
+from .ingest import aggregate_influd, open_influd, write_aggregated
+from .parallel import aggregate_influd_parallel
+from .columnar import aggregate_parquet, convert_influd_to_parquet, read_sivep
+from .schema import apply_schema, decode, load_influd_typed
+from .cube import SivepCube, age_bands, build_cube
+from .municipal import MunicipalCounts, aggregate_influd_municipal
+from .incremental import diff_fingerprints, fingerprint_influd, refresh
+from .catalog import build_catalog, read_catalog, update_catalog
+from .timeseries import CountStore
+from .tensor import CountTensor, build_tensor
+from .incidence import age_standardized, incidence, incidence_frame
+from .population import build_population_table, load_population_table, population_series
+from .weather import load_weather_table, weather_table
+from .gridded import area_weights, gridded_weather_table
+from .features import FeatureSpec, build_features, twin_frame
+from .lagcorr import lagged_correlation, weather_case_correlation
+from .build import Node, build_tables
+from .geometry import build_geometry_cache, level_for_figure, load_geometry
+from .render_cache import RenderCache
+from .ufs import UFS
+
+__all__ = [
+    "CountStore",
+    "CountTensor",
+    "FeatureSpec",
+    "MunicipalCounts",
+    "Node",
+    "RenderCache",
+    "SivepCube",
+    "UFS",
+    "age_bands",
+    "age_standardized",
+    "aggregate_influd",
+    "aggregate_influd_municipal",
+    "aggregate_influd_parallel",
+    "aggregate_parquet",
+    "apply_schema",
+    "area_weights",
+    "build_catalog",
+    "build_cube",
+    "build_features",
+    "build_geometry_cache",
+    "build_population_table",
+    "build_tables",
+    "build_tensor",
+    "convert_influd_to_parquet",
+    "decode",
+    "diff_fingerprints",
+    "fingerprint_influd",
+    "gridded_weather_table",
+    "incidence",
+    "incidence_frame",
+    "lagged_correlation",
+    "level_for_figure",
+    "load_geometry",
+    "load_influd_typed",
+    "load_population_table",
+    "load_weather_table",
+    "open_influd",
+    "population_series",
+    "read_catalog",
+    "read_sivep",
+    "refresh",
+    "twin_frame",
+    "update_catalog",
+    "weather_case_correlation",
+    "weather_table",
+    "write_aggregated",
+]
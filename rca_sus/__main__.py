@@ -0,0 +1,48 @@
+"""
+Command‑line entry point for the RCA SUS data pipeline.
+
+Each sub‑command is implemented by the ``main`` function of one module
+of the package, which receives the remaining arguments::
+
+    python -m rca_sus aggregate data/SIVEP/2020/INFLUD20-26-06-2025.zip
+
+Run ``python -m rca_sus <command> --help`` for the options of a command.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Optional, Sequence
+
+#: Mapping of sub‑command names to the modules implementing them.
+COMMANDS = {
+    'aggregate': 'rca_sus.ingest',
+    'to-parquet': 'rca_sus.columnar',
+    'cube': 'rca_sus.cube',
+    'tensor': 'rca_sus.tensor',
+    'refresh': 'rca_sus.incremental',
+    'catalog': 'rca_sus.catalog',
+    'geometry': 'rca_sus.geometry',
+    'population': 'rca_sus.population',
+    'weather': 'rca_sus.weather',
+    'weather-grid': 'rca_sus.gridded',
+    'features': 'rca_sus.features',
+    'lagcorr': 'rca_sus.lagcorr',
+    'build': 'rca_sus.build',
+}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS:
+        print("usage: python -m rca_sus <command> [options]\n\ncommands:")
+        for name, module in COMMANDS.items():
+            print(f"  {name:<12} {module}")
+        raise SystemExit(0 if argv and argv[0] in ('-h', '--help') else 2)
+    module = importlib.import_module(COMMANDS[argv[0]])
+    module.main(argv[1:])
+
+
+if __name__ == '__main__':
+    main()
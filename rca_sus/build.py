@@ -0,0 +1,378 @@
+"""
+Content‑addressed build of the derived tables.
+
+The tables in ``data/derived/`` used to be written by hand from
+notebooks.  Here every table is a :class:`Node` of a small DAG that
+declares its output path, its input paths (raw files or the outputs of
+other nodes) and the function computing it; :data:`rca_sus.derived.NODES`
+lists the nodes of the repository.
+
+Each built node gets a key, the SHA‑256 of
+
+* the content hash of every input (``None`` for a missing one);
+* the source code of the transform and of the functions of its module
+  that it calls;
+* its parameters and ``version``.
+
+The keys are recorded with the hash of the output in a manifest,
+``data/derived/manifest.json``.  A node is stale when its output is
+missing or was edited by hand, or when its key changed, and only stale
+nodes (and the nodes downstream of the ones whose output then changes)
+are rebuilt.  For example, after ``python -m rca_sus refresh`` updates
+``aggregated_sivep_2019.csv``, only the tables computed from it are
+rebuilt.  Independent nodes run in parallel in a process pool.
+
+A node without a transform is a *source*: a table maintained by hand
+whose generation is not in the repository; it is only hashed.  A node
+whose inputs are missing (e.g. a large raw file that is not committed)
+keeps its current output.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus build                  # rebuild every stale table
+    python -m rca_sus build --dry-run        # only list what would be rebuilt
+    python -m rca_sus build cross_state_2019_complete --force
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import inspect
+import json
+import os
+import types
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import pandas as pd
+
+from .catalog import file_stats
+from .render_cache import content_hash
+
+#: Default location of the build manifest.
+DEFAULT_MANIFEST_PATH = os.path.join("data", "derived", "manifest.json")
+
+#: Version of the manifest layout.
+MANIFEST_VERSION = 1
+
+#: Statuses reported by :func:`build_tables`.
+STATUSES = ('built', 'fresh', 'stale', 'source', 'kept', 'missing', 'failed')
+
+
+@dataclass(frozen=True)
+class Node:
+    """One table of the build graph.
+
+    Attributes
+    ----------
+    name : str
+        Unique name, used on the command line.
+    output : str
+        Path of the table, relative to the repository root (``.csv`` or
+        ``.parquet``).
+    inputs : tuple of str
+        Paths read by the transform, passed to it positionally in this
+        order.  An input that is the output of another node makes this
+        node depend on it.
+    transform : callable, optional
+        ``transform(*inputs, **params) -> pandas.DataFrame``, a
+        module‑level function (it runs in a worker process).  ``None``
+        marks a source table.
+    params : mapping
+        Keyword arguments of the transform, part of the key.
+    version : int
+        Bump to force a rebuild when something the key cannot see
+        changed (e.g. a helper in another module).
+    """
+    name: str
+    output: str
+    inputs: Tuple[str, ...] = ()
+    transform: Optional[Callable[..., pd.DataFrame]] = None
+    params: Mapping[str, Any] = field(default_factory=dict)
+    version: int = 1
+
+
+def _path_key(path: str) -> str:
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def code_hash(function: Callable[..., Any]) -> str:
+    """SHA‑256 of the source of ``function`` and of the module‑level functions it calls.
+
+    Only functions defined in the same module are followed (recursively);
+    changes elsewhere are covered by :attr:`Node.version`.
+    """
+    module = function.__module__
+    seen: Set[str] = set()
+    digest = hashlib.sha256()
+    stack = [function]
+    while stack:
+        current = stack.pop()
+        if current.__qualname__ in seen:
+            continue
+        seen.add(current.__qualname__)
+        digest.update(current.__qualname__.encode())
+        digest.update(inspect.getsource(current).encode())
+        for name in sorted(current.__code__.co_names):
+            referenced = current.__globals__.get(name)
+            if isinstance(referenced, types.FunctionType) and referenced.__module__ == module:
+                stack.append(referenced)
+    return digest.hexdigest()
+
+
+def node_key(node: Node) -> str:
+    """Key of ``node`` from the current content of its inputs, its code and its parameters."""
+    description = {
+        'name': node.name,
+        'inputs': [[_path_key(path), content_hash(path)] for path in node.inputs],
+        'code': code_hash(node.transform) if node.transform is not None else None,
+        'params': {name: repr(value) for name, value in sorted(node.params.items())},
+        'version': node.version,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+def dependencies(nodes: Sequence[Node]) -> Dict[str, List[str]]:
+    """Names of the nodes whose output each node reads."""
+    producers = {}
+    for node in nodes:
+        key = _path_key(node.output)
+        if key in producers:
+            raise ValueError(f"Nodes {producers[key]!r} and {node.name!r} write the same file {node.output}.")
+        producers[key] = node.name
+    return {node.name: [producers[_path_key(path)] for path in node.inputs if _path_key(path) in producers]
+            for node in nodes}
+
+
+def topological_order(nodes: Sequence[Node]) -> List[str]:
+    """Node names with every node after the nodes it depends on; raises on a cycle."""
+    upstream = dependencies(nodes)
+    order: List[str] = []
+    state: Dict[str, int] = {}
+
+    def visit(name: str, path: Tuple[str, ...]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+        state[name] = 1
+        for parent in upstream[name]:
+            visit(parent, path + (name,))
+        state[name] = 2
+        order.append(name)
+
+    for node in nodes:
+        visit(node.name, ())
+    return order
+
+
+def select(nodes: Sequence[Node], targets: Optional[Iterable[str]]) -> List[Node]:
+    """The ``targets`` and every node they depend on (all nodes by default)."""
+    if not targets:
+        return list(nodes)
+    by_name = {node.name: node for node in nodes}
+    unknown = [name for name in targets if name not in by_name]
+    if unknown:
+        raise KeyError(f"Unknown nodes {unknown}; expected some of {sorted(by_name)}.")
+    upstream = dependencies(nodes)
+    wanted: Set[str] = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(upstream[name])
+    return [node for node in nodes if node.name in wanted]
+
+
+def read_manifest(path: str = DEFAULT_MANIFEST_PATH) -> Dict[str, Any]:
+    """Load the manifest; a missing one, or one of another version, is empty."""
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+        if manifest.get('manifest_version') == MANIFEST_VERSION:
+            return manifest
+    return {'manifest_version': MANIFEST_VERSION, 'nodes': {}}
+
+
+def write_manifest(manifest: Dict[str, Any], path: str = DEFAULT_MANIFEST_PATH) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+    os.replace(tmp, path)
+
+
+def is_fresh(node: Node, key: str, manifest: Dict[str, Any]) -> bool:
+    """Whether the recorded build of ``node`` has this key and its output is untouched."""
+    entry = manifest['nodes'].get(node.name)
+    return (entry is not None and entry['key'] == key and os.path.exists(node.output)
+            and entry['sha256'] == content_hash(node.output))
+
+
+def run_node(node: Node) -> str:
+    """Compute one node and write its output atomically; returns the output path."""
+    table = node.transform(*node.inputs, **node.params)
+    directory = os.path.dirname(node.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    root, extension = os.path.splitext(node.output)
+    tmp = f"{root}.tmp{extension}"
+    if extension == '.parquet':
+        table.to_parquet(tmp, index=False)
+    else:
+        table.to_csv(tmp, index=False)
+    os.replace(tmp, node.output)
+    return node.output
+
+
+def build_tables(nodes: Sequence[Node], targets: Optional[Iterable[str]] = None,
+          manifest_path: str = DEFAULT_MANIFEST_PATH, workers: Optional[int] = None,
+          force: bool = False, dry_run: bool = False,
+          log: Optional[Callable[[str], None]] = print) -> Dict[str, str]:
+    """Rebuild the stale nodes among ``targets`` and their dependencies.
+
+    Parameters
+    ----------
+    nodes : sequence of Node
+        The build graph (e.g. :data:`rca_sus.derived.NODES`).
+    targets : iterable of str, optional
+        Names of the nodes wanted (default: all).
+    manifest_path : str
+        Location of the manifest.
+    workers : int, optional
+        Worker processes for independent nodes (default: CPU count);
+        ``1`` builds in this process.
+    force : bool, default False
+        Rebuild the selected nodes even when they are fresh.
+    dry_run : bool, default False
+        Only report which nodes are stale (``'stale'``), including the
+        nodes downstream of a stale node.
+    log : callable, optional
+        Receives one line per node.
+
+    Returns
+    -------
+    dict
+        Status of every selected node (see :data:`STATUSES`).
+    """
+    selected = select(nodes, targets)
+    by_name = {node.name: node for node in selected}
+    upstream = {name: [parent for parent in parents if parent in by_name]
+                for name, parents in dependencies(selected).items()}
+    order = topological_order(selected)
+    manifest = read_manifest(manifest_path)
+    status: Dict[str, str] = {}
+    keys: Dict[str, str] = {}
+    running: Dict[Future, str] = {}
+
+    def report(name: str, value: str, detail: str = '') -> None:
+        status[name] = value
+        if log is not None:
+            log(f"{value:>8}  {name}{f'  ({detail})' if detail else ''}")
+
+    def record(name: str) -> None:
+        node = by_name[name]
+        manifest['nodes'][name] = {
+            'output': _path_key(node.output),
+            'key': keys[name],
+            'sha256': file_stats(node.output)['sha256'],
+            'built': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        }
+        write_manifest(manifest, manifest_path)
+
+    def schedule(name: str, pool: Optional[ProcessPoolExecutor]) -> None:
+        node = by_name[name]
+        if any(status[parent] in ('missing', 'failed') for parent in upstream[name]):
+            report(name, 'missing', 'an upstream table is unavailable')
+            return
+        if node.transform is None:
+            report(name, 'source' if os.path.exists(node.output) else 'missing')
+            return
+        absent = [path for path in node.inputs if not os.path.exists(path)]
+        if absent:
+            kept = os.path.exists(node.output)
+            report(name, 'kept' if kept else 'missing', f"missing input {', '.join(absent)}")
+            return
+        if dry_run and any(status[parent] == 'stale' for parent in upstream[name]):
+            report(name, 'stale', 'upstream table is stale')
+            return
+        keys[name] = node_key(node)
+        if not force and is_fresh(node, keys[name], manifest):
+            report(name, 'fresh')
+        elif dry_run:
+            report(name, 'stale')
+        elif pool is None:
+            try:
+                run_node(node)
+            except Exception as error:  # noqa: BLE001 - reported per node, the build goes on
+                report(name, 'failed', f"{type(error).__name__}: {error}")
+            else:
+                record(name)
+                report(name, 'built')
+        else:
+            running[pool.submit(run_node, node)] = name
+
+    def ready() -> List[str]:
+        busy = set(running.values())
+        return [name for name in order if name not in status and name not in busy
+                and all(parent in status for parent in upstream[name])]
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and not dry_run else None
+    try:
+        while len(status) < len(order):
+            for name in ready():
+                schedule(name, pool)
+            if running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        report(name, 'failed', f"{type(error).__name__}: {error}")
+                    else:
+                        record(name)
+                        report(name, 'built')
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return {name: status[name] for name in order}
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus build',
+        description="Rebuild the stale derived tables of data/derived")
+    parser.add_argument('targets', type=str, nargs='*',
+                        help='Tables to build with their dependencies (default: all)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for independent tables (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Rebuild even the tables that are up to date')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the tables that would be rebuilt')
+    parser.add_argument('--list', action='store_true', help='List the tables, their inputs and outputs')
+    parser.add_argument('--manifest', type=str, default=DEFAULT_MANIFEST_PATH,
+                        help='Build manifest (default: data/derived/manifest.json)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from .derived import NODES
+
+    args = parse_args(argv)
+    if args.list:
+        for node in select(NODES, args.targets):
+            kind = 'source' if node.transform is None else node.transform.__name__
+            print(f"{node.name} [{kind}] -> {node.output}")
+            for path in node.inputs:
+                print(f"    <- {path}")
+        return
+    status = build_tables(NODES, args.targets, args.manifest, args.workers, args.force, args.dry_run)
+    if any(value == 'failed' for value in status.values()):
+        raise SystemExit(1)
@@ -0,0 +1,295 @@
+"""
+Catalog of the derived SIVEP datasets.
+
+The Streamlit app used to discover years by listing ``data/SIVEP`` and
+loading every aggregated CSV just to check that it exists, so a cold
+worker parsed every year before rendering its first widget.  This module
+writes a small JSON manifest, ``data/SIVEP/catalog.json``, with one entry
+per derived dataset:
+
+``kind``
+    ``aggregated`` (``aggregated_sivep_<year>.csv``), ``cube``
+    (``cube_sivep_<year>.npz``), ``municipal``
+    (``municipal_sivep_<year>.npz``) or ``parquet`` (the ``year=<year>``
+    partition of the Parquet store);
+``year``, ``path``
+    the year covered and the location relative to the repository root;
+``rows``, ``start``, ``end``, ``ufs``
+    number of rows (records for Parquet, non‑empty cells otherwise),
+    onset date range and states present;
+``sha256``, ``bytes``, ``modified``
+    content hash, total size and latest modification time (ns);
+``schema_version``
+    :data:`rca_sus.schema.SCHEMA_VERSION` when the entry was written.
+
+The pipeline commands (``aggregate``, ``to-parquet``, ``cube``,
+``refresh``) update the entries of the year they write.  The catalog can
+be rebuilt from scratch with::
+
+    python -m rca_sus catalog
+
+and ``python -m rca_sus catalog --check`` exits with status 1 when an
+entry no longer matches the file on disk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+from .columnar import DEFAULT_DATASET_DIR, dataset_years
+from .cube import SivepCube, default_cube_path
+from .ingest import default_output_path
+from .municipal import MunicipalCounts, default_municipal_path
+from .schema import SCHEMA_VERSION
+
+#: Default location of the catalog.
+DEFAULT_CATALOG_PATH = os.path.join("data", "SIVEP", "catalog.json")
+
+#: Version of the catalog layout.
+CATALOG_VERSION = 1
+
+KINDS = ('aggregated', 'cube', 'municipal', 'parquet')
+
+_HASH_BLOCK = 1 << 20
+
+
+def _files(path: str) -> List[str]:
+    """Files making up a dataset: the file itself or every file below a directory."""
+    if os.path.isfile(path):
+        return [path]
+    found = []
+    for root, _, names in os.walk(path):
+        found.extend(os.path.join(root, name) for name in names)
+    return sorted(found)
+
+
+def file_stats(path: str) -> Dict[str, Any]:
+    """Return the ``sha256``, ``bytes`` and ``modified`` fields for ``path``."""
+    digest = hashlib.sha256()
+    size = 0
+    modified = 0
+    for name in _files(path):
+        stat = os.stat(name)
+        size += stat.st_size
+        modified = max(modified, stat.st_mtime_ns)
+        digest.update(os.path.relpath(name, path).encode())
+        with open(name, 'rb') as fh:
+            for block in iter(lambda: fh.read(_HASH_BLOCK), b''):
+                digest.update(block)
+    return {'sha256': digest.hexdigest(), 'bytes': size, 'modified': modified}
+
+
+def _date_range(dates: pd.Series) -> Dict[str, Optional[str]]:
+    dates = dates.dropna()
+    if dates.empty:
+        return {'start': None, 'end': None}
+    return {'start': dates.min().strftime('%Y-%m-%d'), 'end': dates.max().strftime('%Y-%m-%d')}
+
+
+def describe_aggregated(path: str) -> Dict[str, Any]:
+    df = pd.read_csv(path)
+    entry = {'rows': len(df)}
+    entry.update(_date_range(pd.to_datetime(df['DT_SIN_PRI'], errors='coerce')))
+    entry['ufs'] = sorted(df['SG_UF'].dropna().astype(str).unique().tolist())
+    return entry
+
+
+def describe_cube(path: str) -> Dict[str, Any]:
+    cube = SivepCube.load(path)
+    aggregated = cube.to_aggregated()
+    entry = {'rows': len(aggregated)}
+    entry.update(_date_range(aggregated['DT_SIN_PRI']))
+    entry['ufs'] = sorted(aggregated['SG_UF'].unique().tolist())
+    return entry
+
+
+def describe_municipal(path: str) -> Dict[str, Any]:
+    counts = MunicipalCounts.load(path)
+    days = counts.matrix.indices
+    entry = {'rows': counts.nnz}
+    if len(days):
+        entry.update(_date_range(pd.Series(counts.dates[[days.min(), days.max()]])))
+    else:
+        entry.update({'start': None, 'end': None})
+    entry['ufs'] = sorted(set(counts.ufs[counts.matrix.getnnz(axis=1) > 0].tolist()))
+    return entry
+
+
+def describe_parquet(path: str) -> Dict[str, Any]:
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    onset = dataset.to_table(columns=['DT_SIN_PRI']).column('DT_SIN_PRI')
+    bounds = pc.min_max(onset).as_py()
+    ufs = sorted(match.group(1) for name in os.listdir(path)
+                 for match in [re.fullmatch(r'SG_UF=(\w+)', name)] if match)
+    return {
+        'rows': dataset.count_rows(),
+        'start': bounds['min'].isoformat() if bounds['min'] else None,
+        'end': bounds['max'].isoformat() if bounds['max'] else None,
+        'ufs': ufs,
+    }
+
+
+def dataset_paths(year: int, dataset_dir: str = DEFAULT_DATASET_DIR) -> Dict[str, str]:
+    """Return the conventional location of each kind of dataset for ``year``."""
+    return {
+        'aggregated': default_output_path(year),
+        'cube': default_cube_path(year),
+        'municipal': default_municipal_path(year),
+        'parquet': os.path.join(dataset_dir, f'year={year}'),
+    }
+
+
+def describe(kind: str, year: int, path: str) -> Dict[str, Any]:
+    """Build the catalog entry of one dataset."""
+    describers = {'aggregated': describe_aggregated, 'cube': describe_cube,
+                  'municipal': describe_municipal, 'parquet': describe_parquet}
+    entry = {'kind': kind, 'year': year, 'path': path.replace(os.sep, '/')}
+    entry.update(describers[kind](path))
+    entry.update(file_stats(path))
+    entry['schema_version'] = SCHEMA_VERSION
+    return entry
+
+
+def known_years(dataset_dir: str = DEFAULT_DATASET_DIR) -> List[int]:
+    """Years with a ``data/SIVEP/<year>`` directory or a Parquet partition."""
+    sivep_dir = os.path.join("data", "SIVEP")
+    years = set(dataset_years(dataset_dir))
+    if os.path.isdir(sivep_dir):
+        years.update(int(name) for name in os.listdir(sivep_dir) if re.fullmatch(r'\d{4}', name))
+    return sorted(years)
+
+
+def scan_year(year: int, dataset_dir: str = DEFAULT_DATASET_DIR) -> List[Dict[str, Any]]:
+    """Describe every dataset present for ``year``."""
+    return [describe(kind, year, path) for kind, path in dataset_paths(year, dataset_dir).items()
+            if os.path.exists(path)]
+
+
+def build_catalog(years: Optional[Iterable[int]] = None,
+                  dataset_dir: str = DEFAULT_DATASET_DIR) -> Dict[str, Any]:
+    """Scan the data directory and return a catalog of every dataset found."""
+    datasets = []
+    for year in (known_years(dataset_dir) if years is None else years):
+        datasets.extend(scan_year(year, dataset_dir))
+    return {
+        'catalog_version': CATALOG_VERSION,
+        'generated': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'datasets': datasets,
+    }
+
+
+def read_catalog(path: str = DEFAULT_CATALOG_PATH) -> Optional[Dict[str, Any]]:
+    """Load the catalog, or return ``None`` if it is missing or was written by another version."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as fh:
+        catalog = json.load(fh)
+    if catalog.get('catalog_version') != CATALOG_VERSION:
+        return None
+    return catalog
+
+
+def write_catalog(catalog: Dict[str, Any], path: str = DEFAULT_CATALOG_PATH) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(catalog, fh, indent=2, ensure_ascii=False)
+        fh.write('\n')
+    os.replace(tmp, path)
+
+
+def update_catalog(years: Iterable[int],
+                   path: str = DEFAULT_CATALOG_PATH,
+                   dataset_dir: str = DEFAULT_DATASET_DIR) -> Dict[str, Any]:
+    """Rescan ``years`` and replace their entries in the catalog on disk."""
+    years = sorted(set(years))
+    catalog = read_catalog(path) or build_catalog(years=[], dataset_dir=dataset_dir)
+    kept = [entry for entry in catalog['datasets'] if entry['year'] not in years]
+    for year in years:
+        kept.extend(scan_year(year, dataset_dir))
+    catalog['datasets'] = sorted(kept, key=lambda entry: (entry['year'], KINDS.index(entry['kind'])))
+    catalog['generated'] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    write_catalog(catalog, path)
+    return catalog
+
+
+def catalog_years(catalog: Dict[str, Any], kinds: Sequence[str] = KINDS) -> List[int]:
+    """Years having at least one dataset of the given kinds."""
+    return sorted({entry['year'] for entry in catalog['datasets'] if entry['kind'] in kinds})
+
+
+def find_entry(catalog: Dict[str, Any], year: int, kind: str) -> Optional[Dict[str, Any]]:
+    """Return the entry of ``kind`` for ``year``, if any."""
+    for entry in catalog['datasets']:
+        if entry['year'] == year and entry['kind'] == kind:
+            return entry
+    return None
+
+
+def stale_entries(catalog: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Entries whose dataset is missing or whose content changed.
+
+    The size and modification time are compared first; the content hash is
+    only recomputed when the size matches but the time differs (e.g. after
+    a fresh checkout).
+    """
+    stale = []
+    for entry in catalog['datasets']:
+        path = entry['path']
+        if not os.path.exists(path):
+            stale.append(entry)
+            continue
+        files = [os.stat(name) for name in _files(path)]
+        size = sum(stat.st_size for stat in files)
+        modified = max((stat.st_mtime_ns for stat in files), default=0)
+        if size != entry['bytes']:
+            stale.append(entry)
+        elif modified != entry['modified'] and file_stats(path)['sha256'] != entry['sha256']:
+            stale.append(entry)
+    return stale
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus catalog',
+        description="Rebuild or check the catalog of derived SIVEP datasets")
+    parser.add_argument('-o', '--output', type=str, default=DEFAULT_CATALOG_PATH,
+                        help='Catalog file (default: data/SIVEP/catalog.json)')
+    parser.add_argument('--years', type=int, nargs='+', default=None,
+                        help='Only rescan these years (default: rebuild the whole catalog)')
+    parser.add_argument('--dataset_dir', type=str, default=DEFAULT_DATASET_DIR,
+                        help='Root directory of the Parquet store')
+    parser.add_argument('--check', action='store_true',
+                        help='Do not write; exit with status 1 if any entry is stale')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.check:
+        catalog = read_catalog(args.output)
+        if catalog is None:
+            raise SystemExit(f"No catalog at {args.output}")
+        stale = stale_entries(catalog)
+        for entry in stale:
+            print(f"stale: {entry['kind']} {entry['year']} ({entry['path']})")
+        raise SystemExit(1 if stale else 0)
+    if args.years:
+        catalog = update_catalog(args.years, args.output, args.dataset_dir)
+    else:
+        catalog = build_catalog(dataset_dir=args.dataset_dir)
+        write_catalog(catalog, args.output)
+    print(f"Wrote {len(catalog['datasets'])} entries for years {catalog_years(catalog)} to {args.output}")
@@ -0,0 +1,247 @@
+"""
+Partitioned Parquet store for SIVEP‑Gripe microdata.
+
+The INFLUD CSVs have around 150 columns, yet every analysis touches a
+handful of them.  This module converts each file once into a Parquet
+dataset partitioned by notification year and state, laid out with
+Hive‑style directories::
+
+    data/SIVEP/parquet/year=2020/SG_UF=SP/chunk00000-0.parquet
+
+The conversion streams the source with :func:`rca_sus.ingest.open_influd`
+(so ZIP archives are read without extraction), parses every ``DT_*``
+column into a date and stores the remaining columns as strings.
+
+:func:`read_sivep` reads the dataset back loading only the requested
+columns (column projection).  Year and state filters prune whole
+partition directories, and date filters are pushed down to the Parquet
+row‑group statistics so that non‑matching row groups are never decoded.
+:func:`aggregate_parquet` rebuilds the ``SG_UF,DT_SIN_PRI,COUNT`` table
+used by the Streamlit app from the store.
+
+``pyarrow`` is required and imported lazily.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus to-parquet data/SIVEP/2020/INFLUD20-26-06-2025.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+import re
+import shutil
+from typing import Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from .ingest import (
+    DEFAULT_ENCODING,
+    DEFAULT_SEP,
+    counts_to_frame,
+    infer_year,
+    open_influd,
+    parse_onset_dates,
+)
+
+#: Default location of the partitioned dataset.
+DEFAULT_DATASET_DIR = os.path.join("data", "SIVEP", "parquet")
+
+#: Rows converted per chunk; smaller than the aggregation default since
+#: all columns are parsed.
+DEFAULT_CONVERT_CHUNKSIZE = 100_000
+
+PARTITION_COLUMNS = ['year', 'SG_UF']
+
+DateLike = Union[str, datetime.date, pd.Timestamp]
+
+
+def _partitioning():
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    return ds.partitioning(pa.schema([('year', pa.int16()), ('SG_UF', pa.string())]),
+                           flavor='hive')
+
+
+def _arrow_schema(columns: Sequence[str]):
+    """Arrow schema for an INFLUD chunk: dates for ``DT_*``, strings otherwise."""
+    import pyarrow as pa
+    fields = [pa.field(c, pa.date32() if c.startswith('DT_') else pa.string()) for c in columns]
+    return pa.schema(fields + [pa.field('year', pa.int16())])
+
+
+def convert_influd_to_parquet(path: str,
+                              year: Optional[int] = None,
+                              dataset_dir: str = DEFAULT_DATASET_DIR,
+                              columns: Optional[Sequence[str]] = None,
+                              chunksize: int = DEFAULT_CONVERT_CHUNKSIZE,
+                              sep: str = DEFAULT_SEP,
+                              encoding: str = DEFAULT_ENCODING) -> int:
+    """Convert one INFLUD file into the partitioned Parquet dataset.
+
+    Any existing partition for ``year`` is replaced.
+
+    Parameters
+    ----------
+    path : str
+        INFLUD CSV or (split) ZIP archive; see
+        :func:`rca_sus.ingest.open_influd`.
+    year : int, optional
+        Notification year of the file.  Inferred from the file name when
+        omitted.
+    dataset_dir : str, optional
+        Root directory of the dataset.
+    columns : sequence of str, optional
+        Subset of columns to keep.  ``SG_UF`` is always kept since it is
+        a partition key.  Defaults to all columns.
+    chunksize : int, optional
+        Number of CSV rows converted at a time.
+    sep, encoding : str, optional
+        CSV dialect; see :func:`rca_sus.ingest.aggregate_influd`.
+
+    Returns
+    -------
+    int
+        Number of records written.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    year = year or infer_year(path)
+    if year is None:
+        raise ValueError(f"Could not infer the year from {path!r}; pass it explicitly.")
+    usecols = None if columns is None else list(dict.fromkeys(['SG_UF', *columns]))
+    year_dir = os.path.join(dataset_dir, f"year={year}")
+    if os.path.isdir(year_dir):
+        shutil.rmtree(year_dir)
+    written = 0
+    with open_influd(path) as fh:
+        reader = pd.read_csv(fh, sep=sep, usecols=usecols, dtype=str, encoding=encoding,
+                             chunksize=chunksize)
+        for i, chunk in enumerate(reader):
+            for col in chunk.columns:
+                if col.startswith('DT_'):
+                    chunk[col] = parse_onset_dates(chunk[col])
+            uf = chunk['SG_UF'].str.strip()
+            chunk['SG_UF'] = uf.where(uf != '')
+            chunk['year'] = year
+            table = pa.Table.from_pandas(chunk, schema=_arrow_schema(chunk.columns[:-1]),
+                                         preserve_index=False)
+            ds.write_dataset(table, dataset_dir, format='parquet', partitioning=_partitioning(),
+                             basename_template=f"chunk{i:05d}-{{i}}.parquet",
+                             existing_data_behavior='overwrite_or_ignore')
+            written += len(chunk)
+    return written
+
+
+def dataset_years(dataset_dir: str = DEFAULT_DATASET_DIR) -> List[int]:
+    """Return the years available in the dataset, in ascending order."""
+    if not os.path.isdir(dataset_dir):
+        return []
+    years = []
+    for name in os.listdir(dataset_dir):
+        match = re.fullmatch(r'year=(\d{4})', name)
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+
+def _as_date(value: DateLike) -> datetime.date:
+    return pd.Timestamp(value).date()
+
+
+def read_sivep(columns: Optional[Sequence[str]] = None,
+               years: Optional[Iterable[int]] = None,
+               ufs: Optional[Iterable[str]] = None,
+               start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None,
+               date_column: str = 'DT_SIN_PRI',
+               dataset_dir: str = DEFAULT_DATASET_DIR) -> pd.DataFrame:
+    """Read SIVEP microdata from the Parquet store.
+
+    Parameters
+    ----------
+    columns : sequence of str, optional
+        Columns to load.  The partition keys ``year`` and ``SG_UF`` can
+        be requested like any other column.  Defaults to all columns.
+    years : iterable of int, optional
+        Notification years to read; other year partitions are skipped.
+    ufs : iterable of str, optional
+        State abbreviations to read; other state partitions are skipped.
+    start, end : date‑like, optional
+        Inclusive bounds on ``date_column``.  Evaluated against the
+        row‑group statistics before any data is decoded.
+    date_column : str, optional
+        Date column the bounds apply to.  Defaults to ``DT_SIN_PRI``.
+    dataset_dir : str, optional
+        Root directory of the dataset.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Matching records; date columns are ``datetime64``.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(dataset_dir, format='parquet', partitioning=_partitioning())
+    expr = None
+    conditions = []
+    if years is not None:
+        conditions.append(ds.field('year').isin([int(y) for y in years]))
+    if ufs is not None:
+        conditions.append(ds.field('SG_UF').isin(list(ufs)))
+    if start is not None:
+        conditions.append(ds.field(date_column) >= pa.scalar(_as_date(start), pa.date32()))
+    if end is not None:
+        conditions.append(ds.field(date_column) <= pa.scalar(_as_date(end), pa.date32()))
+    for condition in conditions:
+        expr = condition if expr is None else expr & condition
+    table = dataset.to_table(columns=list(columns) if columns is not None else None, filter=expr)
+    return table.to_pandas(date_as_object=False)
+
+
+def aggregate_parquet(year: int, dataset_dir: str = DEFAULT_DATASET_DIR) -> pd.DataFrame:
+    """Build the ``SG_UF,DT_SIN_PRI,COUNT`` table of one year from the store.
+
+    Equivalent to :func:`rca_sus.ingest.aggregate_influd` on the source
+    file, but reads only two columns of one year partition.
+    """
+    df = read_sivep(columns=['SG_UF', 'DT_SIN_PRI'], years=[year], dataset_dir=dataset_dir)
+    counts = df.dropna().groupby(['SG_UF', 'DT_SIN_PRI']).size()
+    return counts_to_frame(counts)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus to-parquet',
+        description="Convert SIVEP-Gripe INFLUD microdata into a Parquet dataset partitioned by year and UF")
+    parser.add_argument('source', type=str,
+                        help='INFLUD CSV or ZIP archive (for split archives, the final .zip segment)')
+    parser.add_argument('--year', type=int, default=None,
+                        help='Year of the data; inferred from the file name when omitted')
+    parser.add_argument('--dataset_dir', type=str, default=DEFAULT_DATASET_DIR,
+                        help='Root directory of the Parquet dataset')
+    parser.add_argument('--columns', type=str, nargs='+', default=None,
+                        help='Columns to keep (default: all)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CONVERT_CHUNKSIZE,
+                        help='Number of CSV rows converted at a time')
+    parser.add_argument('--sep', type=str, default=DEFAULT_SEP, help='CSV field separator')
+    parser.add_argument('--encoding', type=str, default=DEFAULT_ENCODING, help='CSV text encoding')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    year = args.year or infer_year(args.source)
+    if year is None:
+        raise SystemExit("Could not infer the year from the file name; pass --year.")
+    rows = convert_influd_to_parquet(args.source, year=year, dataset_dir=args.dataset_dir,
+                                     columns=args.columns, chunksize=args.chunksize,
+                                     sep=args.sep, encoding=args.encoding)
+    print(f"Wrote {rows} records for {year} to {args.dataset_dir}")
+    if os.path.abspath(args.dataset_dir) == os.path.abspath(DEFAULT_DATASET_DIR):
+        from .catalog import update_catalog
+        update_catalog([year])
@@ -0,0 +1,469 @@
+"""
+Pre‑aggregated SIVEP data cube.
+
+The aggregated tables ``aggregated_sivep_<year>.csv`` keep only the
+state and the date of symptom onset, so any other slice (deaths only, an
+age group, one sex) means going back to the microdata.  This module
+aggregates the microdata once into a dense ``int32`` array with labelled
+axes::
+
+    uf (27) × date (days) × age_band (8) × sex (3) × outcome (4)
+
+which takes a few megabytes per year.  Records without a valid state or
+onset date are dropped, as in :func:`rca_sus.ingest.aggregate_influd`;
+missing age, sex or outcome fall into the ``IGN``/``I``/``Ignorado``
+categories so that rolling the cube up to ``(uf, date)`` reproduces the
+aggregated table for the dates the cube covers.
+
+The date axis is dense, so a single mistyped onset date (``01/01/1919``)
+would stretch it over a century.  Only onsets within a plausible window
+are kept, by default from 1 January of the year before the notification
+year to 31 December of that year (:func:`onset_window`); the records
+outside it are dropped and their number is stored in the cube's
+``meta['dropped_onset']``.  While streaming, each chunk is reduced to its
+non‑zero ``(day, cell)`` pairs, and the dense array is only allocated
+once at the end.
+
+Queries on :class:`SivepCube` never touch the microdata.  Date ranges
+are answered from prefix sums along the date axis, so their cost does
+not depend on the length of the range, and the remaining axes are small
+enough that summing a selection over them is constant‑time::
+
+    cube = SivepCube.load(default_cube_path(2020))
+    cube.total(uf='SP', start='2020-03-01', end='2020-05-31',
+               age_band=age_bands(min_age=60), outcome='Óbito')
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus cube data/SIVEP/2020/INFLUD20-26-06-2025.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .ingest import (AGGREGATE_COLUMNS, DEFAULT_CHUNKSIZE, DEFAULT_ENCODING, DEFAULT_SEP, counts_to_frame,
+                     infer_year, open_influd)
+from .schema import LABELS, _raw_dtypes, apply_schema
+from .ufs import UFS
+
+#: Columns of the INFLUD files used to build the cube.
+CUBE_COLUMNS = ['SG_UF', 'DT_SIN_PRI', 'NU_IDADE_N', 'TP_IDADE', 'CS_SEXO', 'EVOLUCAO']
+
+#: Lower edges (in years) of the age bands.
+AGE_EDGES = [0, 5, 20, 40, 60, 70, 80]
+
+#: Age band labels; ``IGN`` collects records without a usable age.
+AGE_BANDS = ['0-4', '5-19', '20-39', '40-59', '60-69', '70-79', '80+', 'IGN']
+
+#: Sex labels, as coded in the INFLUD exports.
+SEXES = list(LABELS['CS_SEXO'])
+
+#: Outcome labels, in the order of the ``EVOLUCAO`` codes 1, 2, 3 and 9.
+OUTCOMES = list(LABELS['EVOLUCAO'].values())
+
+AXES = ('uf', 'date', 'age_band', 'sex', 'outcome')
+
+#: Number of (age band, sex, outcome) cells per state.
+CELLS_PER_UF = len(AGE_BANDS) * len(SEXES) * len(OUTCOMES)
+
+#: Years before the notification year kept by the default onset window.
+DEFAULT_YEARS_BEFORE = 1
+
+Selection = Union[None, str, Sequence[str]]
+DateLike = Union[str, pd.Timestamp]
+Window = Tuple[np.datetime64, np.datetime64]
+
+
+def onset_window(year: int, years_before: int = DEFAULT_YEARS_BEFORE) -> Window:
+    """Inclusive range of plausible onset dates for notifications of ``year``."""
+    return (np.datetime64(f'{year - years_before:04d}-01-01', 'D'), np.datetime64(f'{year:04d}-12-31', 'D'))
+
+
+def age_bands(min_age: Optional[int] = None, max_age: Optional[int] = None) -> List[str]:
+    """Return the age bands lying entirely within ``[min_age, max_age]``.
+
+    For example ``age_bands(min_age=60)`` returns
+    ``['60-69', '70-79', '80+']``.
+    """
+    edges = AGE_EDGES + [np.inf]
+    selected = []
+    for label, low, high in zip(AGE_BANDS, edges[:-1], edges[1:]):
+        if (min_age is None or low >= min_age) and (max_age is None or high - 1 <= max_age):
+            selected.append(label)
+    return selected
+
+
+def age_in_years(age: pd.Series, unit: pd.Series) -> np.ndarray:
+    """Convert ``NU_IDADE_N`` to years using ``TP_IDADE`` (1 day, 2 month, 3 year)."""
+    values = age.astype('float64').to_numpy(na_value=np.nan)
+    unit_codes = pd.to_numeric(unit.astype(object), errors='coerce').to_numpy()
+    divisor = np.select([unit_codes == 1, unit_codes == 2, unit_codes == 3], [365.25, 12.0, 1.0], np.nan)
+    return values / divisor
+
+
+def placed_mask(chunk: pd.DataFrame, window: Optional[Window] = None) -> np.ndarray:
+    """Mask of the typed records that have a cell in the cube.
+
+    A record needs a known state and an onset date, within ``window``
+    when one is given.
+    """
+    onset = chunk['DT_SIN_PRI'].to_numpy().astype('datetime64[D]')
+    mask = (chunk['SG_UF'].cat.codes.to_numpy() >= 0) & ~np.isnat(onset)
+    if window is not None:
+        mask &= (onset >= window[0]) & (onset <= window[1])
+    return mask
+
+
+def cell_indices(chunk: pd.DataFrame, window: Optional[Window] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Map typed INFLUD records to cube coordinates.
+
+    Parameters
+    ----------
+    chunk : pandas.DataFrame
+        Records converted with :func:`rca_sus.schema.apply_schema`,
+        with at least the columns in :data:`CUBE_COLUMNS`.
+    window : (numpy.datetime64, numpy.datetime64), optional
+        Inclusive range of onset dates to keep (see :func:`onset_window`).
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray, np.ndarray)
+        ``(onset, uf, cell)``: onset dates (``datetime64[D]``) and UF
+        indices of the records that can be placed in the cube, and the
+        flat index of their ``(uf, age_band, sex, outcome)`` cell.
+    """
+    uf = chunk['SG_UF'].cat.codes.to_numpy().astype(np.intp)
+    onset = chunk['DT_SIN_PRI'].to_numpy().astype('datetime64[D]')
+    years = age_in_years(chunk['NU_IDADE_N'], chunk['TP_IDADE'])
+    age = np.where(np.isfinite(years) & (years >= 0),
+                   np.digitize(np.nan_to_num(years, nan=-1.0), AGE_EDGES) - 1,
+                   len(AGE_BANDS) - 1)
+    sex = chunk['CS_SEXO'].cat.codes.to_numpy().astype(np.intp)
+    sex = np.where(sex < 0, SEXES.index('I'), sex)
+    outcome = chunk['EVOLUCAO'].cat.codes.to_numpy().astype(np.intp)
+    outcome = np.where(outcome < 0, len(OUTCOMES) - 1, outcome)
+    valid = placed_mask(chunk, window)
+    cell = uf * CELLS_PER_UF + (age * len(SEXES) + sex) * len(OUTCOMES) + outcome
+    return onset[valid], uf[valid], cell[valid]
+
+
+def _day_range(start: str, periods: int) -> pd.DatetimeIndex:
+    if not periods:
+        return pd.DatetimeIndex([], dtype='datetime64[ns]')
+    return pd.date_range(start, periods=periods, freq='D', unit='ns')
+
+
+class SivepCube:
+    """Dense SIVEP count cube with labelled axes.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        ``int32`` array of shape ``(27, n_days, 8, 3, 4)`` indexed by
+        :data:`AXES`.
+    dates : pandas.DatetimeIndex
+        Consecutive days labelling the date axis.
+    meta : dict, optional
+        Provenance information (source file, year, ...).
+    """
+
+    def __init__(self, counts: np.ndarray, dates: pd.DatetimeIndex, meta: Optional[Dict[str, Any]] = None) -> None:
+        self.counts = counts
+        self.dates = pd.DatetimeIndex(dates)
+        self.meta = dict(meta or {})
+        self.labels = {
+            'uf': UFS,
+            'date': self.dates,
+            'age_band': AGE_BANDS,
+            'sex': SEXES,
+            'outcome': OUTCOMES,
+        }
+        self._cumulative: Optional[np.ndarray] = None
+
+    @property
+    def cumulative(self) -> np.ndarray:
+        """Prefix sums along the date axis, with a leading zero slice."""
+        if self._cumulative is None:
+            shape = list(self.counts.shape)
+            shape[1] += 1
+            cumulative = np.zeros(shape, dtype=np.int64)
+            np.cumsum(self.counts, axis=1, out=cumulative[:, 1:])
+            self._cumulative = cumulative
+        return self._cumulative
+
+    def _positions(self, axis: str, selection: Selection) -> np.ndarray:
+        labels = list(self.labels[axis])
+        if selection is None:
+            return np.arange(len(labels))
+        if isinstance(selection, str):
+            selection = [selection]
+        try:
+            return np.array([labels.index(value) for value in selection], dtype=np.intp)
+        except ValueError:
+            raise KeyError(f"Unknown {axis} in {list(selection)}; expected values from {labels}.") from None
+
+    def _date_bounds(self, start: Optional[DateLike], end: Optional[DateLike]) -> Tuple[int, int]:
+        """Half‑open positions ``[i0, i1)`` of an inclusive date range."""
+        i0 = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side='left'))
+        i1 = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side='right'))
+        return i0, max(i0, i1)
+
+    def total(self,
+              uf: Selection = None,
+              start: Optional[DateLike] = None,
+              end: Optional[DateLike] = None,
+              age_band: Selection = None,
+              sex: Selection = None,
+              outcome: Selection = None) -> int:
+        """Number of cases matching the selection.
+
+        Each argument restricts one axis; ``None`` keeps the whole axis.
+        ``start`` and ``end`` are inclusive onset dates.
+        """
+        i0, i1 = self._date_bounds(start, end)
+        window = self.cumulative[:, i1] - self.cumulative[:, i0]
+        index = np.ix_(self._positions('uf', uf), self._positions('age_band', age_band),
+                       self._positions('sex', sex), self._positions('outcome', outcome))
+        return int(window[index].sum())
+
+    def rollup(self,
+               keep: Sequence[str],
+               uf: Selection = None,
+               start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None,
+               age_band: Selection = None,
+               sex: Selection = None,
+               outcome: Selection = None) -> pd.Series:
+        """Sum the cube over every axis not listed in ``keep``.
+
+        Returns
+        -------
+        pandas.Series
+            Counts indexed by the kept axes (in :data:`AXES` order), named
+            ``COUNT``.
+        """
+        unknown = set(keep) - set(AXES)
+        if unknown:
+            raise KeyError(f"Unknown axes {sorted(unknown)}; expected a subset of {AXES}.")
+        i0, i1 = self._date_bounds(start, end)
+        positions = {
+            'uf': self._positions('uf', uf),
+            'age_band': self._positions('age_band', age_band),
+            'sex': self._positions('sex', sex),
+            'outcome': self._positions('outcome', outcome),
+        }
+        if 'date' in keep:
+            positions['date'] = np.arange(i0, i1)
+            source = self.counts
+        else:
+            # a date range collapses to one slice of the prefix sums
+            positions['date'] = np.array([0])
+            source = (self.cumulative[:, i1] - self.cumulative[:, i0])[:, np.newaxis]
+        sub = source[np.ix_(*(positions[axis] for axis in AXES))]
+        dropped = tuple(i for i, axis in enumerate(AXES) if axis not in keep)
+        values = sub.sum(axis=dropped, dtype=np.int64)
+        kept = [axis for axis in AXES if axis in keep]
+        if not kept:
+            return pd.Series([int(values)], name='COUNT')
+        levels = [np.asarray(self.labels[axis])[positions[axis]] for axis in kept]
+        index = pd.MultiIndex.from_product(levels, names=kept) if len(kept) > 1 else pd.Index(levels[0], name=kept[0])
+        return pd.Series(values.reshape(-1), index=index, name='COUNT')
+
+    def to_aggregated(self) -> pd.DataFrame:
+        """Return the ``SG_UF,DT_SIN_PRI,COUNT`` table (non‑zero cells only)."""
+        series = self.rollup(['uf', 'date'])
+        series = series[series > 0].rename_axis(AGGREGATE_COLUMNS)
+        return counts_to_frame(series)
+
+    def apply_delta(self, onset: np.ndarray, cell: np.ndarray, delta: np.ndarray) -> None:
+        """Add signed counts to the cube in place.
+
+        Parameters
+        ----------
+        onset : np.ndarray
+            Onset dates of the changes (``datetime64[D]``).  The date axis
+            is extended when they fall outside it.
+        cell : np.ndarray
+            Flat ``(uf, age_band, sex, outcome)`` cell indices, as returned
+            by :func:`cell_indices`.
+        delta : np.ndarray
+            Signed count added to each cell.
+
+        Raises
+        ------
+        ValueError
+            If the update would make any count negative, which means the
+            delta was not computed against this cube.
+        """
+        onset = np.asarray(onset, dtype='datetime64[D]')
+        if len(onset) == 0:
+            return
+        lo, hi = onset.min(), onset.max()
+        if len(self.dates):
+            first = np.datetime64(self.dates[0].date(), 'D')
+            before = max(0, int((first - lo).astype(int)))
+            after = max(0, int((hi - first).astype(int)) + 1 - len(self.dates))
+        else:
+            first, before, after = lo, 0, int((hi - lo).astype(int)) + 1
+        counts = np.pad(self.counts, ((0, 0), (before, after), (0, 0), (0, 0), (0, 0)))
+        first = first - np.timedelta64(before, 'D')
+        flat = counts.reshape(len(UFS), counts.shape[1], CELLS_PER_UF)
+        cell = np.asarray(cell, dtype=np.intp)
+        day = (onset - first).astype(np.intp)
+        np.add.at(flat, (cell // CELLS_PER_UF, day, cell % CELLS_PER_UF), np.asarray(delta, dtype=np.int32))
+        if (flat[cell // CELLS_PER_UF, day, cell % CELLS_PER_UF] < 0).any():
+            raise ValueError("Delta makes some counts negative; it does not match this cube.")
+        self.counts = counts
+        self.dates = _day_range(str(first), counts.shape[1])
+        self.labels['date'] = self.dates
+        self._cumulative = None
+
+    def save(self, path: str) -> None:
+        """Save the cube as a compressed ``.npz`` file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez_compressed(path, counts=self.counts,
+                            start=np.array(self.dates[0].strftime('%Y-%m-%d') if len(self.dates) else ''),
+                            age_bands=np.array(AGE_BANDS), sexes=np.array(SEXES),
+                            outcomes=np.array(OUTCOMES), ufs=np.array(UFS), meta=np.array(json.dumps(self.meta)))
+
+    @classmethod
+    def load(cls, path: str) -> 'SivepCube':
+        """Load a cube written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            for key, expected in (('ufs', UFS), ('age_bands', AGE_BANDS), ('sexes', SEXES), ('outcomes', OUTCOMES)):
+                if data[key].tolist() != list(expected):
+                    raise ValueError(f"Cube {path} was built with different {key}; rebuild it.")
+            counts = data['counts']
+            start = str(data['start'])
+            dates = _day_range(start, counts.shape[1])
+            meta = json.loads(str(data['meta']))
+        return cls(counts, dates, meta)
+
+
+class _DayAccumulator:
+    """Sparse ``(day, cell)`` counts gathered while streaming records.
+
+    Each chunk is reduced to its distinct pairs; the dense matrix is only
+    built by :meth:`to_cube`.
+    """
+
+    def __init__(self, width: int) -> None:
+        self.width = width
+        self.keys: List[np.ndarray] = []
+        self.counts: List[np.ndarray] = []
+
+    def add(self, days: np.ndarray, cells: np.ndarray) -> None:
+        if len(days) == 0:
+            return
+        # days since the epoch, so the key does not depend on earlier chunks
+        flat = days.astype(np.int64) * self.width + cells
+        keys, counts = np.unique(flat, return_counts=True)
+        self.keys.append(keys)
+        self.counts.append(counts)
+
+    def to_cube(self, meta: Optional[Dict[str, Any]] = None) -> SivepCube:
+        if not self.keys:
+            counts = np.zeros((len(UFS), 0, len(AGE_BANDS), len(SEXES), len(OUTCOMES)), dtype=np.int32)
+            return SivepCube(counts, _day_range('', 0), meta)
+        day, cell = np.divmod(np.concatenate(self.keys), self.width)
+        first = int(day.min())
+        n_days = int(day.max()) - first + 1
+        data = np.zeros((n_days, self.width), dtype=np.int32)
+        np.add.at(data, (day - first, cell), np.concatenate(self.counts).astype(np.int32))
+        counts = data.reshape(n_days, len(UFS), len(AGE_BANDS), len(SEXES), len(OUTCOMES))
+        counts = np.ascontiguousarray(counts.transpose(1, 0, 2, 3, 4))
+        return SivepCube(counts, _day_range(str(np.datetime64(first, 'D')), n_days), meta)
+
+
+def build_cube(path: str,
+               chunksize: int = DEFAULT_CHUNKSIZE,
+               sep: str = DEFAULT_SEP,
+               encoding: str = DEFAULT_ENCODING,
+               year: Optional[int] = None,
+               years_before: Optional[int] = DEFAULT_YEARS_BEFORE) -> SivepCube:
+    """Aggregate an INFLUD file into a :class:`SivepCube`.
+
+    The file is streamed in chunks with
+    :func:`rca_sus.ingest.open_influd`; only :data:`CUBE_COLUMNS` are
+    parsed.  Onset dates outside ``onset_window(year, years_before)``
+    are dropped and counted in ``meta['dropped_onset']``; the year is
+    inferred from the file name when not given, and
+    ``years_before=None`` (or an unknown year) keeps every date.
+    """
+    year = year or infer_year(path)
+    window = onset_window(year, years_before) if year is not None and years_before is not None else None
+    acc = _DayAccumulator(len(UFS) * CELLS_PER_UF)
+    dropped = 0
+    with open_influd(path) as fh:
+        reader = pd.read_csv(fh, sep=sep, usecols=CUBE_COLUMNS, dtype=_raw_dtypes(),
+                             encoding=encoding, chunksize=chunksize)
+        for chunk in reader:
+            typed = apply_schema(chunk)
+            onset, _, cell = cell_indices(typed, window)
+            dropped += int(placed_mask(typed).sum()) - len(onset)
+            acc.add(onset, cell)
+    meta: Dict[str, Any] = {'source': os.path.basename(path), 'year': year, 'dropped_onset': dropped}
+    if window is not None:
+        meta['onset_window'] = [str(window[0]), str(window[1])]
+    return acc.to_cube(meta=meta)
+
+
+def cube_from_cells(onset: np.ndarray, cell: np.ndarray, meta: Optional[Dict[str, Any]] = None) -> SivepCube:
+    """Build a cube from per‑record coordinates as returned by :func:`cell_indices`."""
+    acc = _DayAccumulator(len(UFS) * CELLS_PER_UF)
+    acc.add(np.asarray(onset, dtype='datetime64[D]'), np.asarray(cell, dtype=np.intp))
+    return acc.to_cube(meta)
+
+
+def default_cube_path(year: int) -> str:
+    """Return the conventional location of the cube for ``year``."""
+    return os.path.join("data", "SIVEP", str(year), f"cube_sivep_{year}.npz")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus cube',
+        description="Build the UF x day x age band x sex x outcome cube from SIVEP-Gripe INFLUD microdata")
+    parser.add_argument('source', type=str,
+                        help='INFLUD CSV or ZIP archive (for split archives, the final .zip segment)')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Output .npz (default: data/SIVEP/<year>/cube_sivep_<year>.npz)')
+    parser.add_argument('--year', type=int, default=None,
+                        help='Year of the data; inferred from the file name when omitted')
+    parser.add_argument('--years-before', type=int, default=DEFAULT_YEARS_BEFORE,
+                        help='Keep onset dates from 1 January of this many years before the notification '
+                             'year to 31 December of that year; the others are dropped (default: 1)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='Number of CSV rows parsed per chunk')
+    parser.add_argument('--sep', type=str, default=DEFAULT_SEP, help='CSV field separator')
+    parser.add_argument('--encoding', type=str, default=DEFAULT_ENCODING, help='CSV text encoding')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    year = args.year or infer_year(args.source)
+    output = args.output
+    if output is None:
+        if year is None:
+            raise SystemExit("Could not infer the year from the file name; pass --year or --output.")
+        output = default_cube_path(year)
+    cube = build_cube(args.source, chunksize=args.chunksize, sep=args.sep, encoding=args.encoding,
+                      year=year, years_before=args.years_before)
+    cube.save(output)
+    print(f"Wrote cube with shape {cube.counts.shape} ({int(cube.counts.sum())} notifications) to {output}")
+    if cube.meta['dropped_onset']:
+        print(f"Dropped {cube.meta['dropped_onset']} notifications with onset outside "
+              f"{cube.meta['onset_window'][0]}..{cube.meta['onset_window'][1]}")
+    if year is not None and os.path.abspath(output) == os.path.abspath(default_cube_path(year)):
+        from .catalog import update_catalog
+        update_catalog([year])
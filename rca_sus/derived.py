@@ -0,0 +1,103 @@
+"""
+The derived state tables of ``data/derived`` as nodes of the build graph.
+
+:data:`NODES` declares how each table is obtained (see
+:mod:`rca_sus.build`):
+
+``cross_state_2019``
+    SRAG cases of 2019, mean daily temperature (NASA POWER ``T2M``) and
+    mean municipal IDHM (2010) per state, from the aggregated SIVEP table,
+    the daily weather table and the IDHM file ``municipal.csv``;
+``cross_state_2019_complete``
+    ``cross_state_2019`` with the annual mean temperature again
+    (``avg_temp``) and the state covariates of
+    ``state_covariates_2019``;
+``hospital_beds_2019_state``, ``state_covariates_2019`` and ``synthetic_state_2019``
+    sources: the CNES bed counts and the covariates (precipitation,
+    humidity, ICU beds, vaccination, PM2.5, GDP, land use) were compiled
+    outside the repository, and the synthetic indicators drawn around
+    the bed counts were generated by code that is not in it either;
+    they are only tracked by content.
+
+Every transform reads the input paths it is given and returns the table,
+so that the graph can be rebuilt with ``python -m rca_sus build``.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import List
+
+import pandas as pd
+
+from .build import Node
+from .ingest import default_output_path
+from .ufs import IBGE_CODE_TO_UF, UFS
+from .weather import DEFAULT_WEATHER_PATH, load_weather_table
+
+DERIVED_DIR = os.path.join("data", "derived")
+
+#: Municipal IDHM file (PNUD/Ipea/FJP, see ``referencias/origem_dados.md``).
+IDHM_PATH = os.path.join("data", "IBGE", "idhm", "municipal.csv")
+
+CROSS_STATE_PATH = os.path.join(DERIVED_DIR, "cross_state_2019.csv")
+CROSS_STATE_COMPLETE_PATH = os.path.join(DERIVED_DIR, "cross_state_2019_complete.csv")
+STATE_COVARIATES_PATH = os.path.join(DERIVED_DIR, "state_covariates_2019.csv")
+HOSPITAL_BEDS_PATH = os.path.join(DERIVED_DIR, "hospital_beds_2019_state.csv")
+SYNTHETIC_STATE_PATH = os.path.join(DERIVED_DIR, "synthetic_state_2019.csv")
+
+def state_cases(aggregated: str) -> pd.Series:
+    """Total cases per state of an aggregated SIVEP table, in :data:`UFS` order."""
+    counts = pd.read_csv(aggregated, usecols=['SG_UF', 'COUNT'])
+    return counts.groupby('SG_UF')['COUNT'].sum().reindex(UFS).rename('COUNT')
+
+
+def state_temperature(weather: str, year: int) -> pd.Series:
+    """Mean daily ``T2M`` per state over ``year``, in :data:`UFS` order."""
+    table = load_weather_table(weather, parameters=['T2M'])
+    table = table[table['DATE'].dt.year == year]
+    # POWER reports two decimals; undo the float32 rounding of the table
+    temperature = table['T2M'].astype('float64').round(2)
+    return temperature.groupby(table['SG_UF'], observed=False).mean().reindex(UFS)
+
+
+def state_idhm(idhm: str, year: int = 2010) -> pd.Series:
+    """Mean IDHM of the municipalities of each state in the census ``year``."""
+    table = pd.read_csv(idhm, sep=';', encoding='latin1', usecols=['ANO', 'UF', 'IDHM'], low_memory=False)
+    table = table[table['ANO'] == year]
+    uf = table['UF']
+    if pd.api.types.is_numeric_dtype(uf):
+        uf = uf.map(IBGE_CODE_TO_UF)
+    idhm_values = pd.to_numeric(table['IDHM'].astype(str).str.replace(',', '.'), errors='coerce')
+    return idhm_values.groupby(uf.astype(str)).mean().reindex(UFS)
+
+
+def cross_state(aggregated: str, weather: str, idhm: str, year: int = 2019) -> pd.DataFrame:
+    """Cases, mean temperature and mean IDHM per state."""
+    return pd.DataFrame({
+        'SG_UF': UFS,
+        'COUNT': state_cases(aggregated).fillna(0).astype('int64').to_numpy(),
+        'mean_temperature': state_temperature(weather, year).to_numpy(),
+        'idhm_mean': state_idhm(idhm).to_numpy(),
+    })
+
+
+def cross_state_complete(cross: str, weather: str, covariates: str, year: int = 2019) -> pd.DataFrame:
+    """``cross_state`` joined with the annual mean temperature and the state covariates."""
+    table = pd.read_csv(cross)
+    table['avg_temp'] = state_temperature(weather, year).reindex(table['SG_UF']).to_numpy()
+    return table.merge(pd.read_csv(covariates), on='SG_UF', how='left')
+
+
+#: Build graph of the derived tables.
+NODES: List[Node] = [
+    Node('hospital_beds_2019_state', HOSPITAL_BEDS_PATH),
+    Node('state_covariates_2019', STATE_COVARIATES_PATH),
+    Node('cross_state_2019', CROSS_STATE_PATH,
+         inputs=(default_output_path(2019), DEFAULT_WEATHER_PATH, IDHM_PATH),
+         transform=cross_state, params={'year': 2019}),
+    Node('cross_state_2019_complete', CROSS_STATE_COMPLETE_PATH,
+         inputs=(CROSS_STATE_PATH, DEFAULT_WEATHER_PATH, STATE_COVARIATES_PATH),
+         transform=cross_state_complete, params={'year': 2019}),
+    Node('synthetic_state_2019', SYNTHETIC_STATE_PATH),
+]
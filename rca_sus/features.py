@@ -0,0 +1,328 @@
+"""
+Spatio‑temporal feature matrices on the dense (unit × day) grid.
+
+The weather notebooks merged cases and weather frame by frame and then
+looped over states to compute correlations or lags.  This module aligns
+every input on the grid of a :class:`rca_sus.timeseries.CountStore`
+(``n_units × n_days`` – states, or municipalities, by consecutive days)
+and computes all derived features with array operations along the day
+axis, for every unit at once:
+
+* daily case counts (the target) from the store;
+* daily weather (e.g. :func:`rca_sus.weather.weather_table`), which may
+  be given at a coarser level than the units (municipalities receive the
+  series of their state through ``weather_units``);
+* static covariates (one row per unit), broadcast along the days;
+* lags and trailing rolling means of the cases and of the weather;
+* epidemiological (MMWR/SE) week and year, and the case total of the
+  previous epidemiological week.
+
+Features derived from the cases only use days before the current one, so
+that the matrix can be used to predict the cases of the day.  The result
+is a :class:`FeatureMatrix` of shape ``(n_units, n_days, n_features)``;
+:meth:`FeatureMatrix.to_frame` gives the long table and
+:func:`twin_frame` the ``X``/covariates/``Y`` layout consumed by the
+models of ``metodologias/deep_twin_networks`` (``dtn_repl``).
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus features --year 2019 --weather data/NASA/weather_daily_uf.parquet
+    python -m rca_sus features --year 2019 --treatment T2M -o data/derived/twin_features_2019.parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import warnings
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .timeseries import CountStore
+
+#: Name of the target column.
+TARGET = 'cases'
+
+
+@dataclass
+class FeatureSpec:
+    """Which derived features to compute.
+
+    Attributes
+    ----------
+    lags : sequence of int
+        Lags in days of every dynamic variable (cases and weather).
+        Repeated lags are computed once; the cases ignore lags below 1,
+        and the weather lag 0 is skipped when it is already kept as the
+        same‑day value.
+    windows : sequence of int
+        Lengths in days of the trailing rolling means.
+    epiweek : bool
+        Add the epidemiological week and year and the case total of the
+        previous epidemiological week.
+    weather_same_day : bool
+        Keep the weather of the current day as a feature (the lags and
+        means of the cases always end the day before).
+    """
+    lags: Sequence[int] = (1, 7, 14)
+    windows: Sequence[int] = (7, 14)
+    epiweek: bool = True
+    weather_same_day: bool = True
+
+
+class FeatureMatrix(NamedTuple):
+    """Features and target on the dense (unit × day) grid."""
+    values: np.ndarray           # (n_units, n_days, n_features) float32
+    target: np.ndarray           # (n_units, n_days) float32
+    columns: List[str]
+    units: List[str]
+    dates: pd.DatetimeIndex
+    unit_name: str = 'SG_UF'
+
+    def to_frame(self, dropna: bool = False) -> pd.DataFrame:
+        """Long table with one row per unit and day, the features and the target."""
+        n_units, n_days, n_features = self.values.shape
+        frame = pd.DataFrame(self.values.reshape(n_units * n_days, n_features), columns=self.columns)
+        frame.insert(0, 'DATE', np.tile(self.dates.to_numpy(dtype='datetime64[ns]'), n_units))
+        frame.insert(0, self.unit_name, pd.Categorical(np.repeat(self.units, n_days), categories=self.units))
+        frame[TARGET] = self.target.reshape(-1)
+        return frame.dropna().reset_index(drop=True) if dropna else frame
+
+
+def dense_series(table: pd.DataFrame, units: Sequence[str], dates: pd.DatetimeIndex,
+                 unit_column: str = 'SG_UF', date_column: str = 'DATE',
+                 columns: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, List[str]]:
+    """Scatter a long (unit, date, values…) table onto a ``(n_columns, n_units, n_days)`` array.
+
+    Cells absent from ``table`` are ``NaN``; rows outside ``units`` or
+    ``dates`` are ignored.
+    """
+    columns = [c for c in table.columns if c not in (unit_column, date_column)] if columns is None else list(columns)
+    rows = pd.Index(list(units)).get_indexer(table[unit_column].astype(str))
+    cols = pd.DatetimeIndex(dates).get_indexer(pd.to_datetime(table[date_column]))
+    keep = (rows >= 0) & (cols >= 0)
+    out = np.full((len(columns), len(units), len(dates)), np.nan, dtype='float32')
+    values = table[columns].to_numpy(dtype='float32')[keep].T
+    out[:, rows[keep], cols[keep]] = values
+    return out, columns
+
+
+def lag(values: np.ndarray, k: int) -> np.ndarray:
+    """Shift ``values`` by ``k`` days along the last axis, padding with ``NaN``."""
+    out = np.full(values.shape, np.nan, dtype='float32')
+    if k == 0:
+        out[...] = values
+    elif k < values.shape[-1]:
+        out[..., k:] = values[..., :-k]
+    return out
+
+
+def rolling_mean(values: np.ndarray, window: int, offset: int = 0) -> np.ndarray:
+    """Trailing mean over ``window`` days along the last axis.
+
+    The window of day ``t`` covers days ``t - offset - window + 1`` to
+    ``t - offset``; days whose window is incomplete or only has ``NaN``
+    get ``NaN``, and ``NaN`` inside a window are skipped.
+    """
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0).astype('float64')
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    sums = np.pad(np.cumsum(filled, axis=-1), pad)
+    counts = np.pad(np.cumsum(present, axis=-1), pad)
+    n_days = values.shape[-1]
+    out = np.full(values.shape, np.nan, dtype='float32')
+    first = window + offset - 1
+    if first < n_days:
+        end = np.arange(first, n_days) - offset + 1
+        total = sums[..., end] - sums[..., end - window]
+        count = counts[..., end] - counts[..., end - window]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[..., first:] = np.where(count > 0, total / count, np.nan)
+    return out
+
+
+def epi_weeks(dates: pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """Epidemiological (MMWR) year and week of each date.
+
+    Weeks run from Sunday to Saturday; week 1 is the first week with at
+    least four days in the year, i.e. the week whose Wednesday falls in
+    it.
+    """
+    dates = pd.DatetimeIndex(dates)
+    sunday_offset = (dates.dayofweek.to_numpy() + 1) % 7
+    wednesday = dates - pd.to_timedelta(sunday_offset - 3, unit='D')
+    return wednesday.year.to_numpy(dtype='int16'), ((wednesday.dayofyear.to_numpy() - 1) // 7 + 1).astype('int8')
+
+
+def epiweek_totals(values: np.ndarray, dates: pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum consecutive daily ``values`` (last axis) by epidemiological week.
+
+    Returns the weekly totals, of shape ``(..., n_weeks)``, and the week
+    index of every day.  The first and last weeks may be partial.
+    """
+    years, weeks = epi_weeks(dates)
+    code = years.astype('int32') * 100 + weeks
+    week_of_day = np.concatenate([[0], np.cumsum(code[1:] != code[:-1])])
+    starts = np.flatnonzero(np.concatenate([[True], code[1:] != code[:-1]]))
+    return np.add.reduceat(values, starts, axis=-1), week_of_day
+
+
+def build_features(store: CountStore,
+                   weather: Optional[pd.DataFrame] = None,
+                   static: Optional[pd.DataFrame] = None,
+                   spec: Optional[FeatureSpec] = None,
+                   weather_units: Optional[pd.Series] = None,
+                   weather_unit_column: str = 'SG_UF') -> FeatureMatrix:
+    """Build the feature matrix of a count store.
+
+    Parameters
+    ----------
+    store : CountStore
+        Daily cases; its units and consecutive dates define the grid.
+    weather : pandas.DataFrame, optional
+        Long daily table with ``weather_unit_column``, ``DATE`` and one
+        numeric column per variable.
+    static : pandas.DataFrame, optional
+        Numeric covariates indexed by unit, constant over time.
+    spec : FeatureSpec, optional
+        Lags, windows and epidemiological‑week options.
+    weather_units : pandas.Series, optional
+        Weather unit of each store unit (e.g. the state of each
+        municipality), indexed by store unit.  By default the weather is
+        keyed by the store units themselves.
+    """
+    spec = spec or FeatureSpec()
+    units, dates = store.units, store.dates
+    cases = store.counts.astype('float32')
+    blocks: List[np.ndarray] = []
+    names: List[str] = []
+
+    def add(block: np.ndarray, name: str) -> None:
+        blocks.append(block)
+        names.append(name)
+
+    lags = list(dict.fromkeys(int(k) for k in spec.lags))
+    # cases: only days before the current one
+    for k in lags:
+        if k >= 1:
+            add(lag(cases, k), f"{TARGET}_lag{k}")
+    for w in spec.windows:
+        add(rolling_mean(cases, w, offset=1), f"{TARGET}_mean{w}")
+
+    if weather is not None:
+        if weather_units is None:
+            weather_keys = list(units)
+            take = np.arange(len(units))
+        else:
+            mapped = weather_units.reindex(units).astype(str)
+            weather_keys = sorted(set(mapped))
+            take = pd.Index(weather_keys).get_indexer(mapped)
+        series, variables = dense_series(weather, weather_keys, dates, unit_column=weather_unit_column)
+        series = series[:, take, :]
+        for variable, values in zip(variables, series):
+            if spec.weather_same_day:
+                add(values, variable)
+            for k in lags:
+                if not (k == 0 and spec.weather_same_day):
+                    add(lag(values, k), f"{variable}_lag{k}")
+            for w in spec.windows:
+                add(rolling_mean(values, w), f"{variable}_mean{w}")
+
+    if spec.epiweek:
+        years, weeks = epi_weeks(dates)
+        add(np.broadcast_to(weeks.astype('float32'), cases.shape), 'epi_week')
+        add(np.broadcast_to(years.astype('float32'), cases.shape), 'epi_year')
+        totals, week_of_day = epiweek_totals(cases, dates)
+        previous = np.concatenate([np.full(totals.shape[:-1] + (1,), np.nan, dtype='float32'),
+                                   totals[..., :-1]], axis=-1)
+        add(previous[:, week_of_day], f"{TARGET}_prev_epiweek")
+
+    if static is not None:
+        covariates = static.reindex(units).astype('float32')
+        for name in covariates.columns:
+            add(np.broadcast_to(covariates[name].to_numpy()[:, None], cases.shape), str(name))
+
+    values = np.stack(blocks, axis=-1) if blocks else np.empty(cases.shape + (0,), dtype='float32')
+    return FeatureMatrix(values.astype('float32', copy=False), cases, names, list(units), dates, store.unit_name)
+
+
+def binarize(values: np.ndarray, by_unit: bool = True) -> np.ndarray:
+    """1 where ``values`` (unit × day) exceed their median (per unit by default), else 0."""
+    axis = -1 if by_unit else None
+    with warnings.catch_warnings():
+        # units without any value (e.g. no weather series) have no median
+        warnings.simplefilter('ignore', RuntimeWarning)
+        median = np.nanmedian(values, axis=axis, keepdims=True)
+    return (values > median).astype('int8')
+
+
+def twin_frame(features: FeatureMatrix, treatment: str, by_unit: bool = True) -> pd.DataFrame:
+    """Table in the layout of the ``dtn_repl`` twin models.
+
+    ``X`` is the feature ``treatment`` binarised at its median (e.g. a
+    warmer than usual day), ``Y`` whether the cases of the day exceed
+    their median, and the remaining features are the covariates.  Rows
+    with missing values (the first days, without lags) are dropped and
+    the rows are in date order, so that a split on row position is a
+    split in time.
+    """
+    if treatment not in features.columns:
+        raise KeyError(f"Unknown feature {treatment!r}; expected one of {features.columns}.")
+    position = features.columns.index(treatment)
+    raw = features.values[..., position]
+    covariates = np.delete(features.values, position, axis=-1)
+    names = [name for name in features.columns if name != treatment]
+    x = binarize(raw, by_unit)
+    y = binarize(features.target, by_unit)
+    # date‑major order: (n_days, n_units, ...)
+    stacked = np.concatenate([x[..., None].astype('float32'), covariates, y[..., None].astype('float32')], axis=-1)
+    stacked = stacked.transpose(1, 0, 2).reshape(-1, stacked.shape[-1])
+    missing = np.isnan(stacked).any(axis=1) | np.isnan(raw.T.reshape(-1))
+    frame = pd.DataFrame(stacked[~missing], columns=['X', *names, 'Y'])
+    return frame.astype({'X': 'int8', 'Y': 'int8'})
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus features',
+        description="Build the daily feature matrix (cases, weather, lags, rolling means, epi weeks)")
+    parser.add_argument('--year', type=int, required=True, help='Year of the aggregated SIVEP counts')
+    parser.add_argument('--aggregated', type=str, default=None,
+                        help='Aggregated CSV (default: data/SIVEP/<year>/aggregated_sivep_<year>.csv)')
+    parser.add_argument('--weather', type=str, default=None,
+                        help='Daily weather Parquet (e.g. data/NASA/weather_daily_uf.parquet)')
+    parser.add_argument('--static', type=str, default=None,
+                        help='CSV of static covariates with a SG_UF column')
+    parser.add_argument('--lags', type=int, nargs='*', default=[1, 7, 14], help='Lags in days')
+    parser.add_argument('--windows', type=int, nargs='*', default=[7, 14], help='Rolling mean windows in days')
+    parser.add_argument('--no_epiweek', action='store_true', help='Skip the epidemiological week features')
+    parser.add_argument('--treatment', type=str, default=None,
+                        help='Write the dtn_repl twin layout with this feature as the binary treatment')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Output Parquet file (default: data/derived/features_sivep_<year>.parquet)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    aggregated = args.aggregated or os.path.join("data", "SIVEP", str(args.year), f"aggregated_sivep_{args.year}.csv")
+    store = CountStore.from_aggregated(pd.read_csv(aggregated, parse_dates=['DT_SIN_PRI']))
+    weather = pd.read_parquet(args.weather) if args.weather else None
+    static = pd.read_csv(args.static).set_index('SG_UF') if args.static else None
+    spec = FeatureSpec(lags=args.lags, windows=args.windows, epiweek=not args.no_epiweek)
+    features = build_features(store, weather, static, spec)
+    if args.treatment:
+        table = twin_frame(features, args.treatment)
+        default = f"twin_features_sivep_{args.year}.parquet"
+    else:
+        table = features.to_frame()
+        default = f"features_sivep_{args.year}.parquet"
+    output = args.output or os.path.join("data", "derived", default)
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    table.to_parquet(output, index=False)
+    print(f"Wrote {len(table)} rows x {table.shape[1]} columns to {output}")
@@ -0,0 +1,169 @@
+"""
+Simplified state geometries for the map page.
+
+``BR_UF_2022.zip`` holds the full‑resolution IBGE state polygons (several
+hundred thousand vertices).  Reading the shapefile out of the ZIP and
+handing those polygons to matplotlib on every rerun makes the map slow
+to draw, while at the size of an app figure one pixel already spans a few
+hundredths of a degree.  This module precomputes simplified versions of
+the layer at a few tolerance levels and stores each as GeoParquet under
+``data/IBGE/shapefiles/geometry/``:
+
+=========  ===============  ===========================================
+level      tolerance (deg)  intended use
+=========  ===============  ===========================================
+``low``    0.05             thumbnails, figures up to ~600 px wide
+``medium`` 0.02             the default app figure (~1000 px)
+``high``   0.005            large or high‑dpi exports
+``full``   –                the original polygons
+=========  ===============  ===========================================
+
+Simplification preserves the topology of the layer: with Shapely ≥ 2.1
+the states are simplified as a coverage, so neighbouring states keep
+sharing the same simplified border (no slivers or gaps); older versions
+fall back to simplifying each state with ``preserve_topology=True``.
+:func:`level_for_figure` picks the coarsest level whose tolerance is below
+the size of one pixel of the figure.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus geometry
+
+``geopandas`` is imported lazily, when a function needs it.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Any, Dict, Optional, Sequence
+
+#: Full‑resolution IBGE state boundaries.
+DEFAULT_SHAPEFILE = os.path.join("data", "IBGE", "shapefiles", "BR_UF_2022.zip")
+
+#: Directory of the simplified GeoParquet files.
+DEFAULT_GEOMETRY_DIR = os.path.join("data", "IBGE", "shapefiles", "geometry")
+
+#: Simplification tolerance of each level, in degrees (``None`` keeps the
+#: original polygons), from the coarsest to the finest.
+LEVELS: Dict[str, Optional[float]] = {
+    'low': 0.05,
+    'medium': 0.02,
+    'high': 0.005,
+    'full': None,
+}
+
+#: Attribute columns kept in the simplified layers.
+GEOMETRY_COLUMNS = ['CD_UF', 'SIGLA_UF', 'NM_UF', 'NM_REGIAO', 'geometry']
+
+#: Approximate longitude span of Brazil (including the oceanic islands),
+#: used to convert figure sizes into degrees per pixel.
+BRAZIL_LON_SPAN = 45.0
+
+
+def geometry_path(level: str, geometry_dir: str = DEFAULT_GEOMETRY_DIR) -> str:
+    """Return the GeoParquet file of a simplification level."""
+    if level not in LEVELS:
+        raise KeyError(f"Unknown level {level!r}; expected one of {list(LEVELS)}.")
+    return os.path.join(geometry_dir, f"BR_UF_2022_{level}.parquet")
+
+
+def simplify_layer(gdf: Any, tolerance: Optional[float]) -> Any:
+    """Simplify a GeoDataFrame of adjacent polygons, preserving shared borders."""
+    if tolerance is None:
+        return gdf.copy()
+    import shapely
+
+    simplified = gdf.copy()
+    if hasattr(shapely, 'coverage_simplify'):
+        simplified['geometry'] = shapely.coverage_simplify(gdf.geometry.to_numpy(), tolerance)
+    else:
+        simplified['geometry'] = gdf.geometry.simplify(tolerance, preserve_topology=True)
+    simplified['geometry'] = simplified.geometry.make_valid()
+    return simplified
+
+
+def count_vertices(gdf: Any) -> int:
+    """Total number of vertices in the geometries of ``gdf``."""
+    import shapely
+
+    return int(shapely.get_num_coordinates(gdf.geometry.to_numpy()).sum())
+
+
+def build_geometry_cache(shapefile: str = DEFAULT_SHAPEFILE,
+                         geometry_dir: str = DEFAULT_GEOMETRY_DIR,
+                         levels: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Write the simplified layers of ``shapefile`` as GeoParquet.
+
+    Returns
+    -------
+    dict
+        For each level, the output ``path``, number of ``vertices`` and
+        file size in ``bytes``.
+    """
+    import geopandas as gpd
+
+    gdf = gpd.read_file(f"zip://{shapefile}" if shapefile.lower().endswith('.zip') else shapefile)
+    gdf = gdf[[col for col in GEOMETRY_COLUMNS if col in gdf.columns]]
+    os.makedirs(geometry_dir, exist_ok=True)
+    report = {}
+    for level in (levels or list(LEVELS)):
+        simplified = simplify_layer(gdf, LEVELS[level])
+        path = geometry_path(level, geometry_dir)
+        simplified.to_parquet(path, index=False)
+        report[level] = {'path': path, 'vertices': count_vertices(simplified), 'bytes': os.path.getsize(path)}
+    return report
+
+
+def level_for_figure(width: float, dpi: float = 100.0) -> str:
+    """Coarsest level whose tolerance is finer than one pixel of the figure.
+
+    Parameters
+    ----------
+    width : float
+        Figure width in inches (the map fills most of it).
+    dpi : float, default 100
+        Resolution the figure is rendered at.
+    """
+    degrees_per_pixel = BRAZIL_LON_SPAN / max(width * dpi, 1.0)
+    for level, tolerance in LEVELS.items():
+        if tolerance is not None and tolerance <= degrees_per_pixel:
+            return level
+    return 'full'
+
+
+def load_geometry(level: str = 'medium',
+                  geometry_dir: str = DEFAULT_GEOMETRY_DIR,
+                  shapefile: str = DEFAULT_SHAPEFILE) -> Any:
+    """Load the state layer at a simplification level.
+
+    Falls back to reading (and simplifying in memory) the original
+    shapefile when the cache has not been built.
+    """
+    import geopandas as gpd
+
+    path = geometry_path(level, geometry_dir)
+    if os.path.exists(path):
+        return gpd.read_parquet(path)
+    gdf = gpd.read_file(f"zip://{shapefile}")
+    return simplify_layer(gdf[[col for col in GEOMETRY_COLUMNS if col in gdf.columns]], LEVELS[level])
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus geometry',
+        description="Build simplified GeoParquet versions of the IBGE state boundaries")
+    parser.add_argument('--shapefile', type=str, default=DEFAULT_SHAPEFILE,
+                        help='Source shapefile or ZIP archive (default: data/IBGE/shapefiles/BR_UF_2022.zip)')
+    parser.add_argument('-o', '--output_dir', type=str, default=DEFAULT_GEOMETRY_DIR,
+                        help='Directory of the GeoParquet files')
+    parser.add_argument('--levels', type=str, nargs='+', choices=list(LEVELS), default=None,
+                        help='Levels to build (default: all)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    report = build_geometry_cache(args.shapefile, args.output_dir, args.levels)
+    for level, info in report.items():
+        print(f"{level:<7} {info['vertices']:>9} vertices {info['bytes'] / 2**20:8.2f} MiB  {info['path']}")
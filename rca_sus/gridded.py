@@ -0,0 +1,341 @@
+"""
+Area‑weighted state series from gridded NASA POWER data.
+
+A state is poorly represented by the weather at its capital
+(:mod:`rca_sus.weather`), especially the large northern states.  The POWER
+regional API returns the same daily parameters on its native grid
+(0.5° × 0.625° for the meteorological variables).  This module downloads
+the grid over Brazil, and aggregates it to the 27 states as an
+area‑weighted mean::
+
+    series[uf, day] = Σ_cells w[uf, cell] · value[cell, day]
+
+The weights are the areas of the intersections between each grid cell and
+the ``BR_UF_2022`` polygons (scaled by the cosine of the cell latitude, so
+that they are proportional to areas on the sphere), normalised to sum to
+one per state.  They form a sparse ``(27, n_cells)`` matrix computed once
+per grid and boundary file and cached under ``data/NASA/grid/``; the
+series of every parameter and every day are then one sparse matrix
+product.  Cells without data (``NaN``) are left out of the mean of the
+days they are missing, with the remaining weights renormalised.
+
+Regional requests are limited to tiles of at most 10° × 10° and one
+parameter each; the responses are cached per tile, date range and
+parameter in ``data/NASA/regional/``.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus weather-grid --start 2019-01-01 --end 2019-12-31
+
+``scipy`` and ``shapely``/``geopandas`` are imported lazily.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ufs import UFS
+from .weather import DEFAULT_PARAMETERS, FILL_VALUE, _coordinate_token, _date_token
+
+#: Regional endpoint of the POWER API.
+POWER_REGIONAL_URL = "https://power.larc.nasa.gov/api/temporal/daily/regional"
+
+#: Directory of the cached regional responses.
+DEFAULT_REGIONAL_DIR = os.path.join("data", "NASA", "regional")
+
+#: Directory of the cached weight matrices.
+DEFAULT_GRID_DIR = os.path.join("data", "NASA", "grid")
+
+#: Default location of the area‑weighted daily weather table.
+DEFAULT_GRIDDED_WEATHER_PATH = os.path.join("data", "NASA", "weather_daily_uf_area.parquet")
+
+#: Bounding box requested by default (lat_min, lat_max, lon_min, lon_max),
+#: covering the country including its oceanic islands.
+BRAZIL_BOUNDS = (-34.0, 6.0, -74.0, -28.0)
+
+#: Largest side of a regional request, in degrees.
+MAX_TILE = 10.0
+
+
+class Grid(NamedTuple):
+    """Daily values on a regular latitude/longitude grid.
+
+    ``values`` maps each parameter to a ``float32`` array of shape
+    ``(n_days, n_lats, n_lons)``; cells are numbered row‑major
+    (``cell = i_lat * n_lons + i_lon``).
+    """
+    lats: np.ndarray
+    lons: np.ndarray
+    dates: pd.DatetimeIndex
+    values: Dict[str, np.ndarray]
+
+    @property
+    def n_cells(self) -> int:
+        return len(self.lats) * len(self.lons)
+
+
+def regional_tiles(bounds: Tuple[float, float, float, float] = BRAZIL_BOUNDS,
+                   step: float = MAX_TILE) -> List[Tuple[float, float, float, float]]:
+    """Split ``bounds`` into request tiles of at most ``step`` degrees per side."""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    lat_edges = np.append(np.arange(lat_min, lat_max, step), lat_max)
+    lon_edges = np.append(np.arange(lon_min, lon_max, step), lon_max)
+    return [(float(a), float(b), float(c), float(d))
+            for a, b in zip(lat_edges[:-1], lat_edges[1:])
+            for c, d in zip(lon_edges[:-1], lon_edges[1:])]
+
+
+def regional_filename(tile: Tuple[float, float, float, float], start: Any, end: Any, parameter: str) -> str:
+    lat_min, lat_max, lon_min, lon_max = tile
+    return (f"POWER_Regional_Daily_{_date_token(start)}_{_date_token(end)}_{parameter}_"
+            f"{_coordinate_token(lat_min, 'N', 'S')}_{_coordinate_token(lat_max, 'N', 'S')}_"
+            f"{_coordinate_token(lon_min, 'E', 'W')}_{_coordinate_token(lon_max, 'E', 'W')}.json")
+
+
+def regional_url(tile: Tuple[float, float, float, float], start: Any, end: Any, parameter: str,
+                 base_url: str = POWER_REGIONAL_URL) -> str:
+    lat_min, lat_max, lon_min, lon_max = tile
+    query = urllib.parse.urlencode({
+        'parameters': parameter,
+        'community': 'SB',
+        'latitude-min': f"{lat_min:.2f}",
+        'latitude-max': f"{lat_max:.2f}",
+        'longitude-min': f"{lon_min:.2f}",
+        'longitude-max': f"{lon_max:.2f}",
+        'start': _date_token(start),
+        'end': _date_token(end),
+        'format': 'JSON',
+    })
+    return f"{base_url}?{query}"
+
+
+def parse_regional_json(response: Dict[str, Any]) -> Grid:
+    """Convert a POWER regional response (a GeoJSON ``FeatureCollection``) into a :class:`Grid`."""
+    features = response['features']
+    fill = response.get('header', {}).get('fill_value', FILL_VALUE)
+    coords = np.array([feature['geometry']['coordinates'][:2] for feature in features], dtype='float64')
+    lons, i_lon = np.unique(coords[:, 0].round(4), return_inverse=True)
+    lats, i_lat = np.unique(coords[:, 1].round(4), return_inverse=True)
+    first = features[0]['properties']['parameter']
+    keys = np.array(list(next(iter(first.values()))), dtype=str)
+    dates = pd.DatetimeIndex(pd.to_datetime(keys, format='%Y%m%d'), name='DATE')
+    values = {}
+    for name in first:
+        cube = np.full((len(keys), len(lats), len(lons)), np.nan, dtype='float32')
+        for feature, a, b in zip(features, i_lat, i_lon):
+            series = feature['properties']['parameter'][name]
+            cube[:, a, b] = np.fromiter((series.get(key, fill) for key in keys), dtype='float64', count=len(keys))
+        cube[np.isclose(cube, fill)] = np.nan
+        values[name] = cube
+    return Grid(lats, lons, dates, values)
+
+
+def merge_grids(grids: Sequence[Grid]) -> Grid:
+    """Combine tiles (and parameters) covering the same dates into one grid."""
+    lats = np.unique(np.concatenate([grid.lats for grid in grids]))
+    lons = np.unique(np.concatenate([grid.lons for grid in grids]))
+    dates = grids[0].dates
+    values: Dict[str, np.ndarray] = {}
+    for grid in grids:
+        if not grid.dates.equals(dates):
+            raise ValueError("Grids cover different dates.")
+        rows = np.searchsorted(lats, grid.lats)
+        cols = np.searchsorted(lons, grid.lons)
+        for name, cube in grid.values.items():
+            target = values.setdefault(name, np.full((len(dates), len(lats), len(lons)), np.nan, dtype='float32'))
+            block = target[:, rows[:, None], cols[None, :]]
+            target[:, rows[:, None], cols[None, :]] = np.where(np.isnan(cube), block, cube)
+    return Grid(lats, lons, dates, values)
+
+
+def load_regional_grid(start: Any, end: Any,
+                       parameters: Sequence[str] = DEFAULT_PARAMETERS,
+                       bounds: Tuple[float, float, float, float] = BRAZIL_BOUNDS,
+                       cache_dir: str = DEFAULT_REGIONAL_DIR, offline: bool = False,
+                       base_url: str = POWER_REGIONAL_URL, timeout: float = 300.0) -> Grid:
+    """Daily grid of ``parameters`` over ``bounds``, from the cache or the POWER API.
+
+    With ``offline=True`` a missing tile raises ``FileNotFoundError``
+    instead of being downloaded.
+    """
+    grids = []
+    for parameter in parameters:
+        for tile in regional_tiles(bounds):
+            path = os.path.join(cache_dir, regional_filename(tile, start, end, parameter))
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    response = json.load(f)
+            elif offline:
+                raise FileNotFoundError(f"No cached POWER regional response at {path}.")
+            else:
+                url = regional_url(tile, start, end, parameter, base_url)
+                with urllib.request.urlopen(url, timeout=timeout) as reply:
+                    response = json.loads(reply.read().decode('utf-8'))
+                os.makedirs(cache_dir, exist_ok=True)
+                tmp = f"{path}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(response, f)
+                os.replace(tmp, path)
+            if response.get('features'):
+                grids.append(parse_regional_json(response))
+    return merge_grids(grids)
+
+
+def _edges(centres: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    step = np.median(np.diff(centres)) if len(centres) > 1 else 1.0
+    return centres - step / 2, centres + step / 2
+
+
+def area_weights(lats: np.ndarray, lons: np.ndarray, polygons: Sequence[Any]) -> Any:
+    """Sparse ``(len(polygons), n_cells)`` matrix of normalised cell‑area weights.
+
+    Parameters
+    ----------
+    lats, lons : np.ndarray
+        Sorted cell centres of a regular grid, in degrees.
+    polygons : sequence of shapely geometries
+        One (multi)polygon per unit, in longitude/latitude.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        ``w[unit, cell]`` proportional to the spherical area of the
+        intersection of the cell with the unit; each non‑empty row sums
+        to one.
+    """
+    import shapely
+    from scipy import sparse
+
+    lat_lo, lat_hi = _edges(np.asarray(lats, dtype='float64'))
+    lon_lo, lon_hi = _edges(np.asarray(lons, dtype='float64'))
+    y0, x0 = np.meshgrid(lat_lo, lon_lo, indexing='ij')
+    y1, x1 = np.meshgrid(lat_hi, lon_hi, indexing='ij')
+    boxes = shapely.box(x0.ravel(), y0.ravel(), x1.ravel(), y1.ravel())
+    scale = np.cos(np.radians(np.repeat(np.asarray(lats, dtype='float64'), len(lons))))
+    tree = shapely.STRtree(boxes)
+    rows, cols, data = [], [], []
+    for unit, polygon in enumerate(polygons):
+        shapely.prepare(polygon)
+        cells = tree.query(polygon, predicate='intersects')
+        areas = shapely.area(shapely.intersection(boxes[cells], polygon)) * scale[cells]
+        keep = areas > 0
+        if keep.any():
+            rows.append(np.full(keep.sum(), unit))
+            cols.append(cells[keep])
+            data.append(areas[keep] / areas[keep].sum())
+    shape = (len(polygons), len(boxes))
+    if not rows:
+        return sparse.csr_matrix(shape)
+    return sparse.csr_matrix((np.concatenate(data), (np.concatenate(rows), np.concatenate(cols))), shape=shape)
+
+
+def _weights_key(lats: np.ndarray, lons: np.ndarray, source_hash: Optional[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(np.asarray(lats, dtype='float64').tobytes())
+    digest.update(np.asarray(lons, dtype='float64').tobytes())
+    digest.update((source_hash or '').encode())
+    return digest.hexdigest()[:16]
+
+
+def state_weights(lats: np.ndarray, lons: np.ndarray, level: str = 'high',
+                  grid_dir: str = DEFAULT_GRID_DIR) -> Any:
+    """Cached ``(27, n_cells)`` area‑weight matrix of a grid against the state boundaries.
+
+    The states come from :func:`rca_sus.geometry.load_geometry` at
+    ``level``; the matrix is recomputed only when the grid or the
+    boundary file changes.
+    """
+    from scipy import sparse
+
+    from .geometry import DEFAULT_SHAPEFILE, geometry_path, load_geometry
+    from .render_cache import content_hash
+
+    source = geometry_path(level)
+    source_hash = content_hash(source if os.path.exists(source) else DEFAULT_SHAPEFILE)
+    path = os.path.join(grid_dir, f"uf_weights_{_weights_key(lats, lons, source_hash)}.npz")
+    if os.path.exists(path):
+        return sparse.load_npz(path).tocsr()
+    states = load_geometry(level).set_index('SIGLA_UF').reindex(UFS)
+    weights = area_weights(lats, lons, list(states.geometry))
+    os.makedirs(grid_dir, exist_ok=True)
+    sparse.save_npz(path, weights)
+    return weights
+
+
+def aggregate_grid(grid: Grid, weights: Any, units: Sequence[str] = UFS,
+                   unit_column: str = 'SG_UF') -> pd.DataFrame:
+    """Area‑weighted means of every parameter and day, in one sparse product.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns ``unit_column`` (categorical), ``DATE`` and one ``float32``
+        column per parameter, sorted by unit and date – the layout of
+        :func:`rca_sus.weather.weather_table`.
+    """
+    names = list(grid.values)
+    n_days = len(grid.dates)
+    # (n_cells, n_params * n_days): the columns of every parameter and day side by side
+    stacked = np.stack([grid.values[name].reshape(n_days, -1) for name in names]).reshape(-1, grid.n_cells).T
+    present = ~np.isnan(stacked)
+    sums = weights @ np.hstack([np.where(present, stacked, 0.0), present]).astype('float64')
+    totals, coverage = sums[:, :stacked.shape[1]], sums[:, stacked.shape[1]:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(coverage > 0, totals / coverage, np.nan).astype('float32')
+    means = means.reshape(len(units), len(names), n_days)
+    frame = pd.DataFrame({
+        unit_column: pd.Categorical(np.repeat(list(units), n_days), categories=list(units)),
+        'DATE': np.tile(grid.dates.to_numpy(dtype='datetime64[ns]'), len(units)),
+    })
+    for k, name in enumerate(names):
+        frame[name] = means[:, k, :].ravel()
+    return frame
+
+
+def gridded_weather_table(start: Any, end: Any,
+                          parameters: Sequence[str] = DEFAULT_PARAMETERS,
+                          cache_dir: str = DEFAULT_REGIONAL_DIR, grid_dir: str = DEFAULT_GRID_DIR,
+                          offline: bool = False, base_url: str = POWER_REGIONAL_URL) -> pd.DataFrame:
+    """Area‑weighted daily weather of the 27 states from the POWER regional grid."""
+    grid = load_regional_grid(start, end, parameters, cache_dir=cache_dir, offline=offline, base_url=base_url)
+    return aggregate_grid(grid, state_weights(grid.lats, grid.lons, grid_dir=grid_dir))[['SG_UF', 'DATE', *parameters]]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus weather-grid',
+        description="Build area-weighted daily weather per state from the NASA POWER regional grid")
+    parser.add_argument('--start', type=str, required=True, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, required=True, help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--parameters', type=str, nargs='+', default=DEFAULT_PARAMETERS,
+                        help='POWER parameters (default: T2M T2M_MAX T2M_MIN PRECTOTCORR RH2M)')
+    parser.add_argument('--cache_dir', type=str, default=DEFAULT_REGIONAL_DIR,
+                        help='Directory of the cached regional responses (default: data/NASA/regional)')
+    parser.add_argument('--grid_dir', type=str, default=DEFAULT_GRID_DIR,
+                        help='Directory of the cached weight matrices (default: data/NASA/grid)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only use cached responses; fail if one is missing')
+    parser.add_argument('--base_url', type=str, default=POWER_REGIONAL_URL,
+                        help='POWER regional endpoint (e.g. a local server replaying recorded responses)')
+    parser.add_argument('-o', '--output', type=str, default=DEFAULT_GRIDDED_WEATHER_PATH,
+                        help='Output Parquet file (default: data/NASA/weather_daily_uf_area.parquet)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from .weather import write_weather_table
+
+    args = parse_args(argv)
+    table = gridded_weather_table(args.start, args.end, args.parameters, args.cache_dir,
+                                  args.grid_dir, args.offline, args.base_url)
+    write_weather_table(table, args.output)
+    print(f"Wrote {len(table)} rows ({table['SG_UF'].nunique()} states) to {args.output}")
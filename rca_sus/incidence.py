@@ -0,0 +1,213 @@
+"""
+Vectorised incidence rates with Poisson confidence intervals.
+
+Incidence per 100 000 inhabitants used to be computed separately (and
+row by row) in the Data Explorer, the map page and the notebooks.  The
+functions below take case counts and populations as arrays aligned to
+the fixed state index :data:`rca_sus.ufs.UFS` and compute everything in
+one broadcast pass, so a matrix of counts with one row per year or date
+window (see :meth:`rca_sus.timeseries.CountStore.window_totals`) is
+handled as cheaply as a single vector::
+
+    cases = store.window_totals([('2020-03-01', '2020-05-31'), ('2020-06-01', '2020-08-31')])
+    result = incidence(cases, population)        # arrays of shape (2, 27)
+
+Confidence intervals for the crude rate treat the count as Poisson:
+``method='byar'`` (default) uses Byar's approximation, which needs only
+NumPy and is within 1% of the exact limits from about ten cases upward;
+``method='exact'`` uses the exact (Garwood) chi‑square limits and
+requires SciPy.  Directly age‑standardised rates use the same limits for
+the total count, scaled with Dobson's method.
+"""
+
+from __future__ import annotations
+
+from statistics import NormalDist
+from typing import NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .ufs import UFS
+
+#: Rates are expressed per this many inhabitants by default.
+PER = 100_000
+
+ArrayLike = Union[np.ndarray, pd.Series, pd.DataFrame, list, float, int]
+
+
+class IncidenceResult(NamedTuple):
+    """Rates and confidence limits, all of the broadcast shape of the inputs."""
+    cases: np.ndarray
+    population: np.ndarray
+    rate: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+def align_to_ufs(values: pd.Series, fill_value: float = np.nan) -> np.ndarray:
+    """Return ``values`` (indexed by state abbreviation) in :data:`UFS` order.
+
+    A frame with states as columns (e.g. one row per year) is aligned on
+    its columns and returned as a 2‑D array.
+    """
+    if isinstance(values, pd.DataFrame):
+        return values.reindex(columns=UFS, fill_value=fill_value).to_numpy(dtype='float64')
+    return values.reindex(UFS, fill_value=fill_value).to_numpy(dtype='float64')
+
+
+def poisson_limits(cases: ArrayLike, alpha: float = 0.05, method: str = 'byar') -> Tuple[np.ndarray, np.ndarray]:
+    """Two‑sided ``1 - alpha`` confidence limits for Poisson counts.
+
+    Parameters
+    ----------
+    cases : array_like
+        Observed counts (non‑negative).  ``NaN`` propagates.
+    alpha : float, default 0.05
+        One minus the confidence level.
+    method : {'byar', 'exact'}
+        Byar's approximation or the exact Garwood limits (needs SciPy).
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        Lower and upper limits for the expected count.
+    """
+    cases = np.asarray(cases, dtype='float64')
+    if method == 'exact':
+        from scipy.stats import chi2
+
+        with np.errstate(invalid='ignore'):
+            lower = np.where(cases > 0, chi2.ppf(alpha / 2, 2 * cases) / 2, 0.0)
+            upper = chi2.ppf(1 - alpha / 2, 2 * (cases + 1)) / 2
+        return np.where(np.isnan(cases), np.nan, lower), upper
+    if method != 'byar':
+        raise ValueError(f"Unknown method {method!r}; expected 'byar' or 'exact'.")
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lower = cases * (1 - 1 / (9 * cases) - z / (3 * np.sqrt(cases))) ** 3
+        upper = (cases + 1) * (1 - 1 / (9 * (cases + 1)) + z / (3 * np.sqrt(cases + 1))) ** 3
+    lower = np.where(cases > 0, lower, 0.0)
+    return np.where(np.isnan(cases), np.nan, lower), upper
+
+
+def _per_population(values: np.ndarray, population: np.ndarray, per: float) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(population > 0, values / population * per, np.nan)
+
+
+def incidence(cases: ArrayLike,
+              population: ArrayLike,
+              per: float = PER,
+              alpha: float = 0.05,
+              method: str = 'byar') -> IncidenceResult:
+    """Crude incidence rates with Poisson confidence intervals.
+
+    Parameters
+    ----------
+    cases : array_like
+        Case counts, e.g. of shape ``(27,)`` or ``(n_windows, 27)``.
+    population : array_like
+        Populations broadcastable against ``cases``.  Missing or
+        non‑positive populations give ``NaN`` rates.
+    per : float, default 100 000
+        Rates are expressed per ``per`` inhabitants.
+    alpha, method
+        See :func:`poisson_limits`.
+    """
+    cases = np.asarray(cases, dtype='float64')
+    population = np.asarray(population, dtype='float64')
+    cases, population = np.broadcast_arrays(cases, population)
+    lower, upper = poisson_limits(cases, alpha=alpha, method=method)
+    return IncidenceResult(
+        cases=cases,
+        population=population,
+        rate=_per_population(cases, population, per),
+        lower=_per_population(lower, population, per),
+        upper=_per_population(upper, population, per),
+    )
+
+
+def age_standardized(cases: ArrayLike,
+                     population: ArrayLike,
+                     standard: ArrayLike,
+                     per: float = PER,
+                     alpha: float = 0.05,
+                     method: str = 'byar') -> IncidenceResult:
+    """Directly age‑standardised rates with Dobson confidence intervals.
+
+    Parameters
+    ----------
+    cases, population : array_like
+        Counts and populations with the age bands on the last axis, e.g.
+        of shape ``(n_years, 27, n_bands)``.
+    standard : array_like
+        Standard population (or weights) per age band, of shape
+        ``(n_bands,)``; it is normalised to sum to one.
+    per, alpha, method
+        See :func:`incidence`.
+
+    Returns
+    -------
+    IncidenceResult
+        ``cases`` and ``population`` are the totals over the age bands;
+        the rates and limits are standardised.
+    """
+    cases = np.asarray(cases, dtype='float64')
+    population = np.asarray(population, dtype='float64')
+    cases, population = np.broadcast_arrays(cases, population)
+    weights = np.asarray(standard, dtype='float64')
+    weights = weights / weights.sum()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        band_rates = np.where(population > 0, cases / population, np.nan)
+        variance = np.where(population > 0, cases / population ** 2, np.nan)
+    rate = (weights * band_rates).sum(axis=-1)
+    variance = (weights ** 2 * variance).sum(axis=-1)
+    total = cases.sum(axis=-1)
+    lower_total, upper_total = poisson_limits(total, alpha=alpha, method=method)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(total > 0, np.sqrt(variance / total), 0.0)
+    lower = np.maximum(rate + scale * (lower_total - total), 0.0)
+    upper = rate + scale * (upper_total - total)
+    if np.any(total == 0):
+        # with no cases Dobson's scale is undefined; fall back to the
+        # upper limit of a zero count over the standard‑weighted population
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective = 1.0 / (weights / np.where(population > 0, population, np.nan)).sum(axis=-1)
+        upper = np.where(total == 0, upper_total / effective, upper)
+    return IncidenceResult(
+        cases=total,
+        population=population.sum(axis=-1),
+        rate=rate * per,
+        lower=lower * per,
+        upper=upper * per,
+    )
+
+
+def incidence_frame(cases: pd.Series,
+                    population: pd.Series,
+                    per: float = PER,
+                    alpha: float = 0.05,
+                    method: str = 'byar',
+                    ufs: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Incidence table per state from labelled counts and populations.
+
+    Both series are indexed by state abbreviation and aligned on
+    :data:`UFS` (states without cases count as zero); ``ufs`` selects
+    and orders the rows returned.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by ``SG_UF`` with columns ``COUNT``, ``Population``,
+        ``incidence``, ``incidence_lower`` and ``incidence_upper``.
+    """
+    result = incidence(align_to_ufs(cases, 0), align_to_ufs(population), per=per, alpha=alpha, method=method)
+    frame = pd.DataFrame({
+        'COUNT': result.cases.astype('int64'),
+        'Population': pd.array(result.population, dtype='Int64'),
+        'incidence': result.rate,
+        'incidence_lower': result.lower,
+        'incidence_upper': result.upper,
+    }, index=pd.Index(UFS, name='SG_UF'))
+    return frame if ufs is None else frame.loc[list(ufs)]
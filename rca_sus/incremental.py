@@ -0,0 +1,348 @@
+"""
+Incremental refresh of the SIVEP aggregates between snapshots.
+
+OpenDataSUS republishes every year of SIVEP‑Gripe as a cumulative
+snapshot (the current files are stamped ``26-06-2025``), and older years
+keep being revised.  Rather than re‑aggregating a year from scratch, this
+module keeps a *fingerprint* of the snapshot that produced the stored
+aggregates: one row per notification with
+
+* ``KEY`` – a hash of ``NU_NOTIFIC``;
+* ``ROW_HASH`` – a hash of every field of the record;
+* ``DT_SIN_PRI`` and ``CELL`` – the record's coordinates in the
+  :class:`rca_sus.cube.SivepCube` (``NaT``/``-1`` when it has none).
+
+When a new snapshot is published its rows are hashed while streaming,
+and only records whose hash is not in the stored fingerprint are parsed
+with the typed schema.  Comparing the two fingerprints classifies
+notifications as inserted, changed or deleted; the aggregated table and
+the cube are then updated with the signed counts of those records alone,
+and the ``(UF, date)`` cells that moved are appended to a changelog.
+Only records that have a cell in the cube are tracked: rows of the
+aggregated table for other state codes, or for onsets outside the
+cube's window, keep the counts of the initial aggregation.
+Reading the new file is unavoidable, but the parsing, aggregation and
+output work scale with the size of the change, not with the size of the
+year.
+
+Command‑line usage (from the repository root)::
+
+    # once, from the snapshot the current aggregates were built from
+    python -m rca_sus refresh data/SIVEP/2020/INFLUD20-26-06-2025.zip --init
+    # for every later snapshot
+    python -m rca_sus refresh INFLUD20-14-09-2025.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from typing import Any, Dict, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cube import (CELLS_PER_UF, CUBE_COLUMNS, SivepCube, Window, cell_indices, cube_from_cells, default_cube_path,
+                   onset_window, placed_mask)
+from .ingest import (AGGREGATE_COLUMNS, DEFAULT_CHUNKSIZE, DEFAULT_ENCODING, DEFAULT_SEP, aggregate_influd,
+                     counts_to_frame, default_output_path, infer_year, open_influd, write_aggregated)
+from .schema import apply_schema
+from .ufs import UFS
+
+#: Column identifying a notification.
+KEY_COLUMN = 'NU_NOTIFIC'
+
+FINGERPRINT_COLUMNS = ['KEY', 'ROW_HASH', 'DT_SIN_PRI', 'CELL']
+
+
+class SnapshotDiff(NamedTuple):
+    """Records that differ between two snapshots.
+
+    ``removed`` and ``added`` are fingerprint rows present only in the
+    old and only in the new snapshot; a notification whose content
+    changed appears in both.
+    """
+    removed: pd.DataFrame
+    added: pd.DataFrame
+    inserted: int
+    changed: int
+    deleted: int
+
+
+def default_fingerprint_path(year: int) -> str:
+    """Return the conventional location of the fingerprint for ``year``."""
+    return os.path.join("data", "SIVEP", str(year), f"fingerprint_sivep_{year}.npz")
+
+
+def default_changelog_path(year: int) -> str:
+    """Return the conventional location of the changelog for ``year``."""
+    return os.path.join("data", "SIVEP", str(year), f"changelog_sivep_{year}.csv")
+
+
+def empty_fingerprint() -> pd.DataFrame:
+    return pd.DataFrame({
+        'KEY': pd.Series(dtype='uint64'),
+        'ROW_HASH': pd.Series(dtype='uint64'),
+        'DT_SIN_PRI': pd.Series(dtype='datetime64[s]'),
+        'CELL': pd.Series(dtype='int32'),
+    })
+
+
+def hash_records(chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the ``(KEY, ROW_HASH)`` hashes of a chunk of raw strings."""
+    keys = pd.util.hash_array(chunk[KEY_COLUMN].to_numpy(dtype=object))
+    rows = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    return keys, rows
+
+
+def fingerprint_influd(path: str,
+                       previous: Optional[pd.DataFrame] = None,
+                       chunksize: int = DEFAULT_CHUNKSIZE,
+                       sep: str = DEFAULT_SEP,
+                       encoding: str = DEFAULT_ENCODING,
+                       window: Optional[Window] = None) -> pd.DataFrame:
+    """Fingerprint an INFLUD snapshot.
+
+    Parameters
+    ----------
+    path : str
+        INFLUD CSV or ZIP archive, opened with
+        :func:`rca_sus.ingest.open_influd`.
+    previous : pandas.DataFrame, optional
+        Fingerprint of an earlier snapshot.  Records with a row hash found
+        there reuse its cube coordinates; only the others are parsed with
+        the typed schema.  Without it every record is parsed.
+    window : (numpy.datetime64, numpy.datetime64), optional
+        Onset dates kept in the cube (see :func:`rca_sus.cube.onset_window`);
+        records outside it get no cell.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per record with the columns ``KEY``, ``ROW_HASH``,
+        ``DT_SIN_PRI`` and ``CELL``, in file order.
+    """
+    if previous is None:
+        previous = empty_fingerprint()
+    known = previous.drop_duplicates('ROW_HASH')
+    known_index = pd.Index(known['ROW_HASH'].to_numpy())
+    known_onset = known['DT_SIN_PRI'].to_numpy().astype('datetime64[D]')
+    known_cell = known['CELL'].to_numpy()
+    parts = []
+    with open_influd(path) as fh:
+        reader = pd.read_csv(fh, sep=sep, dtype=str, keep_default_na=False,
+                             encoding=encoding, chunksize=chunksize)
+        for chunk in reader:
+            keys, rows = hash_records(chunk)
+            onset = np.full(len(chunk), np.datetime64('NaT'), dtype='datetime64[D]')
+            cell = np.full(len(chunk), -1, dtype=np.int32)
+            position = known_index.get_indexer(rows)
+            found = position >= 0
+            onset[found] = known_onset[position[found]]
+            cell[found] = known_cell[position[found]]
+            fresh = np.flatnonzero(~found)
+            if len(fresh):
+                typed = apply_schema(chunk.iloc[fresh][CUBE_COLUMNS].replace('', np.nan))
+                fresh_onset, _, fresh_cell = cell_indices(typed, window)
+                placed = fresh[placed_mask(typed, window)]
+                onset[placed] = fresh_onset
+                cell[placed] = fresh_cell
+            parts.append(pd.DataFrame({'KEY': keys, 'ROW_HASH': rows, 'DT_SIN_PRI': onset, 'CELL': cell}))
+    if not parts:
+        return empty_fingerprint()
+    return pd.concat(parts, ignore_index=True)
+
+
+def save_fingerprint(fingerprint: pd.DataFrame, path: str) -> None:
+    """Save a fingerprint as a compressed ``.npz`` file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez_compressed(path, **{col: fingerprint[col].to_numpy() for col in FINGERPRINT_COLUMNS})
+
+
+def load_fingerprint(path: str) -> pd.DataFrame:
+    """Load a fingerprint written by :func:`save_fingerprint`."""
+    with np.load(path, allow_pickle=False) as data:
+        return pd.DataFrame({col: data[col] for col in FINGERPRINT_COLUMNS})
+
+
+def diff_fingerprints(old: pd.DataFrame, new: pd.DataFrame) -> SnapshotDiff:
+    """Compare the fingerprints of two snapshots.
+
+    Records are matched by row hash (identical duplicates are matched one
+    to one), so any edit to a record shows up as the removal of its old
+    version and the addition of the new one.  Notifications are then
+    classified by ``KEY``: present on both sides of the difference means
+    changed, only in ``added`` inserted and only in ``removed`` deleted.
+    """
+    old = old.assign(_OCC=old.groupby('ROW_HASH').cumcount())
+    new = new.assign(_OCC=new.groupby('ROW_HASH').cumcount())
+    merged = old[['ROW_HASH', '_OCC']].merge(new[['ROW_HASH', '_OCC']], how='outer', indicator=True)
+    removed = old.merge(merged.loc[merged['_merge'] == 'left_only', ['ROW_HASH', '_OCC']])
+    added = new.merge(merged.loc[merged['_merge'] == 'right_only', ['ROW_HASH', '_OCC']])
+    removed_keys = set(removed['KEY'].tolist())
+    added_keys = set(added['KEY'].tolist())
+    return SnapshotDiff(
+        removed=removed[FINGERPRINT_COLUMNS],
+        added=added[FINGERPRINT_COLUMNS],
+        inserted=len(added_keys - removed_keys),
+        changed=len(added_keys & removed_keys),
+        deleted=len(removed_keys - added_keys),
+    )
+
+
+def cell_deltas(diff: SnapshotDiff) -> pd.DataFrame:
+    """Net signed count per cube cell implied by ``diff``.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns ``DT_SIN_PRI``, ``CELL`` and ``DELTA`` for the cells whose
+        count changes; records outside the cube are ignored.
+    """
+    signed = pd.concat([
+        diff.removed[['DT_SIN_PRI', 'CELL']].assign(DELTA=-1),
+        diff.added[['DT_SIN_PRI', 'CELL']].assign(DELTA=1),
+    ], ignore_index=True)
+    signed = signed[signed['CELL'] >= 0]
+    deltas = signed.groupby(['DT_SIN_PRI', 'CELL'], as_index=False)['DELTA'].sum()
+    return deltas[deltas['DELTA'] != 0].reset_index(drop=True)
+
+
+def apply_to_aggregated(aggregated: pd.DataFrame, deltas: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Apply cell deltas to an aggregated ``SG_UF,DT_SIN_PRI,COUNT`` table.
+
+    Returns
+    -------
+    (pandas.DataFrame, pandas.DataFrame)
+        The updated table and the changelog: one row per ``(SG_UF,
+        DT_SIN_PRI)`` cell that moved, with its ``BEFORE``, ``AFTER`` and
+        ``DELTA`` counts.
+    """
+    deltas = deltas.assign(SG_UF=np.asarray(UFS)[deltas['CELL'].to_numpy() // CELLS_PER_UF],
+                           DT_SIN_PRI=deltas['DT_SIN_PRI'].astype('datetime64[ns]'))
+    moved = deltas.groupby(AGGREGATE_COLUMNS)['DELTA'].sum()
+    moved = moved[moved != 0]
+    counts = aggregated.astype({'DT_SIN_PRI': 'datetime64[ns]'}).set_index(AGGREGATE_COLUMNS)['COUNT']
+    before = counts.reindex(moved.index, fill_value=0)
+    after = before + moved
+    if (after < 0).any():
+        raise ValueError("Delta makes some counts negative; it does not match the aggregated table.")
+    updated = counts.add(moved, fill_value=0)
+    updated = updated[updated > 0]
+    changelog = pd.DataFrame({'BEFORE': before, 'AFTER': after, 'DELTA': moved}).reset_index()
+    return counts_to_frame(updated), changelog
+
+
+def refresh(source: str,
+            year: int,
+            chunksize: int = DEFAULT_CHUNKSIZE,
+            sep: str = DEFAULT_SEP,
+            encoding: str = DEFAULT_ENCODING) -> Dict[str, Any]:
+    """Update the stored aggregates of ``year`` to a new snapshot.
+
+    Reads the fingerprint, aggregated table and cube from their default
+    locations, applies the difference to ``source`` and writes all three
+    back, appending the moved cells to the changelog.
+
+    Returns
+    -------
+    dict
+        Summary with the numbers of inserted, changed and deleted
+        notifications and of moved ``(UF, date)`` cells.
+    """
+    fingerprint_path = default_fingerprint_path(year)
+    if not os.path.exists(fingerprint_path):
+        raise FileNotFoundError(f"No fingerprint for {year} at {fingerprint_path}; run with --init first.")
+    old = load_fingerprint(fingerprint_path)
+    new = fingerprint_influd(source, previous=old, chunksize=chunksize, sep=sep, encoding=encoding,
+                             window=onset_window(year))
+    diff = diff_fingerprints(old, new)
+    deltas = cell_deltas(diff)
+
+    aggregated_path = default_output_path(year)
+    aggregated = pd.read_csv(aggregated_path, parse_dates=['DT_SIN_PRI'])
+    aggregated, changelog = apply_to_aggregated(aggregated, deltas)
+    cube_path = default_cube_path(year)
+    cube = SivepCube.load(cube_path)
+    cube.apply_delta(deltas['DT_SIN_PRI'].to_numpy().astype('datetime64[D]'),
+                     deltas['CELL'].to_numpy(), deltas['DELTA'].to_numpy())
+    cube.meta['source'] = os.path.basename(source)
+
+    write_aggregated(aggregated, aggregated_path)
+    cube.save(cube_path)
+    save_fingerprint(new, fingerprint_path)
+    changelog_path = default_changelog_path(year)
+    changelog.insert(0, 'SNAPSHOT', os.path.basename(source))
+    changelog.to_csv(changelog_path, mode='a', header=not os.path.exists(changelog_path),
+                     index=False, date_format='%Y-%m-%d')
+    return {'inserted': diff.inserted, 'changed': diff.changed, 'deleted': diff.deleted,
+            'cells': len(changelog)}
+
+
+def initialise(source: str,
+               year: int,
+               chunksize: int = DEFAULT_CHUNKSIZE,
+               sep: str = DEFAULT_SEP,
+               encoding: str = DEFAULT_ENCODING) -> pd.DataFrame:
+    """Build the fingerprint and cube of ``year`` from scratch.
+
+    An existing aggregated table is left as it is (it must have been
+    built from ``source``); a missing one is written with
+    :func:`rca_sus.ingest.aggregate_influd`, as ``python -m rca_sus
+    aggregate`` would, and not from the cube, which only keeps the 27
+    states and the onset window.
+    """
+    fingerprint = fingerprint_influd(source, chunksize=chunksize, sep=sep, encoding=encoding,
+                                     window=onset_window(year))
+    placed = fingerprint[fingerprint['CELL'] >= 0]
+    cube = cube_from_cells(placed['DT_SIN_PRI'].to_numpy().astype('datetime64[D]'), placed['CELL'].to_numpy(),
+                           meta={'source': os.path.basename(source), 'year': year})
+    aggregated_path = default_output_path(year)
+    if not os.path.exists(aggregated_path):
+        write_aggregated(aggregate_influd(source, chunksize=chunksize, sep=sep, encoding=encoding), aggregated_path)
+    cube.save(default_cube_path(year))
+    save_fingerprint(fingerprint, default_fingerprint_path(year))
+    return fingerprint
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus refresh',
+        description="Update the stored SIVEP aggregates and cube of a year to a new INFLUD snapshot")
+    parser.add_argument('source', type=str,
+                        help='New INFLUD CSV or ZIP archive (for split archives, the final .zip segment)')
+    parser.add_argument('--year', type=int, default=None,
+                        help='Year of the data; inferred from the file name when omitted')
+    parser.add_argument('--init', action='store_true',
+                        help='Rebuild the fingerprint and cube from scratch from SOURCE (the aggregated table '
+                             'is only written when missing)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='Number of CSV rows parsed per chunk')
+    parser.add_argument('--sep', type=str, default=DEFAULT_SEP, help='CSV field separator')
+    parser.add_argument('--encoding', type=str, default=DEFAULT_ENCODING, help='CSV text encoding')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    year = args.year or infer_year(args.source)
+    if year is None:
+        raise SystemExit("Could not infer the year from the file name; pass --year.")
+    from .catalog import update_catalog
+    from .tensor import update_tensor
+
+    options = dict(chunksize=args.chunksize, sep=args.sep, encoding=args.encoding)
+    if args.init:
+        fingerprint = initialise(args.source, year, **options)
+        update_catalog([year])
+        update_tensor()
+        print(f"Fingerprinted {len(fingerprint)} records of {year} and rebuilt the cube")
+        return
+    summary = refresh(args.source, year, **options)
+    update_catalog([year])
+    update_tensor()
+    print(f"{year}: {summary['inserted']} inserted, {summary['changed']} changed, "
+          f"{summary['deleted']} deleted notifications; {summary['cells']} (UF, date) cells moved "
+          f"(see {default_changelog_path(year)})")
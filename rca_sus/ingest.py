@@ -0,0 +1,526 @@
+"""
+Streaming ingest of SIVEP‑Gripe (INFLUD) microdata.
+
+The OpenDataSUS INFLUD files are several gigabytes once extracted.  In
+this repository they are stored as ZIP archives; the 2020 archive is a
+*split* ZIP whose first segment (``.z01``) is itself cut into
+``.partNN`` pieces to stay under GitHub's upload limit, followed by the
+final ``.zip`` segment.  The README documents how to reassemble and
+extract the archive by hand, which costs several gigabytes of disk and
+memory per year.
+
+This module removes that step.  :func:`open_influd` exposes the CSV
+member of a (possibly split) archive as a forward‑only binary stream:
+the segments are read one after another in fixed‑size blocks and the
+member is inflated on the fly with :mod:`zlib`, so nothing is written
+to disk and memory stays bounded by the block size.  Because the
+stream never seeks, the central directory (which for split archives
+stores offsets relative to each segment) is never needed; the local
+file headers carry all the information required to decode the data.
+
+:func:`aggregate_influd` consumes that stream with ``pandas`` in
+chunks, keeping only ``SG_UF`` and ``DT_SIN_PRI``, and produces the
+same ``SG_UF,DT_SIN_PRI,COUNT`` table as the files in
+``data/SIVEP/<year>/aggregated_sivep_<year>.csv``.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus aggregate data/SIVEP/2020/INFLUD20-26-06-2025.zip
+
+The output path defaults to ``data/SIVEP/<year>/aggregated_sivep_<year>.csv``
+with the year inferred from the file name; see ``--help`` for options.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import io
+import os
+import re
+import struct
+import zipfile
+import zlib
+from typing import BinaryIO, List, Optional, Sequence
+
+import pandas as pd
+
+
+#: Columns read from the INFLUD files to build the aggregated table.
+AGGREGATE_COLUMNS = ['SG_UF', 'DT_SIN_PRI']
+
+#: Number of CSV rows parsed per chunk.
+DEFAULT_CHUNKSIZE = 500_000
+
+#: Number of raw bytes read from the archive per block.
+READ_SIZE = 1 << 20
+
+# field separator and encoding used by the OpenDataSUS INFLUD exports
+DEFAULT_SEP = ';'
+DEFAULT_ENCODING = 'latin-1'
+
+_LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+_LOCAL_SIGNATURE = b'PK\x03\x04'
+# the same signature marks the start of a split archive and (optionally)
+# a data descriptor following the compressed data
+_SPLIT_SIGNATURE = b'PK\x07\x08'
+_ZIP64_EXTRA_ID = 0x0001
+_FLAG_ENCRYPTED = 0x0001
+_FLAG_DATA_DESCRIPTOR = 0x0008
+_FLAG_UTF8 = 0x0800
+_STORED = 0
+_DEFLATED = 8
+
+
+def find_segments(zip_path: str) -> List[str]:
+    """Return the ordered list of files making up a ZIP archive.
+
+    For a single‑file archive the result is ``[zip_path]``.  For a split
+    archive ``name.zip`` the segments ``name.z01``, ``name.z02``, ... are
+    listed first, followed by ``name.zip``.  A segment may itself be cut
+    into pieces ``name.z01.part00``, ``name.z01.part01``, ..., as done in
+    this repository for the 2020 microdata.
+
+    Raises
+    ------
+    FileNotFoundError
+        If ``zip_path`` does not exist or the ``.partNN`` pieces of a
+        segment are not numbered contiguously from zero.
+    """
+    if not os.path.exists(zip_path):
+        raise FileNotFoundError(zip_path)
+    stem = os.path.splitext(zip_path)[0]
+    segments: List[str] = []
+    disk = 1
+    while True:
+        segment = f"{stem}.z{disk:02d}"
+        if os.path.exists(segment):
+            segments.append(segment)
+        else:
+            parts = glob.glob(glob.escape(segment) + '.part*')
+            if not parts:
+                break
+            numbered = sorted((_part_number(p), p) for p in parts)
+            missing = sorted(set(range(numbered[-1][0] + 1)) - {n for n, _ in numbered})
+            if missing:
+                raise FileNotFoundError(
+                    f"Segment {segment} is incomplete; missing pieces: "
+                    + ", ".join(f"part{n:02d}" for n in missing))
+            segments.extend(p for _, p in numbered)
+        disk += 1
+    segments.append(zip_path)
+    return segments
+
+
+def _part_number(path: str) -> int:
+    """Return the numeric suffix of a ``.partNN`` file name."""
+    match = re.search(r'\.part(\d+)$', path)
+    return int(match.group(1)) if match else -1
+
+
+class _SegmentReader:
+    """Forward‑only reader over the concatenation of several files.
+
+    Only one file handle is open at a time.  Bytes consumed beyond the
+    end of a ZIP member can be pushed back with :meth:`unread` so the
+    next local header can be parsed.
+    """
+
+    def __init__(self, paths: Sequence[str]) -> None:
+        self._paths = list(paths)
+        self._index = 0
+        self._fh: Optional[BinaryIO] = None
+        self._pending = b''
+
+    def read(self, size: int) -> bytes:
+        if self._pending:
+            data, self._pending = self._pending[:size], self._pending[size:]
+            return data
+        while self._index < len(self._paths):
+            if self._fh is None:
+                self._fh = open(self._paths[self._index], 'rb')
+            data = self._fh.read(size)
+            if data:
+                return data
+            self._fh.close()
+            self._fh = None
+            self._index += 1
+        return b''
+
+    def read_exact(self, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            data = self.read(size - len(buf))
+            if not data:
+                raise zipfile.BadZipFile("Unexpected end of archive")
+            buf += data
+        return bytes(buf)
+
+    def unread(self, data: bytes) -> None:
+        self._pending = data + self._pending
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._index = len(self._paths)
+
+
+class _MemberReader(io.RawIOBase):
+    """Raw stream yielding the decompressed bytes of one ZIP member.
+
+    The CRC‑32 of the decompressed data is checked once the member has
+    been fully read.
+    """
+
+    def __init__(self,
+                 source: _SegmentReader,
+                 method: int,
+                 flags: int,
+                 crc: int,
+                 compressed_size: int,
+                 zip64: bool,
+                 read_size: int = READ_SIZE) -> None:
+        super().__init__()
+        self._source = source
+        self._method = method
+        self._flags = flags
+        self._expected_crc = crc
+        self._remaining = compressed_size
+        self._zip64 = zip64
+        self._read_size = read_size
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == _DEFLATED else None
+        self._buffer = b''
+        self._offset = 0
+        self._crc = 0
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while self._offset >= len(self._buffer) and not self._eof:
+            self._fill()
+        n = min(len(b), len(self._buffer) - self._offset)
+        b[:n] = self._buffer[self._offset:self._offset + n]
+        self._offset += n
+        return n
+
+    def close(self) -> None:
+        if not self.closed and self._source is not None:
+            self._source.close()
+        super().close()
+
+    def release(self) -> None:
+        """Close this stream without closing the underlying archive."""
+        self._source = None
+        self.close()
+
+    def _fill(self) -> None:
+        if self._decompressor is not None:
+            raw = self._source.read(self._read_size)
+            if not raw:
+                raise zipfile.BadZipFile("Archive ended inside a compressed member")
+            data = self._decompressor.decompress(raw)
+            if self._decompressor.eof:
+                self._source.unread(self._decompressor.unused_data)
+                self._finish(data)
+                return
+        else:
+            raw = self._source.read_exact(min(self._remaining, self._read_size)) if self._remaining else b''
+            self._remaining -= len(raw)
+            data = raw
+            if not self._remaining:
+                self._finish(data)
+                return
+        self._append(data)
+
+    def _append(self, data: bytes) -> None:
+        self._crc = zlib.crc32(data, self._crc)
+        self._buffer = data
+        self._offset = 0
+
+    def _finish(self, data: bytes) -> None:
+        self._append(data)
+        self._eof = True
+        expected = self._expected_crc
+        if self._flags & _FLAG_DATA_DESCRIPTOR:
+            head = self._source.read_exact(4)
+            if head == _SPLIT_SIGNATURE:
+                head = self._source.read_exact(4)
+            expected = struct.unpack('<I', head)[0]
+            self._source.read_exact(16 if self._zip64 else 8)
+        if self._crc != expected:
+            raise zipfile.BadZipFile("CRC mismatch in ZIP member; the archive is corrupt")
+
+
+def _zip64_sizes(extra: bytes, uncompressed: int, compressed: int) -> tuple:
+    """Resolve sizes stored in the ZIP64 extra field, if present."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, length = struct.unpack_from('<HH', extra, pos)
+        if header_id == _ZIP64_EXTRA_ID:
+            field = extra[pos + 4:pos + 4 + length]
+            values = [struct.unpack_from('<Q', field, i)[0] for i in range(0, len(field) - 7, 8)]
+            if uncompressed == 0xFFFFFFFF and values:
+                uncompressed = values.pop(0)
+            if compressed == 0xFFFFFFFF and values:
+                compressed = values.pop(0)
+            return uncompressed, compressed, True
+        pos += 4 + length
+    return uncompressed, compressed, False
+
+
+def _open_member(source: _SegmentReader,
+                 member: Optional[str],
+                 read_size: int) -> _MemberReader:
+    """Advance ``source`` to the requested member and return its stream.
+
+    When ``member`` is ``None`` the first member whose name ends in
+    ``.csv`` is selected.  Members preceding the selected one are
+    decompressed and discarded, since their sizes are not necessarily
+    known in advance.
+    """
+    signature = source.read_exact(4)
+    if signature == _SPLIT_SIGNATURE:
+        signature = source.read_exact(4)
+    while signature == _LOCAL_SIGNATURE:
+        (_, _, flags, method, _, _, crc, compressed, uncompressed,
+         name_len, extra_len) = _LOCAL_HEADER.unpack(signature + source.read_exact(26))
+        raw_name = source.read_exact(name_len)
+        name = raw_name.decode('utf-8' if flags & _FLAG_UTF8 else 'cp437')
+        extra = source.read_exact(extra_len)
+        if flags & _FLAG_ENCRYPTED:
+            raise NotImplementedError(f"Encrypted ZIP member {name!r} is not supported.")
+        if method not in (_STORED, _DEFLATED):
+            raise NotImplementedError(
+                f"Unsupported compression method {method} for ZIP member {name!r}; "
+                "only stored and deflated members can be streamed.")
+        _, compressed, zip64 = _zip64_sizes(extra, uncompressed, compressed)
+        reader = _MemberReader(source, method, flags, crc, compressed, zip64, read_size)
+        if member is None:
+            selected = name.lower().endswith('.csv')
+        else:
+            selected = name == member or os.path.basename(name) == member
+        if selected:
+            return reader
+        while reader.read(read_size):
+            pass
+        reader.release()
+        signature = source.read_exact(4)
+    source.close()
+    target = repr(member) if member is not None else "a CSV member"
+    raise FileNotFoundError(f"Could not find {target} in the archive.")
+
+
+def open_influd(path: str,
+                member: Optional[str] = None,
+                read_size: int = READ_SIZE) -> BinaryIO:
+    """Open an INFLUD CSV as a binary stream.
+
+    Parameters
+    ----------
+    path : str
+        Either an extracted CSV file or a ZIP archive.  For split
+        archives pass the final ``.zip`` segment; the remaining segments
+        (and their ``.partNN`` pieces) are located with
+        :func:`find_segments`.
+    member : str, optional
+        Name of the archive member to read.  Defaults to the first
+        ``.csv`` member.
+    read_size : int, optional
+        Size in bytes of the blocks read from disk.
+
+    Returns
+    -------
+    BinaryIO
+        Forward‑only, buffered binary stream of the CSV contents.  Use
+        it as a context manager to release the underlying files.
+    """
+    if not path.lower().endswith('.zip'):
+        return open(path, 'rb')
+    source = _SegmentReader(find_segments(path))
+    try:
+        raw = _open_member(source, member, read_size)
+    except BaseException:
+        source.close()
+        raise
+    return io.BufferedReader(raw, buffer_size=read_size)
+
+
+def parse_onset_dates(values: pd.Series) -> pd.Series:
+    """Parse SIVEP date strings into ``datetime64`` values.
+
+    Recent OpenDataSUS releases use ISO dates (``YYYY-MM-DD``) while
+    older ones use ``DD/MM/YYYY``; both are accepted.  Unparseable
+    values become ``NaT``.
+    """
+    dates = pd.to_datetime(values, format='%Y-%m-%d', errors='coerce')
+    retry = dates.isna() & values.notna()
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], format='%d/%m/%Y', errors='coerce')
+    return dates
+
+
+def count_chunk(chunk: pd.DataFrame) -> pd.Series:
+    """Count notifications by state and date of symptom onset.
+
+    Rows with a missing state or an invalid onset date are dropped.
+
+    Returns
+    -------
+    pandas.Series
+        Counts indexed by ``(SG_UF, DT_SIN_PRI)``.
+    """
+    frame = pd.DataFrame({
+        'SG_UF': chunk['SG_UF'].str.strip(),
+        'DT_SIN_PRI': parse_onset_dates(chunk['DT_SIN_PRI']),
+    }).dropna()
+    frame = frame[frame['SG_UF'] != '']
+    return frame.groupby(['SG_UF', 'DT_SIN_PRI']).size()
+
+
+def counts_to_frame(counts: Optional[pd.Series]) -> pd.DataFrame:
+    """Convert accumulated counts into the aggregated table layout."""
+    if counts is None or counts.empty:
+        return pd.DataFrame({
+            'SG_UF': pd.Series(dtype=object),
+            'DT_SIN_PRI': pd.Series(dtype='datetime64[ns]'),
+            'COUNT': pd.Series(dtype='int64'),
+        })
+    df = counts.astype('int64').rename('COUNT').reset_index()
+    df['DT_SIN_PRI'] = df['DT_SIN_PRI'].astype('datetime64[ns]')
+    return df.sort_values(['SG_UF', 'DT_SIN_PRI']).reset_index(drop=True)
+
+
+def aggregate_influd(path: str,
+                     chunksize: int = DEFAULT_CHUNKSIZE,
+                     sep: str = DEFAULT_SEP,
+                     encoding: str = DEFAULT_ENCODING,
+                     member: Optional[str] = None) -> pd.DataFrame:
+    """Aggregate an INFLUD file into counts by state and onset date.
+
+    The file is streamed in chunks of ``chunksize`` rows and only the
+    ``SG_UF`` and ``DT_SIN_PRI`` columns are parsed, so memory usage is
+    bounded by the chunk size and the (small) result table, not by the
+    size of the file.
+
+    Parameters
+    ----------
+    path : str
+        Extracted CSV or (split) ZIP archive; see :func:`open_influd`.
+    chunksize : int, optional
+        Number of rows parsed per chunk.
+    sep : str, optional
+        Field separator of the CSV.  Defaults to ``';'``.
+    encoding : str, optional
+        Text encoding of the CSV.  Defaults to ``'latin-1'``.
+    member : str, optional
+        Archive member to read; see :func:`open_influd`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns ``SG_UF``, ``DT_SIN_PRI`` (datetime) and ``COUNT``,
+        sorted by state and date.
+    """
+    counts: Optional[pd.Series] = None
+    with open_influd(path, member=member) as fh:
+        reader = pd.read_csv(fh, sep=sep, usecols=AGGREGATE_COLUMNS, dtype=str,
+                             encoding=encoding, chunksize=chunksize)
+        for chunk in reader:
+            partial = count_chunk(chunk)
+            counts = partial if counts is None else counts.add(partial, fill_value=0)
+    return counts_to_frame(counts)
+
+
+def write_aggregated(df: pd.DataFrame, path: str) -> None:
+    """Write an aggregated table in the ``SG_UF,DT_SIN_PRI,COUNT`` format."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    df.to_csv(path, index=False, date_format='%Y-%m-%d')
+
+
+def infer_year(path: str) -> Optional[int]:
+    """Infer the notification year from an ``INFLUDyy-...`` file name."""
+    match = re.match(r'INFLUD(\d{2})-', os.path.basename(path), flags=re.IGNORECASE)
+    return 2000 + int(match.group(1)) if match else None
+
+
+def default_output_path(year: int) -> str:
+    """Return the conventional location of the aggregated table for ``year``."""
+    return os.path.join("data", "SIVEP", str(year), f"aggregated_sivep_{year}.csv")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus aggregate',
+        description="Aggregate SIVEP-Gripe INFLUD microdata by state and date of symptom onset")
+    parser.add_argument('source', type=str,
+                        help='INFLUD CSV or ZIP archive (for split archives, the final .zip segment)')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Output CSV (default: data/SIVEP/<year>/aggregated_sivep_<year>.csv)')
+    parser.add_argument('--year', type=int, default=None,
+                        help='Year of the data; inferred from the file name when omitted')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help='Number of CSV rows parsed per chunk')
+    parser.add_argument('--sep', type=str, default=DEFAULT_SEP, help='CSV field separator')
+    parser.add_argument('--encoding', type=str, default=DEFAULT_ENCODING, help='CSV text encoding')
+    parser.add_argument('--member', type=str, default=None,
+                        help='Name of the CSV inside the archive (default: first .csv member)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Worker processes for extracted CSVs (0 = all cores); ZIP archives are '
+                             'always streamed by a single process')
+    parser.add_argument('--level', type=str, choices=('uf', 'municipal'), default='uf',
+                        help='Aggregate by state (CSV) or by municipality of residence and of notification '
+                             '(sparse data/SIVEP/<year>/municipal_sivep_<year>.npz)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    year = args.year or infer_year(args.source)
+    if args.level == 'municipal':
+        _main_municipal(args, year)
+        return
+    output = args.output
+    if output is None:
+        if year is None:
+            raise SystemExit("Could not infer the year from the file name; pass --year or --output.")
+        output = default_output_path(year)
+    if args.workers != 1 and not args.source.lower().endswith('.zip'):
+        from .parallel import aggregate_influd_parallel
+        df = aggregate_influd_parallel(args.source, workers=args.workers or None,
+                                       chunksize=args.chunksize, sep=args.sep,
+                                       encoding=args.encoding)
+    else:
+        df = aggregate_influd(args.source, chunksize=args.chunksize, sep=args.sep,
+                              encoding=args.encoding, member=args.member)
+    write_aggregated(df, output)
+    print(f"Wrote {len(df)} rows ({int(df['COUNT'].sum())} notifications) to {output}")
+    if year is not None and os.path.abspath(output) == os.path.abspath(default_output_path(year)):
+        from .catalog import update_catalog
+        from .tensor import update_tensor
+        update_catalog([year])
+        update_tensor()
+
+
+def _main_municipal(args: argparse.Namespace, year: Optional[int]) -> None:
+    from .municipal import aggregate_influd_municipal, default_municipal_path, save_municipal
+
+    output = args.output
+    if output is None:
+        if year is None:
+            raise SystemExit("Could not infer the year from the file name; pass --year or --output.")
+        output = default_municipal_path(year)
+    counts = aggregate_influd_municipal(args.source, chunksize=args.chunksize, sep=args.sep,
+                                        encoding=args.encoding, member=args.member)
+    save_municipal(output, counts.values())
+    for basis, item in counts.items():
+        print(f"{basis}: {len(item.municipalities)} municipalities, {item.nnz} non-zero days "
+              f"({item.total} notifications)")
+    print(f"Wrote {output}")
+    if year is not None and os.path.abspath(output) == os.path.abspath(default_municipal_path(year)):
+        from .catalog import update_catalog
+        update_catalog([year])
@@ -0,0 +1,326 @@
+"""
+Lagged cross‑correlation between daily weather and cases.
+
+The weather notebooks computed one zero‑lag Pearson correlation per
+state in a Python loop.  This module computes the whole lagged
+cross‑correlation function for every state and every weather variable
+at once::
+
+    r[u, v, lag] = corr(weather[u, v, t], cases[u, t + lag])
+
+for ``lag`` in ``-max_lag … +max_lag``; a positive lag means that the
+weather precedes the cases.  Each correlation uses the pairs of days
+where both series are present, and the sums it needs (pair counts, sums
+and sums of squares over the overlap, cross products) are obtained for
+all lags, units and variables from a handful of zero‑padded real FFTs.
+
+Significance is assessed by permutation: the case series of each unit
+is permuted (``'shuffle'``, a random reordering of the days, or
+``'circular'``, a random rotation that keeps its autocorrelation) and
+the correlations are recomputed for a batch of permutations in a single
+array operation.  Two‑sided p‑values are given per lag and adjusted for
+the choice of lag (against the maximum ``|r|`` over lags of each
+permutation).
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus lagcorr --year 2019 --weather data/NASA/weather_daily_uf.parquet
+    python -m rca_sus lagcorr --year 2019 --max_lag 30 --permutations 999 --scheme circular
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import warnings
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .features import dense_series
+from .timeseries import CountStore
+
+#: Permutation schemes of :func:`permutation_pvalues`.
+SCHEMES = ('shuffle', 'circular')
+
+
+class LaggedCorrelation(NamedTuple):
+    """Lagged correlations of weather variables with cases, per unit."""
+    r: np.ndarray                     # (n_units, n_variables, n_lags) float64
+    n: np.ndarray                     # (n_units, n_variables, n_lags) pairs per correlation
+    lags: np.ndarray                  # (n_lags,) int
+    units: List[str]
+    variables: List[str]
+    p_values: Optional[np.ndarray] = None     # per lag
+    p_adjusted: Optional[np.ndarray] = None   # adjusted for the choice of lag
+    unit_name: str = 'SG_UF'
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long table with one row per unit, variable and lag."""
+        index = pd.MultiIndex.from_product([self.units, self.variables, self.lags],
+                                           names=[self.unit_name, 'variable', 'lag'])
+        columns = {'r': self.r.reshape(-1), 'n': self.n.reshape(-1)}
+        if self.p_values is not None:
+            columns['p_value'] = self.p_values.reshape(-1)
+            columns['p_adjusted'] = self.p_adjusted.reshape(-1)
+        frame = pd.DataFrame(columns, index=index).reset_index()
+        frame[self.unit_name] = pd.Categorical(frame[self.unit_name], categories=self.units)
+        return frame
+
+    def strongest(self) -> pd.DataFrame:
+        """Lag of the largest ``|r|`` of each unit and variable, with its statistics."""
+        frame = self.to_frame().dropna(subset=['r'])
+        position = frame['r'].abs().groupby([frame[self.unit_name], frame['variable']], observed=True).idxmax()
+        return frame.loc[position.to_numpy()].reset_index(drop=True)
+
+
+def _fast_length(n: int) -> int:
+    """Smallest 5‑smooth integer (2^a 3^b 5^c) not below ``n``, a fast FFT size."""
+    best = 1 << max(n - 1, 0).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            candidate = power35
+            while candidate < n:
+                candidate *= 2
+            best = min(best, candidate)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def _spectra(values: np.ndarray, n_fft: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Real FFTs of the presence mask, the values and their squares (missing as 0).
+
+    ``values`` has the variables on its second‑to‑last axis.  When the
+    missing days are the same for every variable (e.g. none, or series
+    from the same POWER response) the mask spectrum keeps a single
+    variable, which the products broadcast.
+    """
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    if (present == present[..., :1, :]).all():
+        present = present[..., :1, :]
+    spectra = np.fft.rfft(np.stack([filled, filled * filled]), n=n_fft, axis=-1)
+    return np.fft.rfft(present.astype('float64'), n=n_fft, axis=-1), spectra[0], spectra[1]
+
+
+def _correlate(fx: Tuple[np.ndarray, ...], fy: Tuple[np.ndarray, ...], n_fft: int,
+               positions: np.ndarray, min_periods: int,
+               fixed: Optional[Tuple[np.ndarray, ...]] = None) -> Tuple[np.ndarray, Tuple[np.ndarray, ...]]:
+    """Pairwise‑complete Pearson correlation at every lag from the spectra of x and y.
+
+    ``fx`` are the spectra of ``x`` (``(n_units, n_variables, n_freq)``)
+    and ``fy`` those of ``y`` (``(..., n_units, 1, n_freq)``); the
+    correlations broadcast to ``(..., n_units, n_variables, n_lags)``
+    and are ``NaN`` where undefined.  Also returns the pair counts, the
+    means of x over the overlap and the inverse of its spread; when they
+    do not depend on y (a series without missing days) they can be
+    passed back as ``fixed`` and are not recomputed for every
+    permutation.
+    """
+    def xcorr(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        # sum_t a[t] b[t + lag] for every lag
+        return np.fft.irfft(np.conj(a) * b, n=n_fft, axis=-1)[..., positions]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if fixed is None:
+            n = np.rint(xcorr(fx[0], fy[0]))
+            sx, sxx = xcorr(fx[1], fy[0]), xcorr(fx[2], fy[0])
+            mean_x = sx / n
+            var_x = sxx - sx * mean_x
+            # rounding of the FFTs can leave a constant overlap with a tiny variance
+            defined = (n >= min_periods) & (var_x > 1e-9 * np.maximum(sxx, 1.0))
+            fixed = (n, mean_x, np.where(defined, 1.0 / np.sqrt(var_x), np.nan))
+        n, mean_x, scale_x = fixed
+        sy, syy, sxy = xcorr(fx[0], fy[1]), xcorr(fx[0], fy[2]), xcorr(fx[1], fy[1])
+        var_y = syy - sy * sy / n
+        scale_y = np.where(var_y > 1e-9 * np.maximum(syy, 1.0), 1.0 / np.sqrt(var_y), np.nan)
+        return (sxy - mean_x * sy) * scale_x * scale_y, fixed
+
+
+def _prepare(x: np.ndarray, y: np.ndarray, max_lag: int
+             ) -> Tuple[np.ndarray, np.ndarray, int, np.ndarray, np.ndarray]:
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    if x.ndim != 3 or y.ndim != 2 or x.shape[0] != y.shape[0] or x.shape[-1] != y.shape[-1]:
+        raise ValueError(f"Expected x of shape (n_units, n_variables, n_days) and y of shape "
+                         f"(n_units, n_days); got {x.shape} and {y.shape}.")
+    n_days = x.shape[-1]
+    max_lag = min(int(max_lag), n_days - 1)
+    lags = np.arange(-max_lag, max_lag + 1)
+    n_fft = _fast_length(n_days + max_lag)
+    # centring each series keeps the sums small and the differences exact
+    with warnings.catch_warnings():
+        # series without any value have no mean
+        warnings.simplefilter('ignore', RuntimeWarning)
+        x = x - np.nan_to_num(np.nanmean(x, axis=-1, keepdims=True))
+        y = y - np.nan_to_num(np.nanmean(y, axis=-1, keepdims=True))
+    return x, y, n_fft, lags, lags % n_fft
+
+
+def lagged_correlation(x: np.ndarray, y: np.ndarray, max_lag: int = 60,
+                       min_periods: int = 10) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pearson correlation of ``x[u, v, t]`` with ``y[u, t + lag]`` for every lag.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Array of shape ``(n_units, n_variables, n_days)`` (e.g. weather);
+        ``NaN`` marks missing days.
+    y : np.ndarray
+        Array of shape ``(n_units, n_days)`` (e.g. cases).
+    max_lag : int, default 60
+        Largest lag in days, in both directions.
+    min_periods : int, default 10
+        Minimum number of complete pairs; correlations with fewer pairs,
+        or with a constant series, are ``NaN``.
+
+    Returns
+    -------
+    r : np.ndarray
+        Correlations of shape ``(n_units, n_variables, 2 * max_lag + 1)``.
+    n : np.ndarray
+        Number of pairs behind each correlation, same shape.
+    lags : np.ndarray
+        The lags, from ``-max_lag`` to ``max_lag``.
+    """
+    x, y, n_fft, lags, positions = _prepare(x, y, max_lag)
+    r, (n, _, _) = _correlate(_spectra(x, n_fft), _spectra(y[:, None, :], n_fft),
+                              n_fft, positions, min_periods)
+    return np.clip(r, -1.0, 1.0), np.broadcast_to(n, r.shape).astype('int32'), lags
+
+
+def permutation_pvalues(x: np.ndarray, y: np.ndarray, r: np.ndarray, max_lag: int = 60,
+                        n_permutations: int = 999, scheme: str = 'shuffle',
+                        seed: Optional[int] = None, batch_size: int = 50,
+                        min_periods: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """Two‑sided permutation p‑values of the correlations ``r`` of :func:`lagged_correlation`.
+
+    The days of each unit's ``y`` series are permuted (``scheme``
+    ``'shuffle'``) or rotated by a random offset of at least ``max_lag``
+    days (``'circular'``, which keeps the autocorrelation of the series)
+    and the correlations of ``batch_size`` permutations are computed
+    together.
+
+    Returns
+    -------
+    p_values : np.ndarray
+        ``(1 + #{|r_perm| >= |r|}) / (1 + n_permutations)`` per lag.
+    p_adjusted : np.ndarray
+        The same against the largest ``|r_perm|`` over all lags of the
+        permutation, which accounts for having picked a lag.
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown permutation scheme {scheme!r}; expected one of {SCHEMES}.")
+    x, y, n_fft, lags, positions = _prepare(x, y, max_lag)
+    n_units, n_days = y.shape
+    if scheme == 'circular' and n_days <= 2 * len(lags):
+        raise ValueError(f"{n_days} days are too few for circular shifts beyond a lag of {lags[-1]}.")
+    rng = np.random.default_rng(seed)
+    fx = _spectra(x, n_fft)
+    fixed = None
+    if not np.isnan(y).any():
+        # the mask of y is all ones under any permutation
+        _, fixed = _correlate(fx, _spectra(y[:, None, :], n_fft), n_fft, positions, min_periods)
+    observed = np.abs(r)
+    exceed = np.zeros(r.shape, dtype='int64')
+    exceed_max = np.zeros(r.shape, dtype='int64')
+    days = np.arange(n_days)
+    done = 0
+    while done < n_permutations:
+        size = min(batch_size, n_permutations - done)
+        if scheme == 'shuffle':
+            order = rng.permuted(np.broadcast_to(days, (size, n_units, n_days)), axis=-1)
+        else:
+            shift = rng.integers(lags[-1] + 1, n_days - lags[-1], size=(size, n_units, 1))
+            order = (days + shift) % n_days
+        permuted = np.take_along_axis(np.broadcast_to(y, order.shape), order, axis=-1)
+        fy = _spectra(permuted[:, :, None, :], n_fft)
+        null, _ = _correlate(fx, fy, n_fft, positions, min_periods, fixed)
+        null = np.abs(null)
+        exceed += (null >= observed - 1e-12).sum(axis=0)
+        exceed_max += (np.fmax.reduce(null, axis=-1, keepdims=True) >= observed - 1e-12).sum(axis=0)
+        done += size
+    p_values = (1.0 + exceed) / (1.0 + n_permutations)
+    p_adjusted = (1.0 + exceed_max) / (1.0 + n_permutations)
+    missing = np.isnan(r)
+    p_values[missing] = np.nan
+    p_adjusted[missing] = np.nan
+    return p_values, p_adjusted
+
+
+def weather_case_correlation(store: CountStore, weather: pd.DataFrame,
+                             variables: Optional[Sequence[str]] = None,
+                             max_lag: int = 60, n_permutations: int = 0,
+                             scheme: str = 'shuffle', seed: Optional[int] = None,
+                             min_periods: int = 10,
+                             weather_unit_column: str = 'SG_UF') -> LaggedCorrelation:
+    """Lagged correlations of every weather variable with the daily cases of every unit.
+
+    Parameters
+    ----------
+    store : CountStore
+        Daily cases; its units and consecutive dates define the grid.
+    weather : pandas.DataFrame
+        Long daily table with ``weather_unit_column``, ``DATE`` and one
+        numeric column per variable (e.g. :func:`rca_sus.weather.load_weather_table`).
+    variables : sequence of str, optional
+        Weather columns to use (default: all).
+    max_lag, min_periods
+        See :func:`lagged_correlation`.
+    n_permutations, scheme, seed
+        See :func:`permutation_pvalues`; with ``n_permutations=0`` no
+        p‑values are computed.
+    """
+    x, variables = dense_series(weather, store.units, store.dates,
+                                unit_column=weather_unit_column, columns=variables)
+    x = x.transpose(1, 0, 2)
+    y = store.counts
+    r, n, lags = lagged_correlation(x, y, max_lag, min_periods)
+    p_values = p_adjusted = None
+    if n_permutations:
+        p_values, p_adjusted = permutation_pvalues(x, y, r, max_lag, n_permutations, scheme, seed,
+                                                   min_periods=min_periods)
+    return LaggedCorrelation(r, n, lags, list(store.units), list(variables),
+                             p_values, p_adjusted, store.unit_name)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus lagcorr',
+        description="Lagged cross-correlation of daily weather with SRAG cases for every state")
+    parser.add_argument('--year', type=int, required=True, help='Year of the aggregated SIVEP counts')
+    parser.add_argument('--aggregated', type=str, default=None,
+                        help='Aggregated CSV (default: data/SIVEP/<year>/aggregated_sivep_<year>.csv)')
+    parser.add_argument('--weather', type=str, default=os.path.join("data", "NASA", "weather_daily_uf.parquet"),
+                        help='Daily weather Parquet (default: data/NASA/weather_daily_uf.parquet)')
+    parser.add_argument('--variables', type=str, nargs='+', default=None,
+                        help='Weather variables (default: all columns of the table)')
+    parser.add_argument('--max_lag', type=int, default=60, help='Largest lag in days')
+    parser.add_argument('--permutations', type=int, default=999,
+                        help='Permutations for the p-values (0 to skip)')
+    parser.add_argument('--scheme', type=str, choices=SCHEMES, default='shuffle',
+                        help="Permutation of the case series: 'shuffle' days or 'circular' shifts")
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the permutations')
+    parser.add_argument('-o', '--output', type=str, default=None,
+                        help='Output CSV (default: data/derived/lagcorr_weather_sivep_<year>.csv)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    aggregated = args.aggregated or os.path.join("data", "SIVEP", str(args.year), f"aggregated_sivep_{args.year}.csv")
+    store = CountStore.from_aggregated(pd.read_csv(aggregated, parse_dates=['DT_SIN_PRI']))
+    weather = pd.read_parquet(args.weather)
+    result = weather_case_correlation(store, weather, args.variables, args.max_lag,
+                                      args.permutations, args.scheme, args.seed)
+    output = args.output or os.path.join("data", "derived", f"lagcorr_weather_sivep_{args.year}.csv")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    result.to_frame().to_csv(output, index=False)
+    print(f"Wrote {result.r.size} correlations ({len(result.units)} units x {len(result.variables)} "
+          f"variables x {len(result.lags)} lags) to {output}")
@@ -0,0 +1,416 @@
+"""
+Daily SRAG counts per municipality, stored as a sparse matrix.
+
+The aggregated tables and the cube stop at the state.  One level down
+there are about 5 570 municipalities, and most of them see no SRAG case
+on most days, so a dense (municipality × day) matrix is mostly zeros and
+the long ``CO_MUN,DT_SIN_PRI,COUNT`` table has to be grouped again for
+every query.  This module aggregates the microdata once by municipality
+code and date of symptom onset and keeps the counts as a
+``scipy.sparse`` CSR matrix of shape ``(n_municipalities, n_days)``:
+
+* the rows follow the sorted 6‑digit IBGE municipality codes
+  (``MunicipalCounts.municipalities``), the columns consecutive days
+  (``MunicipalCounts.dates``);
+* the municipality can be taken from ``CO_MUN_RES`` (residence, the
+  default for incidence) or ``CO_MUN_NOT`` (notification); both are
+  aggregated in the same pass over the file and stored side by side in
+  ``data/SIVEP/<year>/municipal_sivep_<year>.npz``;
+* roll‑ups to states or regions are one product with a sparse 0/1
+  membership matrix (:meth:`MunicipalCounts.membership`), since the
+  first two digits of the municipality code are the IBGE code of the
+  state;
+* totals, daily series and rankings over a date range and a set of
+  states slice the sparse matrix and never build a dense frame.
+
+Records with a missing or invalid municipality code or onset date are
+dropped.  Seven‑digit codes (with the check digit) are truncated to the
+six digits used by SIVEP::
+
+    counts = MunicipalCounts.load(default_municipal_path(2020))
+    counts.top(10, '2020-03-01', '2020-05-31', ufs=['SP'])
+    counts.rollup('region').totals()
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus aggregate data/SIVEP/2020/INFLUD20-26-06-2025.zip --level municipal
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ingest import DEFAULT_CHUNKSIZE, DEFAULT_ENCODING, DEFAULT_SEP, open_influd, parse_onset_dates
+from .timeseries import CountStore, DateLike
+from .ufs import IBGE_CODE_TO_UF, UF_REGIONS, UFS
+
+#: INFLUD column holding the municipality of each basis.
+MUNICIPAL_COLUMNS: Dict[str, str] = {'residence': 'CO_MUN_RES', 'notification': 'CO_MUN_NOT'}
+
+#: Regions in the order used by :meth:`MunicipalCounts.rollup`.
+REGIONS: List[str] = ['Norte', 'Nordeste', 'Sudeste', 'Sul', 'Centro-Oeste']
+
+LEVELS = ('uf', 'region')
+
+
+def default_municipal_path(year: int) -> str:
+    """Return the conventional location of the municipal counts for ``year``."""
+    return os.path.join("data", "SIVEP", str(year), f"municipal_sivep_{year}.npz")
+
+
+def municipality_codes(values: pd.Series) -> np.ndarray:
+    """Parse municipality codes into 6‑digit IBGE codes.
+
+    Seven‑digit codes lose their check digit; values that are not a
+    code of a known state become ``-1``.
+    """
+    codes = pd.to_numeric(values, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    codes = np.where(codes >= 1_000_000, codes // 10, codes)
+    valid = np.isfinite(codes) & (codes >= 100_000) & (codes < 1_000_000)
+    codes = np.where(valid, codes, -1).astype(np.int64)
+    known = np.isin(codes // 10_000, list(IBGE_CODE_TO_UF))
+    return np.where(known, codes, -1)
+
+
+def _states(codes: np.ndarray) -> np.ndarray:
+    """State abbreviation of each municipality code."""
+    return np.array([IBGE_CODE_TO_UF[code] for code in (np.asarray(codes) // 10_000).tolist()], dtype=object)
+
+
+class MunicipalCounts:
+    """Sparse daily counts per municipality.
+
+    Parameters
+    ----------
+    matrix : scipy.sparse matrix
+        Counts of shape ``(len(municipalities), len(dates))``; stored as
+        ``int32`` CSR.
+    municipalities : sequence of int
+        Sorted 6‑digit IBGE codes labelling the rows.
+    dates : pandas.DatetimeIndex
+        Consecutive days labelling the columns.
+    basis : {'residence', 'notification'}, default 'residence'
+        Municipality the counts refer to (see :data:`MUNICIPAL_COLUMNS`).
+    """
+
+    def __init__(self, matrix, municipalities: Sequence[int], dates: pd.DatetimeIndex,
+                 basis: str = 'residence') -> None:
+        import scipy.sparse as sp
+
+        if basis not in MUNICIPAL_COLUMNS:
+            raise ValueError(f"Unknown basis {basis!r}; expected one of {sorted(MUNICIPAL_COLUMNS)}.")
+        self.basis = basis
+        self.matrix = sp.csr_matrix(matrix, dtype=np.int32)
+        self.matrix.sum_duplicates()
+        self.municipalities = np.asarray(municipalities, dtype=np.int64)
+        self.dates = pd.DatetimeIndex(dates)
+        if self.matrix.shape != (len(self.municipalities), len(self.dates)):
+            raise ValueError(f"Matrix of shape {self.matrix.shape} does not match "
+                             f"{len(self.municipalities)} municipalities x {len(self.dates)} days.")
+        if np.any(np.diff(self.municipalities) <= 0):
+            raise ValueError("Municipality codes must be unique and sorted.")
+        self.ufs = _states(self.municipalities)
+
+    @classmethod
+    def from_coordinates(cls, codes: np.ndarray, onset: np.ndarray, counts: Optional[np.ndarray] = None,
+                         basis: str = 'residence') -> 'MunicipalCounts':
+        """Build the matrix from (municipality code, onset date[, count]) triplets.
+
+        Repeated pairs are summed; the date axis spans the first to the
+        last onset date.
+        """
+        import scipy.sparse as sp
+
+        codes = np.asarray(codes, dtype=np.int64)
+        onset = np.asarray(onset).astype('datetime64[D]')
+        counts = np.ones(len(codes), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        if len(codes) == 0:
+            return cls(sp.csr_matrix((0, 0), dtype=np.int32), [],
+                       pd.DatetimeIndex([], dtype='datetime64[ns]'), basis)
+        municipalities, rows = np.unique(codes, return_inverse=True)
+        first = onset.min()
+        n_days = int((onset.max() - first).astype(int)) + 1
+        columns = (onset - first).astype(np.intp)
+        matrix = sp.coo_matrix((counts, (rows.ravel(), columns)), shape=(len(municipalities), n_days))
+        dates = pd.date_range(str(first), periods=n_days, freq='D', unit='ns')
+        return cls(matrix.tocsr(), municipalities, dates, basis)
+
+    # -- selections ------------------------------------------------------
+    def _bounds(self, start: Optional[DateLike], end: Optional[DateLike]) -> Tuple[int, int]:
+        """Half‑open column positions ``[i0, i1)`` of an inclusive date range."""
+        i0 = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side='left'))
+        i1 = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side='right'))
+        return i0, max(i0, i1)
+
+    def _rows(self, municipalities: Optional[Sequence[int]] = None,
+              ufs: Optional[Sequence[str]] = None) -> np.ndarray:
+        rows = np.arange(len(self.municipalities))
+        if municipalities is not None:
+            rows = pd.Index(self.municipalities).get_indexer(np.asarray(list(municipalities), dtype=np.int64))
+            rows = np.unique(rows[rows >= 0])
+        if ufs is not None:
+            rows = rows[np.isin(self.ufs[rows], list(ufs))]
+        return rows
+
+    def _block(self, start: Optional[DateLike], end: Optional[DateLike],
+               municipalities: Optional[Sequence[int]], ufs: Optional[Sequence[str]]):
+        i0, i1 = self._bounds(start, end)
+        rows = self._rows(municipalities, ufs)
+        return rows, self.matrix[rows][:, i0:i1], (i0, i1)
+
+    def totals(self,
+               start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None,
+               municipalities: Optional[Sequence[int]] = None,
+               ufs: Optional[Sequence[str]] = None) -> pd.Series:
+        """Total count per municipality over the inclusive date range.
+
+        Returns
+        -------
+        pandas.Series
+            ``int64`` counts indexed by municipality code (``CO_MUN``),
+            named ``COUNT``.
+        """
+        rows, block, _ = self._block(start, end, municipalities, ufs)
+        values = np.asarray(block.sum(axis=1, dtype=np.int64)).ravel()
+        return pd.Series(values, index=pd.Index(self.municipalities[rows], name='CO_MUN'), name='COUNT')
+
+    def daily(self,
+              start: Optional[DateLike] = None,
+              end: Optional[DateLike] = None,
+              municipalities: Optional[Sequence[int]] = None,
+              ufs: Optional[Sequence[str]] = None) -> pd.Series:
+        """Daily count summed over the selected municipalities.
+
+        Returns
+        -------
+        pandas.Series
+            ``int64`` counts indexed by day, named ``COUNT``.
+        """
+        _, block, (i0, i1) = self._block(start, end, municipalities, ufs)
+        values = np.asarray(block.sum(axis=0, dtype=np.int64)).ravel()
+        return pd.Series(values, index=self.dates[i0:i1].rename('DT_SIN_PRI'), name='COUNT')
+
+    def top(self,
+            n: int = 10,
+            start: Optional[DateLike] = None,
+            end: Optional[DateLike] = None,
+            ufs: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """The ``n`` municipalities with most cases over the date range.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Columns ``CO_MUN``, ``SG_UF`` and ``COUNT``, in decreasing
+            order of ``COUNT``; municipalities without cases are left out.
+        """
+        totals = self.totals(start, end, ufs=ufs)
+        totals = totals[totals > 0]
+        order = np.argsort(-totals.to_numpy(), kind='stable')[:n]
+        codes = totals.index.to_numpy()[order]
+        return pd.DataFrame({'CO_MUN': codes, 'SG_UF': _states(codes),
+                             'COUNT': totals.to_numpy()[order]})
+
+    def to_frame(self,
+                 start: Optional[DateLike] = None,
+                 end: Optional[DateLike] = None,
+                 municipalities: Optional[Sequence[int]] = None,
+                 ufs: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Return the non‑zero cells of a selection as a long ``CO_MUN,DT_SIN_PRI,COUNT`` table."""
+        rows, block, (i0, i1) = self._block(start, end, municipalities, ufs)
+        coo = block.tocoo()
+        order = np.lexsort((coo.col, coo.row))
+        return pd.DataFrame({
+            'CO_MUN': self.municipalities[rows][coo.row[order]],
+            'DT_SIN_PRI': self.dates[i0:i1][coo.col[order]],
+            'COUNT': coo.data[order].astype(np.int64),
+        })
+
+    # -- roll-ups --------------------------------------------------------
+    def membership(self, level: str = 'uf') -> Tuple[object, List[str]]:
+        """Sparse 0/1 matrix assigning each municipality to its state or region.
+
+        Returns
+        -------
+        (scipy.sparse.csr_matrix, list of str)
+            Matrix of shape ``(n_groups, n_municipalities)`` and the group
+            labels (:data:`rca_sus.ufs.UFS` or :data:`REGIONS`).
+        """
+        import scipy.sparse as sp
+
+        if level not in LEVELS:
+            raise ValueError(f"Unknown level {level!r}; expected one of {LEVELS}.")
+        if level == 'uf':
+            labels, groups = list(UFS), self.ufs
+        else:
+            labels, groups = list(REGIONS), np.array([UF_REGIONS[uf] for uf in self.ufs], dtype=object)
+        rows = pd.Index(labels).get_indexer(groups)
+        columns = np.arange(len(self.municipalities))
+        matrix = sp.csr_matrix((np.ones(len(columns), dtype=np.int32), (rows, columns)),
+                               shape=(len(labels), len(columns)))
+        return matrix, labels
+
+    def rollup(self, level: str = 'uf') -> CountStore:
+        """Aggregate the municipalities to states or regions.
+
+        Returns
+        -------
+        CountStore
+            Dense (state or region × day) store on the same dates, with
+            ``unit_name`` ``SG_UF`` or ``REGION``.
+        """
+        membership, labels = self.membership(level)
+        counts = (membership @ self.matrix).toarray()
+        return CountStore(counts, labels, self.dates, 'SG_UF' if level == 'uf' else 'REGION')
+
+    def to_store(self, ufs: Optional[Sequence[str]] = None) -> CountStore:
+        """Dense :class:`CountStore` with one row per municipality (e.g. for
+        :func:`rca_sus.features.build_features`); prefer the sparse queries
+        above for interactive use.
+        """
+        rows = self._rows(ufs=ufs)
+        return CountStore(self.matrix[rows].toarray(), [str(code) for code in self.municipalities[rows]],
+                          self.dates, 'CO_MUN')
+
+    @property
+    def nnz(self) -> int:
+        """Number of non‑zero (municipality, day) cells."""
+        return int(self.matrix.nnz)
+
+    @property
+    def total(self) -> int:
+        """Total number of records counted."""
+        return int(self.matrix.sum(dtype=np.int64))
+
+    # -- persistence -----------------------------------------------------
+    def _arrays(self) -> Dict[str, np.ndarray]:
+        prefix = self.basis
+        return {
+            f'{prefix}_data': self.matrix.data,
+            f'{prefix}_indices': self.matrix.indices.astype(np.int32),
+            f'{prefix}_indptr': self.matrix.indptr.astype(np.int64),
+            f'{prefix}_municipalities': self.municipalities.astype(np.int32),
+        }
+
+    @classmethod
+    def load(cls, path: str, basis: str = 'residence') -> 'MunicipalCounts':
+        """Load one basis of a file written by :func:`save_municipal`."""
+        import scipy.sparse as sp
+
+        with np.load(path, allow_pickle=False) as data:
+            if f'{basis}_data' not in data:
+                raise ValueError(f"{path} has no counts by {basis} municipality.")
+            start = str(data['start'])
+            n_days = int(data['n_days'])
+            municipalities = data[f'{basis}_municipalities'].astype(np.int64)
+            matrix = sp.csr_matrix((data[f'{basis}_data'], data[f'{basis}_indices'], data[f'{basis}_indptr']),
+                                   shape=(len(municipalities), n_days))
+        dates = pd.date_range(start, periods=n_days, freq='D', unit='ns') if n_days else \
+            pd.DatetimeIndex([], dtype='datetime64[ns]')
+        return cls(matrix, municipalities, dates, basis)
+
+
+def _align(counts: MunicipalCounts, dates: pd.DatetimeIndex) -> MunicipalCounts:
+    """Shift the columns of ``counts`` onto a wider date axis."""
+    import scipy.sparse as sp
+
+    if counts.dates.equals(dates):
+        return counts
+    coo = counts.matrix.tocoo()
+    offset = (counts.dates[0] - dates[0]).days if len(counts.dates) else 0
+    matrix = sp.csr_matrix((coo.data, (coo.row, coo.col + offset)), shape=(len(counts.municipalities), len(dates)))
+    return MunicipalCounts(matrix, counts.municipalities, dates, counts.basis)
+
+
+def save_municipal(path: str, counts: Sequence[MunicipalCounts]) -> None:
+    """Save the counts of one or several bases in one compressed ``.npz`` file.
+
+    The bases share one date axis, spanning all of them.
+    """
+    counts = list(counts)
+    if len({item.basis for item in counts}) != len(counts):
+        raise ValueError("Each basis can only be saved once.")
+    spans = [(item.dates[0], item.dates[-1]) for item in counts if len(item.dates)]
+    if spans:
+        dates = pd.date_range(min(s for s, _ in spans), max(e for _, e in spans), freq='D', unit='ns')
+    else:
+        dates = pd.DatetimeIndex([], dtype='datetime64[ns]')
+    arrays = {}
+    for item in counts:
+        arrays.update(_align(item, dates)._arrays())
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    np.savez_compressed(path, start=np.array(dates[0].strftime('%Y-%m-%d') if len(dates) else ''),
+                        n_days=np.array(len(dates)), **arrays)
+
+
+def count_municipal_chunk(chunk: pd.DataFrame, column: str) -> pd.Series:
+    """Count notifications by municipality code and date of symptom onset.
+
+    Returns
+    -------
+    pandas.Series
+        Counts indexed by ``(CO_MUN, DT_SIN_PRI)``.
+    """
+    frame = pd.DataFrame({
+        'CO_MUN': municipality_codes(chunk[column]),
+        'DT_SIN_PRI': parse_onset_dates(chunk['DT_SIN_PRI']),
+    }).dropna()
+    frame = frame[frame['CO_MUN'] >= 0]
+    return frame.groupby(['CO_MUN', 'DT_SIN_PRI']).size()
+
+
+def aggregate_influd_municipal(path: str,
+                               bases: Sequence[str] = ('residence', 'notification'),
+                               chunksize: int = DEFAULT_CHUNKSIZE,
+                               sep: str = DEFAULT_SEP,
+                               encoding: str = DEFAULT_ENCODING,
+                               member: Optional[str] = None) -> Dict[str, MunicipalCounts]:
+    """Aggregate an INFLUD file into sparse counts by municipality and onset date.
+
+    The file is streamed as in :func:`rca_sus.ingest.aggregate_influd`,
+    reading ``DT_SIN_PRI`` and the municipality column of every basis in
+    a single pass; each chunk is reduced to its non‑zero
+    (municipality, day) cells before being kept.
+
+    Parameters
+    ----------
+    path : str
+        Extracted CSV or (split) ZIP archive; see :func:`rca_sus.ingest.open_influd`.
+    bases : sequence of str, optional
+        Keys of :data:`MUNICIPAL_COLUMNS` to aggregate.
+    chunksize, sep, encoding, member
+        As in :func:`rca_sus.ingest.aggregate_influd`.
+
+    Returns
+    -------
+    dict
+        :class:`MunicipalCounts` keyed by basis.
+    """
+    unknown = set(bases) - set(MUNICIPAL_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown bases {sorted(unknown)}; expected {sorted(MUNICIPAL_COLUMNS)}.")
+    columns = ['DT_SIN_PRI'] + [MUNICIPAL_COLUMNS[basis] for basis in bases]
+    parts: Dict[str, List[pd.Series]] = {basis: [] for basis in bases}
+    with open_influd(path, member=member) as fh:
+        reader = pd.read_csv(fh, sep=sep, usecols=columns, dtype=str, encoding=encoding, chunksize=chunksize)
+        for chunk in reader:
+            for basis in bases:
+                parts[basis].append(count_municipal_chunk(chunk, MUNICIPAL_COLUMNS[basis]))
+    result = {}
+    for basis in bases:
+        counts = [part for part in parts[basis] if len(part)]
+        if counts:
+            cells = pd.concat(counts)
+            codes = cells.index.get_level_values('CO_MUN').to_numpy(dtype=np.int64)
+            onset = cells.index.get_level_values('DT_SIN_PRI').to_numpy()
+            result[basis] = MunicipalCounts.from_coordinates(codes, onset, cells.to_numpy(), basis)
+        else:
+            result[basis] = MunicipalCounts.from_coordinates(np.zeros(0, dtype=np.int64),
+                                                             np.zeros(0, dtype='datetime64[D]'), basis=basis)
+    return result
@@ -0,0 +1,186 @@
+"""
+Multi‑core aggregation of extracted INFLUD CSV files.
+
+:func:`rca_sus.ingest.aggregate_influd` parses a file on a single core.
+For an extracted CSV, which unlike a ZIP stream supports random access,
+the work can be split across processes: the data section of the file is
+cut into byte ranges whose boundaries are moved forward to the next
+newline, each range is aggregated independently in a process pool into
+a partial ``(SG_UF, DT_SIN_PRI) -> count`` table, and the partial tables
+are summed.  Since every record belongs to exactly one range and counts
+are integers, the merge is exact and the result is identical to the
+single‑process path (and so is the CSV written by
+:func:`rca_sus.ingest.write_aggregated`).
+
+Records are assumed not to contain newlines inside quoted fields, which
+holds for the OpenDataSUS INFLUD exports; a range boundary falling inside
+such a field would split the record.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .ingest import (
+    AGGREGATE_COLUMNS,
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_ENCODING,
+    DEFAULT_SEP,
+    count_chunk,
+    counts_to_frame,
+)
+
+#: Number of shards created per worker, to balance uneven ranges.
+SHARDS_PER_WORKER = 4
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw stream over the byte range ``[start, end)`` of a file."""
+
+    def __init__(self, path: str, start: int, end: int) -> None:
+        super().__init__()
+        self._fh = open(path, 'rb')
+        self._fh.seek(start)
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        if self._remaining <= 0:
+            return 0
+        view = memoryview(b)[:self._remaining]
+        n = self._fh.readinto(view)
+        self._remaining -= n
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._fh.close()
+        super().close()
+
+
+def read_header(path: str, sep: str = DEFAULT_SEP, encoding: str = DEFAULT_ENCODING) -> Tuple[List[str], int]:
+    """Return the column names of a CSV and the byte offset of its first record."""
+    with open(path, 'rb') as fh:
+        line = fh.readline()
+        offset = fh.tell()
+    columns = pd.read_csv(io.BytesIO(line), sep=sep, nrows=0, encoding=encoding).columns.tolist()
+    return columns, offset
+
+
+def shard_ranges(path: str, n_shards: int, data_start: int = 0) -> List[Tuple[int, int]]:
+    """Split a file into newline‑aligned byte ranges.
+
+    The interval ``[data_start, size)`` is divided into ``n_shards``
+    roughly equal parts; every internal boundary is then advanced to the
+    byte following the next newline so that each range holds whole
+    records.  Empty ranges (possible for tiny files) are dropped.
+
+    Returns
+    -------
+    list of (int, int)
+        Contiguous ``(start, end)`` offsets covering the data section.
+    """
+    size = os.path.getsize(path)
+    n_shards = max(1, n_shards)
+    step = (size - data_start) / n_shards
+    bounds = [data_start]
+    with open(path, 'rb') as fh:
+        for i in range(1, n_shards):
+            target = max(int(data_start + i * step), bounds[-1])
+            if target >= size:
+                break
+            fh.seek(target)
+            fh.readline()
+            bounds.append(min(fh.tell(), size))
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def aggregate_range(path: str,
+                    start: int,
+                    end: int,
+                    columns: Sequence[str],
+                    chunksize: int = DEFAULT_CHUNKSIZE,
+                    sep: str = DEFAULT_SEP,
+                    encoding: str = DEFAULT_ENCODING) -> Optional[pd.Series]:
+    """Aggregate the records in one byte range of an INFLUD CSV.
+
+    Returns
+    -------
+    pandas.Series or None
+        Partial counts indexed by ``(SG_UF, DT_SIN_PRI)``, or ``None`` if
+        the range contains no records.
+    """
+    counts: Optional[pd.Series] = None
+    with io.BufferedReader(_RangeReader(path, start, end)) as fh:
+        reader = pd.read_csv(fh, sep=sep, header=None, names=list(columns),
+                             usecols=AGGREGATE_COLUMNS, dtype=str, encoding=encoding,
+                             chunksize=chunksize)
+        for chunk in reader:
+            partial = count_chunk(chunk)
+            counts = partial if counts is None else counts.add(partial, fill_value=0)
+    return counts
+
+
+def _aggregate_range_task(task: tuple) -> Optional[pd.Series]:
+    return aggregate_range(*task)
+
+
+def merge_counts(partials: Sequence[Optional[pd.Series]]) -> Optional[pd.Series]:
+    """Sum partial ``(SG_UF, DT_SIN_PRI)`` count tables."""
+    partials = [p for p in partials if p is not None and not p.empty]
+    if not partials:
+        return None
+    return pd.concat(partials).groupby(level=[0, 1]).sum()
+
+
+def aggregate_influd_parallel(path: str,
+                              workers: Optional[int] = None,
+                              shards: Optional[int] = None,
+                              chunksize: int = DEFAULT_CHUNKSIZE,
+                              sep: str = DEFAULT_SEP,
+                              encoding: str = DEFAULT_ENCODING) -> pd.DataFrame:
+    """Aggregate an extracted INFLUD CSV using a pool of processes.
+
+    Parameters
+    ----------
+    path : str
+        Extracted INFLUD CSV.  ZIP archives cannot be sharded; use
+        :func:`rca_sus.ingest.aggregate_influd` to stream them.
+    workers : int, optional
+        Number of worker processes.  Defaults to ``os.cpu_count()``.
+        With a single worker the shards are processed in‑process.
+    shards : int, optional
+        Number of byte ranges.  Defaults to
+        ``workers * SHARDS_PER_WORKER``.
+    chunksize, sep, encoding
+        As in :func:`rca_sus.ingest.aggregate_influd`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Same table as :func:`rca_sus.ingest.aggregate_influd`.
+    """
+    if path.lower().endswith('.zip'):
+        raise ValueError("Parallel aggregation requires an extracted CSV; "
+                         "use aggregate_influd() to stream ZIP archives.")
+    workers = workers or os.cpu_count() or 1
+    columns, data_start = read_header(path, sep=sep, encoding=encoding)
+    missing = [c for c in AGGREGATE_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Columns {missing} not found in {path}.")
+    ranges = shard_ranges(path, shards or workers * SHARDS_PER_WORKER, data_start)
+    tasks = [(path, start, end, columns, chunksize, sep, encoding) for start, end in ranges]
+    if workers == 1:
+        partials = [_aggregate_range_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(_aggregate_range_task, tasks))
+    return counts_to_frame(merge_counts(partials))
@@ -0,0 +1,221 @@
+"""
+Multi‑year population table for the Brazilian states.
+
+IBGE publishes the official population estimates each year as an Excel
+workbook (``estimativa_dou_<year>.xls``) whose ``BRASIL E UFs`` sheet
+mixes the country, the five regions and the 27 states, with thousands
+separators and footnote markers such as ``3.289.290(1)`` in some cells.
+The app and the notebooks each parsed that sheet by position, and only
+for 2021.  This module converts any number of those workbooks – and,
+optionally, CSV tables broken down by age band and sex – into one small
+long table stored as Parquet (``data/IBGE/population/population_uf.parquet``)::
+
+    CD_UF  SG_UF  YEAR  AGE_BAND  SEX    POPULATION
+    11     RO     2019  TOTAL     TOTAL     1777225
+
+``AGE_BAND`` and ``SEX`` are ``TOTAL`` for the overall estimates; tables
+with a breakdown use the labels of :data:`rca_sus.cube.AGE_BANDS` and
+:data:`rca_sus.cube.SEXES`, so they line up with the cube for
+age‑standardised incidence.  The table is built once and loads in a few
+milliseconds, without ``xlrd``.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus population data/IBGE/population/estimativa_dou_2021.xls \\
+        data/IBGE/population/estimativa_dou_2019_uf.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ufs import IBGE_CODE_TO_UF, NAME_TO_UF, UF_IBGE_CODES, UFS
+
+#: Default location of the population table.
+DEFAULT_POPULATION_PATH = os.path.join("data", "IBGE", "population", "population_uf.parquet")
+
+#: Sheet of the DOU workbooks holding the state estimates.
+DOU_SHEET = 'BRASIL E UFs'
+
+#: Label of the ``AGE_BAND`` and ``SEX`` columns for overall estimates.
+TOTAL = 'TOTAL'
+
+POPULATION_COLUMNS = ['CD_UF', 'SG_UF', 'YEAR', 'AGE_BAND', 'SEX', 'POPULATION']
+
+_FOOTNOTE = re.compile(r'\(\d+\)')
+
+
+def parse_count(value) -> Optional[int]:
+    """Parse an IBGE population cell such as ``3.289.290(1)`` or ``1815278``."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return int(round(value))
+    digits = re.sub(r'\D', '', _FOOTNOTE.sub('', str(value)))
+    return int(digits) if digits else None
+
+
+def infer_population_year(path: str) -> Optional[int]:
+    """Extract the reference year from names like ``estimativa_dou_2021.xls``."""
+    match = re.search(r'(?<!\d)(19|20)\d{2}(?!\d)', os.path.basename(path))
+    return int(match.group(0)) if match else None
+
+
+def parse_dou_estimates(path: str, year: Optional[int] = None) -> pd.DataFrame:
+    """Read the state estimates of one ``estimativa_dou_<year>.xls`` workbook.
+
+    Rows are matched by state name rather than by position, so the
+    country and region subtotals are skipped, and footnote markers are
+    removed before the digits are parsed.  Requires ``xlrd``.
+    """
+    year = year or infer_population_year(path)
+    if year is None:
+        raise ValueError(f"Could not infer the year from {path}; pass it explicitly.")
+    sheet = pd.read_excel(path, sheet_name=DOU_SHEET, header=None, dtype=object)
+    records = {}
+    for _, row in sheet.iterrows():
+        name = str(row.iloc[0]).strip()
+        uf = NAME_TO_UF.get(name)
+        if uf is None:
+            continue
+        counts = [parse_count(value) for value in row.iloc[1:]]
+        counts = [count for count in counts if count]
+        if counts:
+            records[uf] = counts[0]
+    missing = sorted(set(UFS) - set(records))
+    if missing:
+        raise ValueError(f"{path}: no estimate found for {missing}.")
+    return _normalise(pd.DataFrame({'SG_UF': list(records), 'YEAR': year, 'POPULATION': list(records.values())}))
+
+
+def read_population_csv(path: str) -> pd.DataFrame:
+    """Read a long CSV table of estimates.
+
+    The table needs ``SG_UF`` (or ``CD_UF``), ``YEAR`` and ``POPULATION``
+    columns and may add ``AGE_BAND`` and ``SEX``.
+    """
+    return _normalise(pd.read_csv(path, dtype={'SG_UF': str, 'AGE_BAND': str, 'SEX': str}))
+
+
+def _normalise(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    if 'SG_UF' not in df.columns:
+        df['SG_UF'] = df['CD_UF'].map(IBGE_CODE_TO_UF)
+    unknown = sorted(set(df['SG_UF'].dropna()) - set(UFS))
+    if unknown or df['SG_UF'].isna().any():
+        raise ValueError(f"Unknown states in population table: {unknown or 'missing codes'}.")
+    df['CD_UF'] = df['SG_UF'].map(UF_IBGE_CODES)
+    for col in ('AGE_BAND', 'SEX'):
+        if col not in df.columns:
+            df[col] = TOTAL
+        df[col] = df[col].fillna(TOTAL).astype(str)
+    df = df[POPULATION_COLUMNS]
+    return df.astype({'CD_UF': 'int8', 'SG_UF': 'category', 'YEAR': 'int16',
+                      'AGE_BAND': 'category', 'SEX': 'category', 'POPULATION': 'int64'})
+
+
+def build_population_table(sources: Sequence[str]) -> pd.DataFrame:
+    """Combine DOU workbooks (``.xls``/``.xlsx``) and CSV tables into one table.
+
+    Later sources replace the rows of earlier ones with the same state,
+    year, age band and sex.
+    """
+    frames = []
+    for path in sources:
+        if path.lower().endswith(('.xls', '.xlsx')):
+            frames.append(parse_dou_estimates(path))
+        else:
+            frames.append(read_population_csv(path))
+    table = pd.concat([frame.astype({'SG_UF': str, 'AGE_BAND': str, 'SEX': str}) for frame in frames],
+                      ignore_index=True)
+    table = table.drop_duplicates(['SG_UF', 'YEAR', 'AGE_BAND', 'SEX'], keep='last')
+    table = table.sort_values(['YEAR', 'CD_UF', 'AGE_BAND', 'SEX']).reset_index(drop=True)
+    return _normalise(table)
+
+
+def write_population_table(table: pd.DataFrame, path: str = DEFAULT_POPULATION_PATH) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    table.to_parquet(path, index=False)
+
+
+def load_population_table(path: str = DEFAULT_POPULATION_PATH) -> pd.DataFrame:
+    """Load the table written by :func:`write_population_table`."""
+    return pd.read_parquet(path)
+
+
+def population_years(table: pd.DataFrame) -> List[int]:
+    """Years with overall estimates for every state."""
+    totals = table[(table['AGE_BAND'] == TOTAL) & (table['SEX'] == TOTAL)]
+    complete = totals.groupby('YEAR', observed=True)['SG_UF'].nunique()
+    return sorted(int(year) for year in complete.index[complete == len(UFS)])
+
+
+def closest_year(table: pd.DataFrame, year: int) -> int:
+    """The year with estimates closest to ``year`` (the earlier one on ties)."""
+    years = population_years(table)
+    if not years:
+        raise ValueError("The population table has no complete year of estimates.")
+    return min(years, key=lambda candidate: (abs(candidate - year), candidate))
+
+
+def population_series(table: pd.DataFrame, year: int, exact: bool = False) -> pd.Series:
+    """Overall population per state for ``year``, in :data:`UFS` order.
+
+    When ``year`` has no estimates the closest year is used, unless
+    ``exact`` is set; the series is named after the year actually used.
+    """
+    used = year if exact else closest_year(table, year)
+    rows = table[(table['YEAR'] == used) & (table['AGE_BAND'] == TOTAL) & (table['SEX'] == TOTAL)]
+    if rows.empty:
+        raise KeyError(f"No population estimates for {year}.")
+    series = rows.set_index(rows['SG_UF'].astype(str))['POPULATION'].reindex(UFS)
+    series.index.name = 'SG_UF'
+    return series.rename(used)
+
+
+def population_matrix(table: pd.DataFrame, years: Sequence[int]) -> Tuple[np.ndarray, List[int]]:
+    """Populations of shape ``(len(years), 27)`` for :func:`rca_sus.incidence.incidence`.
+
+    Returns the matrix and the year used for each row.
+    """
+    series = [population_series(table, year) for year in years]
+    return np.vstack([s.to_numpy(dtype='float64') for s in series]), [int(s.name) for s in series]
+
+
+def population_by_age(table: pd.DataFrame, year: int, age_bands: Sequence[str], sex: str = TOTAL) -> np.ndarray:
+    """Populations of shape ``(27, len(age_bands))`` for age‑standardised rates.
+
+    Missing combinations are ``NaN``.
+    """
+    rows = table[(table['YEAR'] == year) & (table['SEX'] == sex)]
+    pivot = (rows.assign(SG_UF=rows['SG_UF'].astype(str), AGE_BAND=rows['AGE_BAND'].astype(str))
+             .pivot_table(index='SG_UF', columns='AGE_BAND', values='POPULATION', aggfunc='sum'))
+    return pivot.reindex(index=UFS, columns=list(age_bands)).to_numpy(dtype='float64')
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus population',
+        description="Build the multi-year state population table from IBGE estimate files")
+    parser.add_argument('sources', type=str, nargs='+',
+                        help='estimativa_dou_<year>.xls workbooks and/or long CSV tables')
+    parser.add_argument('-o', '--output', type=str, default=DEFAULT_POPULATION_PATH,
+                        help='Output Parquet file (default: data/IBGE/population/population_uf.parquet)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    table = build_population_table(args.sources)
+    write_population_table(table, args.output)
+    print(f"Wrote {len(table)} rows for years {sorted(table['YEAR'].unique().tolist())} to {args.output}")
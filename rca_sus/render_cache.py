@@ -0,0 +1,155 @@
+"""
+Shared in‑memory cache of rendered figures.
+
+The map page only has a handful of distinct views (year × metric), but
+each rerun repeated the aggregation, the merges with population and
+geometry and a full matplotlib render.  :class:`RenderCache` keeps the
+finished image bytes (PNG or SVG) keyed by everything that determines
+them – year, metric, colour map, geometry level and the content hashes
+of the aggregates, the population table and the geometry – so that
+
+* a repeated view is served without rendering;
+* a view is rendered at most once even when several sessions of the
+  same Streamlit server request it concurrently (other callers wait for
+  the first render);
+* a change to any input file changes its content hash, and therefore the
+  key, so stale images are never served; they simply age out.
+
+Entries are evicted in least‑recently‑used order once the total size
+exceeds ``max_bytes`` or the number of entries exceeds ``max_entries``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from .catalog import file_stats
+
+#: Default memory cap of a cache, in bytes.
+DEFAULT_MAX_BYTES = 64 * 2**20
+
+#: Default maximum number of cached figures.
+DEFAULT_MAX_ENTRIES = 256
+
+_hash_lock = threading.Lock()
+_hashes: Dict[Tuple[str, int, int], str] = {}
+
+
+def content_hash(path: Optional[str]) -> Optional[str]:
+    """SHA‑256 of a file or directory, memoised on its size and modification time.
+
+    Returns ``None`` for a missing path, so that an absent input is part
+    of the key as well.
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    with _hash_lock:
+        cached = _hashes.get(key)
+    if cached is None:
+        cached = file_stats(path)['sha256']
+        with _hash_lock:
+            _hashes[key] = cached
+    return cached
+
+
+class RenderCache:
+    """Thread‑safe LRU cache of rendered figure bytes with a memory cap.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Total size of the cached images above which the least recently
+        used ones are evicted.
+    max_entries : int
+        Maximum number of cached images.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Dict[Hashable, threading.Event] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """Return the cached bytes for ``key`` (marking them as recently used), or ``None``."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return data
+
+    def put(self, key: Hashable, data: bytes) -> None:
+        """Store ``data`` under ``key`` and evict entries beyond the limits.
+
+        Images larger than ``max_bytes`` are not stored.
+        """
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """Return the bytes for ``key``, calling ``render()`` only on a miss.
+
+        Concurrent callers asking for the same missing key wait for a
+        single render instead of each producing the image.
+        """
+        while True:
+            with self._lock:
+                data = self._entries.get(key)
+                if data is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # another caller is rendering this key; wait and look again
+            pending.wait()
+        try:
+            data = render()
+            self.put(key, data)
+            return data
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def clear(self) -> None:
+        """Drop every cached image."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters describing the cache use so far."""
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self.size, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
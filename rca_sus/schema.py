@@ -0,0 +1,268 @@
+"""
+Typed schema for the SIVEP‑Gripe INFLUD files.
+
+Loaded with ``pandas`` defaults, every INFLUD column becomes an
+``object``/string or ``int64``/``float64`` column, and a full 2020 file
+(over a million rows and ~150 columns) needs many gigabytes of memory.
+Yet most fields are small coded enumerations defined in the official
+data dictionary (``referencias/Dicionario_de_Dados_SRAG_Hospitalizado_23.03.2021.pdf``):
+1/2/9 (Sim/Não/Ignorado) flags, ``EVOLUCAO``, ``CLASSI_FIN``,
+``CS_SEXO``, ...
+
+This module encodes that dictionary:
+
+* coded fields become ``category`` columns with the dictionary codes as
+  fixed categories, stored as one ``int8`` code per row;
+* ``DT_*`` fields are parsed once into ``datetime64``;
+* state abbreviations use the fixed UF categories of
+  :data:`rca_sus.ufs.UFS`, municipality/health‑unit codes become
+  nullable ``Int32`` and the names attached to them ``category``;
+* ages and epidemiological weeks become small nullable integers.
+
+Values that are not listed in the dictionary are treated as missing.
+Fields not described here (free text, identifiers) are kept as strings.
+:data:`LABELS` maps the codes of each coded field to their Portuguese
+description, see :func:`decode`.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, union_categoricals
+
+from .ingest import DEFAULT_ENCODING, DEFAULT_SEP, open_influd, parse_onset_dates
+from .ufs import UFS
+
+#: Version of the typed schema; bump when the encodings below change.
+SCHEMA_VERSION = 1
+
+#: Rows converted per chunk by :func:`load_influd_typed`.
+DEFAULT_TYPED_CHUNKSIZE = 200_000
+
+YES_NO_IGNORED = {1: 'Sim', 2: 'Não', 9: 'Ignorado'}
+
+# fields marked only when the agent was detected ("1-marcado pelo usuário")
+MARKED = {1: 'Marcado'}
+
+RESULT_CODES = {
+    1: 'Positivo', 2: 'Negativo', 3: 'Inconclusivo', 4: 'Não realizado',
+    5: 'Aguardando resultado', 9: 'Ignorado',
+}
+
+#: Fields coded 1‑Sim / 2‑Não / 9‑Ignorado.
+FLAG_FIELDS: List[str] = [
+    'NOSOCOMIAL', 'AVE_SUINO',
+    'FEBRE', 'TOSSE', 'GARGANTA', 'DISPNEIA', 'DESC_RESP', 'SATURACAO', 'DIARREIA',
+    'VOMITO', 'DOR_ABD', 'FADIGA', 'PERD_OLFT', 'PERD_PALA', 'OUTRO_SIN',
+    'FATOR_RISC', 'PUERPERA', 'CARDIOPATI', 'HEMATOLOGI', 'SIND_DOWN', 'HEPATICA', 'ASMA',
+    'DIABETES', 'NEUROLOGIC', 'PNEUMOPATI', 'IMUNODEPRE', 'RENAL', 'OBESIDADE', 'OUT_MORBI',
+    'VACINA_COV', 'VACINA', 'MAE_VAC', 'M_AMAMENTA', 'ANTIVIRAL', 'HOSPITAL', 'UTI',
+    'AMOSTRA', 'POS_AN_FLU', 'POS_AN_OUT', 'POS_PCRFLU', 'POS_PCROUT',
+]
+
+#: Etiological agent fields that are either marked (1) or empty.
+MARKED_FIELDS: List[str] = [
+    'AN_SARS2', 'AN_VSR', 'AN_PARA1', 'AN_PARA2', 'AN_PARA3', 'AN_ADENO', 'AN_OUTRO',
+    'PCR_SARS2', 'PCR_VSR', 'PCR_PARA1', 'PCR_PARA2', 'PCR_PARA3', 'PCR_PARA4',
+    'PCR_ADENO', 'PCR_METAP', 'PCR_BOCA', 'PCR_RINO', 'PCR_OUTRO',
+]
+
+#: Code → label tables of every coded field.
+LABELS: Dict[str, Dict[Any, str]] = {
+    'CS_SEXO': {'M': 'Masculino', 'F': 'Feminino', 'I': 'Ignorado'},
+    'TP_IDADE': {1: 'Dia', 2: 'Mês', 3: 'Ano'},
+    'CS_GESTANT': {
+        1: '1º Trimestre', 2: '2º Trimestre', 3: '3º Trimestre', 4: 'Idade gestacional ignorada',
+        5: 'Não', 6: 'Não se aplica', 9: 'Ignorado',
+    },
+    'CS_RACA': {1: 'Branca', 2: 'Preta', 3: 'Amarela', 4: 'Parda', 5: 'Indígena', 9: 'Ignorado'},
+    'CS_ESCOL_N': {
+        0: 'Sem escolaridade/Analfabeto', 1: 'Fundamental 1º ciclo', 2: 'Fundamental 2º ciclo',
+        3: 'Médio', 4: 'Superior', 5: 'Não se aplica', 9: 'Ignorado',
+    },
+    'CS_ZONA': {1: 'Urbana', 2: 'Rural', 3: 'Periurbana', 9: 'Ignorado'},
+    'TP_ANTIVIR': {1: 'Oseltamivir', 2: 'Zanamivir', 3: 'Outro'},
+    'SUPORT_VEN': {1: 'Sim, invasivo', 2: 'Sim, não invasivo', 3: 'Não', 9: 'Ignorado'},
+    'RAIOX_RES': {
+        1: 'Normal', 2: 'Infiltrado intersticial', 3: 'Consolidação', 4: 'Misto', 5: 'Outro',
+        6: 'Não realizado', 9: 'Ignorado',
+    },
+    'TOMO_RES': {
+        1: 'Típico covid-19', 2: 'Indeterminado covid-19', 3: 'Atípico covid-19',
+        4: 'Negativo para Pneumonia', 5: 'Outro', 6: 'Não realizado', 9: 'Ignorado',
+    },
+    'TP_AMOSTRA': {
+        1: 'Secreção de Naso-orofaringe', 2: 'Lavado Broco-alveolar', 3: 'Tecido post-mortem',
+        4: 'Outra', 5: 'LCR', 9: 'Ignorado',
+    },
+    'TP_TES_AN': {1: 'Imunofluorescência (IF)', 2: 'Teste rápido antigênico'},
+    'RES_AN': RESULT_CODES,
+    'TP_FLU_AN': {1: 'Influenza A', 2: 'Influenza B'},
+    'PCR_RESUL': {
+        1: 'Detectável', 2: 'Não Detectável', 3: 'Inconclusivo', 4: 'Não Realizado',
+        5: 'Aguardando Resultado', 9: 'Ignorado',
+    },
+    'TP_FLU_PCR': {1: 'Influenza A', 2: 'Influenza B'},
+    'PCR_FLUASU': {
+        1: 'Influenza A(H1N1)pdm09', 2: 'Influenza A (H3N2)', 3: 'Influenza A não subtipado',
+        4: 'Influenza A não subtipável', 5: 'Inconclusivo', 6: 'Outro',
+    },
+    'PCR_FLUBLI': {1: 'Victoria', 2: 'Yamagatha', 3: 'Não realizado', 4: 'Inconclusivo', 5: 'Outro'},
+    'TP_AM_SOR': {1: 'Sangue/plasma/soro', 2: 'Outra', 9: 'Ignorado'},
+    'TP_SOR': {1: 'Teste rápido', 2: 'Elisa', 3: 'Quimiluminescência', 4: 'Outro'},
+    'RES_IGG': RESULT_CODES,
+    'RES_IGM': RESULT_CODES,
+    'RES_IGA': RESULT_CODES,
+    'CLASSI_FIN': {
+        1: 'SRAG por influenza', 2: 'SRAG por outro vírus respiratório',
+        3: 'SRAG por outro agente etiológico', 4: 'SRAG não especificado',
+        5: 'SRAG por covid-19',
+    },
+    'CRITERIO': {1: 'Laboratorial', 2: 'Clínico Epidemiológico', 3: 'Clínico', 4: 'Clínico Imagem'},
+    'EVOLUCAO': {1: 'Cura', 2: 'Óbito', 3: 'Óbito por outras causas', 9: 'Ignorado'},
+}
+LABELS.update({field: YES_NO_IGNORED for field in FLAG_FIELDS})
+LABELS.update({field: MARKED for field in MARKED_FIELDS})
+
+# the dictionary codes sex as 1/2/9 while the exports use M/F/I
+_SEX_ALIASES = {'1': 'M', '2': 'F', '9': 'I'}
+
+#: State abbreviation fields, encoded with the fixed UF categories.
+UF_FIELDS: List[str] = ['SG_UF_NOT', 'SG_UF', 'SG_UF_INTE']
+
+#: Nullable integer fields and their dtypes (IBGE/CNES codes, age, weeks).
+INTEGER_FIELDS: Dict[str, str] = {
+    'CO_MUN_NOT': 'Int32', 'CO_MUN_RES': 'Int32', 'CO_MU_INTE': 'Int32',
+    'CO_REGIONA': 'Int32', 'CO_RG_RESI': 'Int32', 'CO_RG_INTE': 'Int32',
+    'CO_UNI_NOT': 'Int32', 'CO_UN_INTE': 'Int32', 'CO_PAIS': 'Int16',
+    'NU_IDADE_N': 'Int16', 'SEM_NOT': 'Int8', 'SEM_PRI': 'Int8',
+}
+
+#: Names attached to codes (municipalities, health regions, units, country).
+NAME_FIELDS: List[str] = [
+    'ID_MUNICIP', 'ID_MN_RESI', 'ID_MN_INTE', 'ID_REGIONA', 'ID_RG_RESI', 'ID_RG_INTE',
+    'ID_UNIDADE', 'ID_PAIS',
+]
+
+
+def categorical_dtype(field: str) -> Optional[CategoricalDtype]:
+    """Return the fixed categorical dtype of a field, if it has one."""
+    if field in LABELS:
+        return CategoricalDtype(categories=list(LABELS[field]))
+    if field in UF_FIELDS:
+        return CategoricalDtype(categories=UFS)
+    return None
+
+
+def _to_codes(values: pd.Series, dtype: CategoricalDtype) -> pd.Series:
+    """Convert raw strings to a categorical, dropping undefined codes.
+
+    The raw strings are looked up directly in the string form of the
+    categories, which avoids parsing every value as a number.
+    """
+    lookup = pd.Index([str(c) for c in dtype.categories], dtype=object)
+    codes = lookup.get_indexer(values.to_numpy(dtype=object)).astype(np.int8)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=values.index, name=values.name)
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert a frame of raw INFLUD strings to the typed schema.
+
+    The frame is converted column by column in place and returned.
+    """
+    for col in df.columns:
+        values = df[col]
+        if col.startswith('DT_'):
+            df[col] = parse_onset_dates(values)
+        elif col == 'CS_SEXO':
+            df[col] = _to_codes(values.str.strip().replace(_SEX_ALIASES), categorical_dtype(col))
+        elif categorical_dtype(col) is not None:
+            df[col] = _to_codes(values, categorical_dtype(col))
+        elif col in INTEGER_FIELDS:
+            dtype = INTEGER_FIELDS[col]
+            bounds = np.iinfo(dtype.lower())
+            numeric = pd.to_numeric(values, errors='coerce').round()
+            df[col] = numeric.where(numeric.between(bounds.min, bounds.max)).astype(dtype)
+        elif col in NAME_FIELDS:
+            df[col] = values.astype('category')
+    return df
+
+
+def concat_typed(chunks: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate typed chunks, merging open‑ended categories.
+
+    ``pandas.concat`` falls back to ``object`` when categorical columns
+    have different categories (e.g. municipality names seen in different
+    chunks); those are combined with ``union_categoricals`` instead.
+    """
+    if not chunks:
+        return pd.DataFrame()
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if isinstance(parts[0].dtype, CategoricalDtype):
+            columns[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+def _raw_dtypes() -> Dict[str, Any]:
+    """Dtypes used to parse the raw CSV before :func:`apply_schema`.
+
+    Fields converted by the schema are parsed as plain Python objects,
+    which are the cheapest to look up and convert; every other field
+    uses the default string dtype, which is more compact.
+    """
+    converted = [*LABELS, *UF_FIELDS, *INTEGER_FIELDS]
+    return defaultdict(lambda: str, {field: object for field in converted})
+
+
+def load_influd_typed(path: str,
+                      columns: Optional[Sequence[str]] = None,
+                      chunksize: int = DEFAULT_TYPED_CHUNKSIZE,
+                      sep: str = DEFAULT_SEP,
+                      encoding: str = DEFAULT_ENCODING) -> pd.DataFrame:
+    """Load an INFLUD file with the typed schema.
+
+    The file is parsed in chunks that are converted with
+    :func:`apply_schema` before being concatenated, so the untyped
+    strings of at most one chunk are in memory at any time.
+
+    Parameters
+    ----------
+    path : str
+        INFLUD CSV or (split) ZIP archive; see
+        :func:`rca_sus.ingest.open_influd`.
+    columns : sequence of str, optional
+        Columns to load.  Defaults to all columns.
+    chunksize : int, optional
+        Number of CSV rows converted at a time.
+    sep, encoding : str, optional
+        CSV dialect; see :func:`rca_sus.ingest.aggregate_influd`.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Typed microdata.
+    """
+    chunks = []
+    with open_influd(path) as fh:
+        reader = pd.read_csv(fh, sep=sep, usecols=columns, dtype=_raw_dtypes(), encoding=encoding,
+                             chunksize=chunksize)
+        for chunk in reader:
+            chunks.append(apply_schema(chunk))
+    return concat_typed(chunks)
+
+
+def decode(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Return a copy of ``df`` with coded fields replaced by their labels."""
+    out = df.copy()
+    for col in columns or out.columns:
+        if col in LABELS and isinstance(out[col].dtype, CategoricalDtype):
+            out[col] = out[col].cat.rename_categories(LABELS[col])
+    return out
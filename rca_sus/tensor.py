@@ -0,0 +1,312 @@
+"""
+Memory‑mapped (UF × day × year) tensor of the daily SRAG counts.
+
+Every Streamlit session, notebook kernel and experiment process used to
+parse the aggregated CSVs into its own pandas frame.  The counts of all
+years fit in a small fixed‑shape array, so the aggregation step also
+writes them once as a binary ``.npy`` file,
+``data/SIVEP/counts_uf_day_year.npy``, of ``int32`` counts with axes
+
+``uf``
+    the 27 states in :data:`rca_sus.ufs.UFS` order;
+``day``
+    days since 1 January of the year before the notification year
+    (732 slots, the onset window of :func:`rca_sus.cube.onset_window`;
+    the trailing slots stay zero when the two years have fewer days);
+``year``
+    notification year, one slab per aggregated table.
+
+Each slab holds exactly one ``aggregated_sivep_<year>.csv``, so the
+tensor answers the same questions as the table, the cube and the
+municipal counts of that notification year: the late‑December onsets of
+the previous year stay with the file that reported them.  Onsets outside
+the window (typing errors such as 1919) are counted per year in the
+sidecar instead of being placed.  Summing the slabs of neighbouring
+years over a date gives the count by onset date.  The axis labels and
+the content hashes of the source tables are kept in the JSON sidecar
+``counts_uf_day_year.json``.
+
+:meth:`CountTensor.open` maps the file with ``np.load(mmap_mode='r')``:
+opening costs no parsing, and all processes on a machine share the pages
+of one copy through the operating system's page cache.  The accessor
+methods return views of the mapping when ``ufs`` is ``None`` or a single
+state and only copy the selected cells otherwise::
+
+    tensor = CountTensor.open()
+    tensor.window(2020, '2020-03-01', '2020-05-31', ufs='SP')   # view, no copy
+    tensor.totals(2020, '2019-12-01', '2020-02-29', ufs=['SP', 'RJ'])
+
+The tensor is rewritten by ``python -m rca_sus aggregate`` and
+``refresh``; ``python -m rca_sus tensor`` rebuilds it from the aggregated
+tables on disk.  Files are replaced atomically, so processes that still
+map the previous version keep reading it unchanged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .cube import DEFAULT_YEARS_BEFORE
+from .ingest import default_output_path
+from .timeseries import CountStore, DateLike
+from .ufs import UFS
+
+#: Default location of the tensor; the sidecar has the same name with ``.json``.
+DEFAULT_TENSOR_PATH = os.path.join("data", "SIVEP", "counts_uf_day_year.npy")
+
+#: Version of the tensor layout.
+TENSOR_VERSION = 2
+
+#: Calendar years before the notification year covered by the day axis.
+YEARS_BEFORE = DEFAULT_YEARS_BEFORE
+
+#: Day slots per notification year.
+DAYS = 366 * (YEARS_BEFORE + 1)
+
+AXES = ('uf', 'day', 'year')
+
+UfSelection = Union[None, str, Sequence[str]]
+
+
+def sidecar_path(path: str) -> str:
+    """Return the location of the JSON labels of the tensor at ``path``."""
+    return os.path.splitext(path)[0] + '.json'
+
+
+def aggregated_years(sivep_dir: str = os.path.join("data", "SIVEP")) -> List[int]:
+    """Years with an ``aggregated_sivep_<year>.csv`` table."""
+    if not os.path.isdir(sivep_dir):
+        return []
+    return sorted(int(name) for name in os.listdir(sivep_dir)
+                  if re.fullmatch(r'\d{4}', name) and os.path.exists(default_output_path(int(name))))
+
+
+def window_origin(year: int) -> pd.Timestamp:
+    """First day of the day axis of notification year ``year``."""
+    return pd.Timestamp(year=int(year) - YEARS_BEFORE, month=1, day=1)
+
+
+class CountTensor:
+    """Daily counts per state and notification year, usually memory‑mapped.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        Array of shape ``(len(ufs), DAYS, len(years))``; may be a
+        read‑only ``np.memmap``.
+    years : sequence of int
+        Notification years labelling the last axis.
+    ufs : sequence of str, optional
+        State abbreviations labelling the first axis (default
+        :data:`rca_sus.ufs.UFS`).
+    sources : dict, optional
+        ``sha256`` of the aggregated table each notification year was
+        read from, keyed by year.
+    dropped : dict, optional
+        Records of each notification year whose onset falls outside its
+        window, keyed by year.
+    """
+
+    def __init__(self, counts: np.ndarray, years: Sequence[int], ufs: Optional[Sequence[str]] = None,
+                 sources: Optional[Dict[int, str]] = None, dropped: Optional[Dict[int, int]] = None) -> None:
+        self.counts = counts
+        self.years = [int(year) for year in years]
+        self.ufs = list(UFS if ufs is None else ufs)
+        self.sources = {int(year): digest for year, digest in (sources or {}).items()}
+        self.dropped = {int(year): int(n) for year, n in (dropped or {}).items()}
+        if counts.shape != (len(self.ufs), DAYS, len(self.years)):
+            raise ValueError(f"Counts of shape {counts.shape} do not match {len(self.ufs)} states x "
+                             f"{DAYS} days x {len(self.years)} years.")
+        self._uf_index = pd.Index(self.ufs)
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_TENSOR_PATH, mmap_mode: Optional[str] = 'r') -> 'CountTensor':
+        """Map the tensor written by :func:`build_tensor`.
+
+        With ``mmap_mode=None`` the counts are read into memory instead.
+        """
+        with open(sidecar_path(path), encoding='utf-8') as fh:
+            labels = json.load(fh)
+        if labels.get('tensor_version') != TENSOR_VERSION or labels.get('axes') != list(AXES):
+            raise ValueError(f"{path} was written with another layout; rebuild it with python -m rca_sus tensor.")
+        counts = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        return cls(counts, labels['years'], labels['ufs'], labels.get('sources'), labels.get('dropped'))
+
+    # -- coordinates -----------------------------------------------------
+    def _column(self, year: int) -> int:
+        try:
+            return self.years.index(int(year))
+        except ValueError:
+            raise KeyError(f"No notification year {year} in the tensor.") from None
+
+    def _rows(self, ufs: UfSelection) -> Union[slice, int, np.ndarray]:
+        """Index of the first axis; a slice or an integer keep the result a view."""
+        if ufs is None:
+            return slice(None)
+        if isinstance(ufs, str):
+            row = self._uf_index.get_indexer([ufs])[0]
+            if row < 0:
+                raise KeyError(f"Unknown state {ufs!r}.")
+            return int(row)
+        rows = self._uf_index.get_indexer(list(ufs))
+        return rows[rows >= 0]
+
+    def _labels(self, ufs: UfSelection) -> List[str]:
+        rows = self._rows(ufs)
+        return self.ufs[rows] if isinstance(rows, slice) else list(np.asarray(self.ufs, dtype=object)[rows])
+
+    def dates(self, year: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> pd.DatetimeIndex:
+        """Days of the inclusive range clipped to the window of notification year ``year``."""
+        first = window_origin(year)
+        last = pd.Timestamp(year=int(year), month=12, day=31)
+        first = first if start is None else max(first, pd.Timestamp(start))
+        last = last if end is None else min(last, pd.Timestamp(end))
+        return pd.date_range(first, last, freq='D', unit='ns')
+
+    def span(self, year: int) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """First and last onset date recorded for notification year ``year``; ``None`` if empty."""
+        days = np.flatnonzero(self.counts[:, :, self._column(year)].any(axis=0))
+        if not len(days):
+            return None
+        origin = window_origin(year)
+        return origin + pd.Timedelta(days=int(days[0])), origin + pd.Timedelta(days=int(days[-1]))
+
+    def window(self, year: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+               ufs: UfSelection = None) -> np.ndarray:
+        """Counts of the selected states of one notification year over an inclusive date range.
+
+        Returns
+        -------
+        np.ndarray
+            Array of shape ``(n_states, n_days)`` (``(n_days,)`` when
+            ``ufs`` is a single state), one column per day of
+            :meth:`dates`.  When ``ufs`` is ``None`` or a single state
+            the array is a view of the mapping; otherwise the selected
+            cells are copied.
+        """
+        column = self._column(year)
+        rows = self._rows(ufs)
+        span = self.dates(year, start, end)
+        if not len(span):
+            shape = (0,) if isinstance(rows, int) else (len(self._labels(ufs)), 0)
+            return np.zeros(shape, dtype=self.counts.dtype)
+        first = (span[0] - window_origin(year)).days
+        return self.counts[rows, first:first + len(span), column]
+
+    def totals(self, year: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+               ufs: UfSelection = None) -> pd.Series:
+        """Total count per state of one notification year over the inclusive date range.
+
+        Returns
+        -------
+        pandas.Series
+            ``int64`` counts indexed by state, named ``COUNT``.
+        """
+        ufs = [ufs] if isinstance(ufs, str) else ufs
+        values = self.window(year, start, end, ufs).sum(axis=-1, dtype=np.int64)
+        return pd.Series(values, index=pd.Index(self._labels(ufs), name='SG_UF'), name='COUNT')
+
+    def daily(self, year: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+              ufs: UfSelection = None) -> pd.Series:
+        """Daily count of one notification year summed over the selected states.
+
+        Returns
+        -------
+        pandas.Series
+            ``int64`` counts indexed by day, named ``COUNT``.
+        """
+        ufs = [ufs] if isinstance(ufs, str) else ufs
+        values = self.window(year, start, end, ufs).sum(axis=0, dtype=np.int64)
+        return pd.Series(values, index=self.dates(year, start, end).rename('DT_SIN_PRI'), name='COUNT')
+
+    def to_store(self, year: int, start: Optional[DateLike] = None,
+                 end: Optional[DateLike] = None) -> CountStore:
+        """Copy notification year ``year`` into a :class:`CountStore`.
+
+        The range defaults to the recorded onsets (:meth:`span`), the
+        days :meth:`CountStore.from_aggregated` covers for the same
+        aggregated table.
+        """
+        span = self.span(year)
+        if span is not None:
+            start = span[0] if start is None else start
+            end = span[1] if end is None else end
+        return CountStore(np.atleast_2d(self.window(year, start, end)), self.ufs, self.dates(year, start, end))
+
+
+def _write_atomic(path: str, write) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as fh:
+        write(fh)
+    os.replace(tmp, path)
+
+
+def build_tensor(years: Optional[Sequence[int]] = None,
+                 path: str = DEFAULT_TENSOR_PATH) -> CountTensor:
+    """Write the tensor of the aggregated tables of ``years`` (default: all on disk).
+
+    Returns the tensor mapped from the new file.
+    """
+    from .catalog import file_stats
+
+    years = aggregated_years() if years is None else sorted(years)
+    counts = np.zeros((len(UFS), DAYS, len(years)), dtype=np.int32)
+    sources, dropped = {}, {}
+    for column, year in enumerate(years):
+        table = default_output_path(year)
+        store = CountStore.from_aggregated(pd.read_csv(table, parse_dates=['DT_SIN_PRI']))
+        sources[year] = file_stats(table)['sha256']
+        offsets = np.asarray((store.dates - window_origin(year)).days)
+        placed = (offsets >= 0) & (store.dates <= pd.Timestamp(year=year, month=12, day=31))
+        counts[:, offsets[placed], column] = store.counts[:, placed]
+        dropped[year] = int(store.counts[:, ~placed].sum(dtype=np.int64))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    labels: Dict[str, Any] = {
+        'tensor_version': TENSOR_VERSION,
+        'axes': list(AXES),
+        'ufs': list(UFS),
+        'years': list(years),
+        'sources': {str(year): digest for year, digest in sources.items()},
+        'dropped': {str(year): n for year, n in dropped.items()},
+        'generated': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+    }
+    # the data first: a reader that opens the old labels with the new file fails the shape check
+    _write_atomic(path, lambda fh: np.save(fh, counts, allow_pickle=False))
+    _write_atomic(sidecar_path(path), lambda fh: fh.write((json.dumps(labels, indent=2) + '\n').encode('utf-8')))
+    return CountTensor.open(path)
+
+
+def update_tensor(path: str = DEFAULT_TENSOR_PATH) -> Optional[CountTensor]:
+    """Rebuild the tensor after an aggregated table changed; ``None`` if there are none."""
+    if not aggregated_years():
+        return None
+    return build_tensor(path=path)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus tensor',
+        description="Write the memory-mapped (UF x day x year) count tensor from the aggregated tables")
+    parser.add_argument('--years', type=int, nargs='+', default=None,
+                        help='Notification years to include (default: every aggregated table found)')
+    parser.add_argument('-o', '--output', type=str, default=DEFAULT_TENSOR_PATH,
+                        help='Output .npy file; the labels are written next to it as .json')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    tensor = build_tensor(args.years, args.output)
+    print(f"Wrote {tensor.counts.shape} tensor ({int(tensor.counts.sum(dtype=np.int64))} notifications, "
+          f"notification years {tensor.years}, {sum(tensor.dropped.values())} onsets outside the window) "
+          f"to {args.output}")
@@ -0,0 +1,197 @@
+"""
+Dense in‑memory store of daily counts for interactive range queries.
+
+The Data Explorer filters the aggregated table on every widget change.
+Doing that on the long ``SG_UF,DT_SIN_PRI,COUNT`` frame means building a
+row mask, copying and grouping the frame each time, so latency grows with
+the number of rows (and with every year or municipality level added).
+
+:class:`CountStore` keeps the same counts as a dense ``int32`` matrix of
+shape ``(n_units, n_days)`` – one row per state (or any other spatial
+unit), one column per consecutive day – together with its cumulative sums
+along the time axis.  Then
+
+* the total per unit over any date range is one vectorised subtraction
+  of two columns of the cumulative sums;
+* the daily series over the selected units is a row‑masked sum of a
+  slice of the matrix;
+
+and neither depends on how many rows the long table had::
+
+    store = CountStore.from_aggregated(load_aggregated_data(2020))
+    store.totals('2020-03-01', '2020-05-31', units=['SP', 'RJ'])
+    store.daily('2020-03-01', '2020-05-31')
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .ufs import UFS
+
+DateLike = Union[str, pd.Timestamp, datetime.date]
+
+
+class CountStore:
+    """Dense daily counts per spatial unit with prefix sums.
+
+    Parameters
+    ----------
+    counts : np.ndarray
+        Array of shape ``(len(units), len(dates))``; converted to
+        ``int32``.
+    units : sequence of str
+        Row labels (state abbreviations by default).
+    dates : pandas.DatetimeIndex
+        Consecutive days labelling the columns.
+    unit_name : str, default 'SG_UF'
+        Name of the unit level in the returned series and frames.
+    """
+
+    def __init__(self, counts: np.ndarray, units: Sequence[str], dates: pd.DatetimeIndex,
+                 unit_name: str = 'SG_UF') -> None:
+        self.unit_name = unit_name
+        self.counts = np.ascontiguousarray(counts, dtype=np.int32)
+        self.units = list(units)
+        self.dates = pd.DatetimeIndex(dates)
+        if self.counts.shape != (len(self.units), len(self.dates)):
+            raise ValueError(f"Counts of shape {self.counts.shape} do not match "
+                             f"{len(self.units)} units x {len(self.dates)} days.")
+        self.cumulative = np.zeros((len(self.units), len(self.dates) + 1), dtype=np.int64)
+        np.cumsum(self.counts, axis=1, out=self.cumulative[:, 1:])
+        self._unit_index = pd.Index(self.units)
+
+    @classmethod
+    def from_aggregated(cls,
+                        df: pd.DataFrame,
+                        units: Optional[Sequence[str]] = None,
+                        unit_column: str = 'SG_UF',
+                        date_column: str = 'DT_SIN_PRI',
+                        count_column: str = 'COUNT') -> 'CountStore':
+        """Build a store from a long table of counts.
+
+        Rows with a missing date or a unit outside ``units`` (default:
+        :data:`rca_sus.ufs.UFS`) are ignored; the date axis spans the
+        first to the last date present.
+        """
+        units = UFS if units is None else list(units)
+        dates = pd.to_datetime(df[date_column], errors='coerce').to_numpy().astype('datetime64[D]')
+        rows = pd.Index(units).get_indexer(df[unit_column].to_numpy(dtype=object))
+        valid = (rows >= 0) & ~np.isnat(dates)
+        rows, dates = rows[valid], dates[valid]
+        values = df[count_column].to_numpy()[valid]
+        if len(dates) == 0:
+            return cls(np.zeros((len(units), 0)), units, pd.DatetimeIndex([], dtype='datetime64[ns]'), unit_column)
+        first = dates.min()
+        n_days = int((dates.max() - first).astype(int)) + 1
+        counts = np.zeros((len(units), n_days), dtype=np.int64)
+        np.add.at(counts, (rows, (dates - first).astype(np.intp)), values)
+        return cls(counts, units, pd.date_range(str(first), periods=n_days, freq='D', unit='ns'), unit_column)
+
+    @classmethod
+    def concat(cls, stores: Iterable['CountStore']) -> 'CountStore':
+        """Combine stores with the same units (e.g. several years) into one.
+
+        Overlapping days are summed; days between stores are filled with
+        zeros.
+        """
+        stores = [store for store in stores if len(store.dates)]
+        if not stores:
+            return cls(np.zeros((len(UFS), 0)), UFS, pd.DatetimeIndex([], dtype='datetime64[ns]'))
+        units = stores[0].units
+        if any(store.units != units for store in stores):
+            raise ValueError("All stores must have the same units.")
+        first = min(store.dates[0] for store in stores)
+        last = max(store.dates[-1] for store in stores)
+        dates = pd.date_range(first, last, freq='D', unit='ns')
+        counts = np.zeros((len(units), len(dates)), dtype=np.int64)
+        for store in stores:
+            offset = (store.dates[0] - first).days
+            counts[:, offset:offset + len(store.dates)] += store.counts
+        return cls(counts, units, dates, stores[0].unit_name)
+
+    def _bounds(self, start: Optional[DateLike], end: Optional[DateLike]) -> Tuple[int, int]:
+        """Half‑open column positions ``[i0, i1)`` of an inclusive date range."""
+        i0 = 0 if start is None else int(self.dates.searchsorted(pd.Timestamp(start), side='left'))
+        i1 = len(self.dates) if end is None else int(self.dates.searchsorted(pd.Timestamp(end), side='right'))
+        return i0, max(i0, i1)
+
+    def _rows(self, units: Optional[Sequence[str]]) -> np.ndarray:
+        if units is None:
+            return np.arange(len(self.units))
+        rows = self._unit_index.get_indexer(list(units))
+        return rows[rows >= 0]
+
+    def totals(self,
+               start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None,
+               units: Optional[Sequence[str]] = None) -> pd.Series:
+        """Total count per unit over the inclusive date range.
+
+        Returns
+        -------
+        pandas.Series
+            ``int64`` counts indexed by unit, named ``COUNT``.
+        """
+        i0, i1 = self._bounds(start, end)
+        rows = self._rows(units)
+        values = self.cumulative[rows, i1] - self.cumulative[rows, i0]
+        return pd.Series(values, index=pd.Index(np.asarray(self.units, dtype=object)[rows], name=self.unit_name),
+                         name='COUNT')
+
+    def window_totals(self,
+                      windows: Sequence[Tuple[Optional[DateLike], Optional[DateLike]]],
+                      units: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Totals per unit for several inclusive date windows at once.
+
+        Returns
+        -------
+        np.ndarray
+            ``int64`` array of shape ``(len(windows), n_units)``, one row
+            per window; ready for :func:`rca_sus.incidence.incidence`.
+        """
+        bounds = np.array([self._bounds(start, end) for start, end in windows], dtype=np.intp).reshape(-1, 2)
+        rows = self._rows(units)
+        block = self.cumulative[rows]
+        return (block[:, bounds[:, 1]] - block[:, bounds[:, 0]]).T
+
+    def daily(self,
+              start: Optional[DateLike] = None,
+              end: Optional[DateLike] = None,
+              units: Optional[Sequence[str]] = None) -> pd.Series:
+        """Daily count summed over the selected units.
+
+        Returns
+        -------
+        pandas.Series
+            ``int64`` counts indexed by day, named ``COUNT``.
+        """
+        i0, i1 = self._bounds(start, end)
+        mask = np.zeros(len(self.units), dtype=bool)
+        mask[self._rows(units)] = True
+        values = self.counts[mask, i0:i1].sum(axis=0, dtype=np.int64)
+        return pd.Series(values, index=self.dates[i0:i1].rename('DT_SIN_PRI'), name='COUNT')
+
+    def to_frame(self,
+                 start: Optional[DateLike] = None,
+                 end: Optional[DateLike] = None,
+                 units: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Return the non‑zero cells of a selection as a long ``<unit>,DT_SIN_PRI,COUNT`` table."""
+        i0, i1 = self._bounds(start, end)
+        rows = self._rows(units)
+        block = self.counts[rows, i0:i1]
+        r, c = np.nonzero(block)
+        return pd.DataFrame({
+            self.unit_name: np.asarray(self.units, dtype=object)[rows][r],
+            'DT_SIN_PRI': self.dates[i0:i1][c],
+            'COUNT': block[r, c].astype(np.int64),
+        })
+
+    @property
+    def present_units(self) -> List[str]:
+        """Units with at least one count."""
+        return [unit for unit, total in zip(self.units, self.cumulative[:, -1]) if total > 0]
@@ -0,0 +1,105 @@
+"""
+Reference tables for the Brazilian federative units (UFs).
+
+The aggregated SIVEP tables, the IBGE population estimates and the
+shapefiles identify states in different ways (abbreviation, full name or
+numeric IBGE code).  This module keeps the mappings in one place so that
+every component of the pipeline aligns state‑level data on the same
+fixed index, :data:`UFS`.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+#: State abbreviations in alphabetical order (the canonical UF index).
+UFS: List[str] = [
+    'AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT', 'PA',
+    'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO',
+]
+
+#: Full state names as written by IBGE, keyed by abbreviation.
+UF_NAMES: Dict[str, str] = {
+    'RO': 'Rondônia',
+    'AC': 'Acre',
+    'AM': 'Amazonas',
+    'RR': 'Roraima',
+    'PA': 'Pará',
+    'AP': 'Amapá',
+    'TO': 'Tocantins',
+    'MA': 'Maranhão',
+    'PI': 'Piauí',
+    'CE': 'Ceará',
+    'RN': 'Rio Grande do Norte',
+    'PB': 'Paraíba',
+    'PE': 'Pernambuco',
+    'AL': 'Alagoas',
+    'SE': 'Sergipe',
+    'BA': 'Bahia',
+    'MG': 'Minas Gerais',
+    'ES': 'Espírito Santo',
+    'RJ': 'Rio de Janeiro',
+    'SP': 'São Paulo',
+    'PR': 'Paraná',
+    'SC': 'Santa Catarina',
+    'RS': 'Rio Grande do Sul',
+    'MS': 'Mato Grosso do Sul',
+    'MT': 'Mato Grosso',
+    'GO': 'Goiás',
+    'DF': 'Distrito Federal',
+}
+
+#: Two‑digit IBGE codes, keyed by abbreviation.  The first two digits of
+#: a municipality code are the code of its state.
+UF_IBGE_CODES: Dict[str, int] = {
+    'RO': 11, 'AC': 12, 'AM': 13, 'RR': 14, 'PA': 15, 'AP': 16, 'TO': 17,
+    'MA': 21, 'PI': 22, 'CE': 23, 'RN': 24, 'PB': 25, 'PE': 26, 'AL': 27, 'SE': 28, 'BA': 29,
+    'MG': 31, 'ES': 32, 'RJ': 33, 'SP': 35,
+    'PR': 41, 'SC': 42, 'RS': 43,
+    'MS': 50, 'MT': 51, 'GO': 52, 'DF': 53,
+}
+
+#: Macro‑region of each state, keyed by abbreviation.
+UF_REGIONS: Dict[str, str] = {
+    uf: {1: 'Norte', 2: 'Nordeste', 3: 'Sudeste', 4: 'Sul', 5: 'Centro-Oeste'}[code // 10]
+    for uf, code in UF_IBGE_CODES.items()
+}
+
+#: Abbreviations keyed by full state name.
+NAME_TO_UF: Dict[str, str] = {name: uf for uf, name in UF_NAMES.items()}
+
+#: Abbreviations keyed by IBGE code.
+IBGE_CODE_TO_UF: Dict[int, str] = {code: uf for uf, code in UF_IBGE_CODES.items()}
+
+#: Capital of each state and its coordinates (name, latitude, longitude in
+#: decimal degrees), keyed by abbreviation.  Point data such as NASA POWER
+#: weather series are sampled at the capital.
+UF_CAPITALS: Dict[str, Tuple[str, float, float]] = {
+    'RO': ('Porto Velho', -8.76, -63.90),
+    'AC': ('Rio Branco', -9.97, -67.81),
+    'AM': ('Manaus', -3.10, -60.02),
+    'RR': ('Boa Vista', 2.82, -60.67),
+    'PA': ('Belém', -1.46, -48.50),
+    'AP': ('Macapá', 0.03, -51.07),
+    'TO': ('Palmas', -10.18, -48.33),
+    'MA': ('São Luís', -2.53, -44.30),
+    'PI': ('Teresina', -5.09, -42.80),
+    'CE': ('Fortaleza', -3.72, -38.54),
+    'RN': ('Natal', -5.79, -35.21),
+    'PB': ('João Pessoa', -7.12, -34.86),
+    'PE': ('Recife', -8.05, -34.88),
+    'AL': ('Maceió', -9.67, -35.74),
+    'SE': ('Aracaju', -10.91, -37.07),
+    'BA': ('Salvador', -12.97, -38.51),
+    'MG': ('Belo Horizonte', -19.92, -43.94),
+    'ES': ('Vitória', -20.32, -40.34),
+    'RJ': ('Rio de Janeiro', -22.91, -43.17),
+    'SP': ('São Paulo', -23.55, -46.63),
+    'PR': ('Curitiba', -25.43, -49.27),
+    'SC': ('Florianópolis', -27.60, -48.55),
+    'RS': ('Porto Alegre', -30.03, -51.23),
+    'MS': ('Campo Grande', -20.44, -54.65),
+    'MT': ('Cuiabá', -15.60, -56.10),
+    'GO': ('Goiânia', -16.68, -49.25),
+    'DF': ('Brasília', -15.79, -47.88),
+}
@@ -0,0 +1,250 @@
+"""
+Daily weather per state from the NASA POWER API.
+
+The POWER daily point API returns one JSON document per location and
+date range, with one ``{"YYYYMMDD": value}`` mapping per requested
+parameter and ``-999`` as fill value.  This module downloads those
+documents for the capital of every state (:data:`rca_sus.ufs.UF_CAPITALS`),
+keeps them as a cache on disk and converts them into one typed table
+keyed by state and date::
+
+    SG_UF  DATE        T2M    T2M_MAX  T2M_MIN  PRECTOTCORR  RH2M
+    AC     2019-01-01  25.61  31.02    22.48    11.2         91.3
+
+``SG_UF`` is categorical in :data:`UFS` order, ``DATE`` is ``datetime64``
+and each parameter is a ``float32`` column named as in POWER (missing
+values are ``NaN``).  The table is written to
+``data/NASA/weather_daily_uf.parquet``.
+
+The cached responses are named as the files offered by the POWER web
+interface (``POWER_Point_Daily_<start>_<end>_<lat>_<lon>_LST.json``), so
+the responses already stored in ``data/NASA/temperature/`` are reused,
+and are only downloaded again when they lack a requested parameter.
+Parsed responses are also memoised in memory.  With ``offline=True``
+nothing is downloaded, and ``base_url`` can point at a local server
+replaying recorded responses.
+
+Command‑line usage (from the repository root)::
+
+    python -m rca_sus weather --start 2019-01-01 --end 2019-12-31
+    python -m rca_sus weather --start 2019-01-01 --end 2019-12-31 --parameters T2M --offline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import urllib.parse
+import urllib.request
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .ufs import UF_CAPITALS, UFS
+
+#: Daily point endpoint of the POWER API.
+POWER_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
+
+#: Directory of the cached POWER responses.
+DEFAULT_CACHE_DIR = os.path.join("data", "NASA", "temperature")
+
+#: Default location of the daily weather table.
+DEFAULT_WEATHER_PATH = os.path.join("data", "NASA", "weather_daily_uf.parquet")
+
+#: Parameters requested by default: mean, maximum and minimum temperature
+#: at 2 m (°C), corrected precipitation (mm/day) and relative humidity at 2 m (%).
+DEFAULT_PARAMETERS = ['T2M', 'T2M_MAX', 'T2M_MIN', 'PRECTOTCORR', 'RH2M']
+
+#: POWER fill value for missing data.
+FILL_VALUE = -999.0
+
+_parsed: Dict[Tuple[str, int, int], pd.DataFrame] = {}
+
+
+def _date_token(date: Any) -> str:
+    return pd.Timestamp(date).strftime('%Y%m%d')
+
+
+def _coordinate_token(value: float, positive: str, negative: str) -> str:
+    degrees, hundredths = divmod(int(round(abs(value) * 100)), 100)
+    return f"{degrees:03d}d{hundredths:02d}{positive if value >= 0 else negative}"
+
+
+def point_filename(latitude: float, longitude: float, start: Any, end: Any) -> str:
+    """Name of the cached response, e.g. ``POWER_Point_Daily_20190101_20191231_003d10S_060d02W_LST.json``."""
+    return (f"POWER_Point_Daily_{_date_token(start)}_{_date_token(end)}_"
+            f"{_coordinate_token(latitude, 'N', 'S')}_{_coordinate_token(longitude, 'E', 'W')}_LST.json")
+
+
+def power_url(latitude: float, longitude: float, start: Any, end: Any,
+              parameters: Sequence[str], base_url: str = POWER_URL) -> str:
+    """URL of the POWER daily point request for one location and date range."""
+    query = urllib.parse.urlencode({
+        'parameters': ','.join(parameters),
+        'community': 'SB',
+        'longitude': f"{longitude:.2f}",
+        'latitude': f"{latitude:.2f}",
+        'start': _date_token(start),
+        'end': _date_token(end),
+        'format': 'JSON',
+        'time-standard': 'LST',
+    })
+    return f"{base_url}?{query}"
+
+
+def response_parameters(response: Dict[str, Any]) -> List[str]:
+    """Parameters present in a POWER response."""
+    return list(response.get('properties', {}).get('parameter', {}))
+
+
+def parse_power_json(response: Dict[str, Any], parameters: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Convert a POWER daily point response into a frame indexed by date.
+
+    Parameters
+    ----------
+    response : dict
+        Decoded JSON document.
+    parameters : sequence of str, optional
+        Parameters to keep (default: all in the response).
+
+    Returns
+    -------
+    pandas.DataFrame
+        One ``float32`` column per parameter with fill values as ``NaN``,
+        indexed by ``DATE``.
+    """
+    series = response['properties']['parameter']
+    fill = response.get('header', {}).get('fill_value', FILL_VALUE)
+    parameters = list(parameters or series)
+    missing = [name for name in parameters if name not in series]
+    if missing:
+        raise KeyError(f"Parameters {missing} are not in the POWER response.")
+    keys = np.array(list(series[parameters[0]]) if parameters else [], dtype=str)
+    dates = pd.to_datetime(keys, format='%Y%m%d')
+    columns = {}
+    for name in parameters:
+        values = np.fromiter((series[name].get(key, fill) for key in keys), dtype='float64', count=len(keys))
+        values[np.isclose(values, fill)] = np.nan
+        columns[name] = values.astype('float32')
+    return pd.DataFrame(columns, index=pd.DatetimeIndex(dates, name='DATE'))
+
+
+def fetch_power(latitude: float, longitude: float, start: Any, end: Any,
+                parameters: Sequence[str] = DEFAULT_PARAMETERS,
+                base_url: str = POWER_URL, timeout: float = 120.0) -> Dict[str, Any]:
+    """Download one POWER daily point response."""
+    url = power_url(latitude, longitude, start, end, parameters, base_url)
+    with urllib.request.urlopen(url, timeout=timeout) as reply:
+        return json.loads(reply.read().decode('utf-8'))
+
+
+def load_point(latitude: float, longitude: float, start: Any, end: Any,
+               parameters: Sequence[str] = DEFAULT_PARAMETERS,
+               cache_dir: str = DEFAULT_CACHE_DIR, offline: bool = False,
+               base_url: str = POWER_URL) -> pd.DataFrame:
+    """Daily series of one location, from the cache or the POWER API.
+
+    The response is downloaded (and cached) only when the cache has no
+    response for this location and date range with every requested
+    parameter; with ``offline=True`` a missing response raises
+    ``FileNotFoundError`` instead.
+    """
+    path = os.path.join(cache_dir, point_filename(latitude, longitude, start, end))
+    response = None
+    if os.path.exists(path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key in _parsed and set(parameters) <= set(_parsed[key].columns):
+            return _parsed[key][list(parameters)].copy()
+        with open(path, encoding='utf-8') as f:
+            response = json.load(f)
+        if set(parameters) <= set(response_parameters(response)):
+            _parsed[key] = parse_power_json(response)
+            return _parsed[key][list(parameters)].copy()
+    if offline:
+        raise FileNotFoundError(f"No cached POWER response with {list(parameters)} at {path}.")
+    wanted = list(dict.fromkeys(list(parameters) + (response_parameters(response) if response else [])))
+    response = fetch_power(latitude, longitude, start, end, wanted, base_url)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(response, f)
+    os.replace(tmp, path)
+    return parse_power_json(response, parameters)
+
+
+def weather_table(start: Any, end: Any,
+                  parameters: Sequence[str] = DEFAULT_PARAMETERS,
+                  ufs: Optional[Sequence[str]] = None,
+                  cache_dir: str = DEFAULT_CACHE_DIR, offline: bool = False,
+                  base_url: str = POWER_URL) -> pd.DataFrame:
+    """Daily weather at the capital of each state, as one table keyed by (``SG_UF``, ``DATE``).
+
+    Parameters
+    ----------
+    start, end : date‑like
+        First and last day (inclusive).
+    parameters : sequence of str
+        POWER parameter names; each becomes a ``float32`` column.
+    ufs : sequence of str, optional
+        States to include (default: all 27).
+    cache_dir, offline, base_url
+        See :func:`load_point`.
+    """
+    frames = []
+    for uf in (ufs or UFS):
+        _, latitude, longitude = UF_CAPITALS[uf]
+        point = load_point(latitude, longitude, start, end, parameters, cache_dir, offline, base_url)
+        frames.append(point.reset_index().assign(SG_UF=uf))
+    table = pd.concat(frames, ignore_index=True)[['SG_UF', 'DATE', *parameters]]
+    table['SG_UF'] = pd.Categorical(table['SG_UF'], categories=UFS)
+    table['DATE'] = table['DATE'].astype('datetime64[ns]')
+    return table.sort_values(['SG_UF', 'DATE'], kind='stable').reset_index(drop=True)
+
+
+def write_weather_table(table: pd.DataFrame, path: str = DEFAULT_WEATHER_PATH) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    table.to_parquet(path, index=False)
+
+
+def load_weather_table(path: str = DEFAULT_WEATHER_PATH, ufs: Optional[Sequence[str]] = None,
+                       parameters: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load the table written by :func:`write_weather_table`, optionally a subset of it."""
+    columns = None if parameters is None else ['SG_UF', 'DATE', *parameters]
+    filters = None if ufs is None else [('SG_UF', 'in', list(ufs))]
+    table = pd.read_parquet(path, columns=columns, filters=filters)
+    table['SG_UF'] = pd.Categorical(table['SG_UF'].astype(str), categories=UFS)
+    return table
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m rca_sus weather',
+        description="Build the daily weather table of the state capitals from NASA POWER")
+    parser.add_argument('--start', type=str, required=True, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, required=True, help='Last day (YYYY-MM-DD)')
+    parser.add_argument('--parameters', type=str, nargs='+', default=DEFAULT_PARAMETERS,
+                        help='POWER parameters (default: T2M T2M_MAX T2M_MIN PRECTOTCORR RH2M)')
+    parser.add_argument('--ufs', type=str, nargs='+', choices=UFS, default=None,
+                        help='States to include (default: all)')
+    parser.add_argument('--cache_dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help='Directory of the cached POWER responses (default: data/NASA/temperature)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Only use cached responses; fail if one is missing')
+    parser.add_argument('--base_url', type=str, default=POWER_URL,
+                        help='POWER endpoint (e.g. a local server replaying recorded responses)')
+    parser.add_argument('-o', '--output', type=str, default=DEFAULT_WEATHER_PATH,
+                        help='Output Parquet file (default: data/NASA/weather_daily_uf.parquet)')
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    table = weather_table(args.start, args.end, args.parameters, args.ufs,
+                          args.cache_dir, args.offline, args.base_url)
+    write_weather_table(table, args.output)
+    print(f"Wrote {len(table)} rows ({table['SG_UF'].nunique()} states) to {args.output}")